@@ -0,0 +1,81 @@
+"""
+Animation benchmark, rotating and flipped entities. Compares flipping and rotating the frame every time it is drawn
+with the strips AnimationManager bakes at load time, and reports the load time and memory of the baking.
+
+    python -m benchmarks.animation_frames [entities] [frames] [rotation_steps]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from engine.content.animations import AnimationManager
+
+STRIPS = ("idle", "run", "attack", "hurt")
+FRAMES = 8
+SIZE = 24
+
+
+def write_animations(path, characters: int = 4) -> None:
+    rng = random.Random(16)
+    for c in range(characters):
+        folder = Path(path) / f"character_{c}"
+        folder.mkdir(parents=True)
+        atlas = pygame.Surface((SIZE * FRAMES, SIZE * len(STRIPS)), pygame.SRCALPHA)
+        for _ in range(600):
+            atlas.fill((rng.randrange(256), rng.randrange(256), 90, 255),
+                       (rng.randrange(atlas.get_width()), rng.randrange(atlas.get_height()), 3, 2))
+        pygame.image.save(atlas, str(folder / "atlas.png"))
+        config = {name: {"frames": FRAMES, "columns": FRAMES, "loop": True, "speed": 10.0, "centered": False,
+                         "offset": [0, 0], "width": SIZE, "height": SIZE, "center": [0, 0]} for name in STRIPS}
+        (folder / "config.json").write_text(json.dumps(config), encoding="utf-8")
+
+
+def run(entities: int = 300, frames: int = 120, rotation_steps: int = 32):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    surf = pygame.Surface((416, 320), pygame.SRCALPHA)
+    with tempfile.TemporaryDirectory() as path:
+        write_animations(path)
+        for bake in ("LAZY", "EAGER"):
+            start = time.perf_counter()
+            manager = AnimationManager(path, bake=bake, rotation_steps=rotation_steps)
+            manager.load_animations()
+            load = time.perf_counter() - start
+            rng = random.Random(16)
+            animations = [manager.get_animation(f"character_{rng.randrange(4)}", rng.choice(STRIPS))
+                          for _ in range(entities)]
+            states = [(rng.random() < 0.5, rng.uniform(0, 360), rng.uniform(-90, 90)) for _ in range(entities)]
+            positions = [(rng.randrange(400), rng.randrange(300)) for _ in range(entities)]
+
+            def transform_per_draw():
+                for animation, (flip, angle, _), position in zip(animations, states, positions):
+                    frame = animation.get_current_animation_frame()
+                    surf.blit(pygame.transform.rotate(pygame.transform.flip(frame, flip, False), angle), position)
+
+            def baked():
+                for animation, (flip, angle, _), position in zip(animations, states, positions):
+                    surf.blit(animation.get_frame(flip, False, angle), position)
+
+            print(f"{bake}: load {load * 1000:.1f} ms, baked {manager.baked_bytes / 1024 / 1024:.1f} MB")
+            for name, draw in (("transform per draw", transform_per_draw), ("baked strips", baked)):
+                start = time.perf_counter()
+                for _ in range(frames):
+                    for i, animation in enumerate(animations):
+                        animation.play(1 / 60)
+                        flip, angle, spin = states[i]
+                        states[i] = (flip, (angle + spin / 60) % 360, spin)
+                    draw()
+                elapsed = (time.perf_counter() - start) / frames
+                print(f"  {name:20} {elapsed * 1000:8.2f} ms per frame")
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:4]))
@@ -0,0 +1,92 @@
+"""
+Boot benchmark for ContentManager.load_assets and the sound loading, over the number of asset files. Compares
+the managers loading their files one after another with the AssetLoader decoding them on a thread pool.
+
+    python -m benchmarks.asset_boot [files per folder ...]
+"""
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+import wave
+from dataclasses import replace
+from types import SimpleNamespace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from engine.config.projectconfig import GameSettings, ResourcePaths
+from engine.content.background import BackgroundManager
+from engine.content.contentmanager_new import ContentManager
+from engine.content.imagemanager import ImageManager
+from engine.content.spritesheets import SpritesheetManager
+from engine.sound.soundmanager import SoundManager
+
+
+def write_assets(path: str, files: int) -> ResourcePaths:
+    rng = np.random.default_rng(16)
+    folders = {name: os.path.join(path, name) for name in ("images", "spritesheets", "backgrounds", "sounds")}
+    for folder in folders.values():
+        os.makedirs(folder)
+    for i in range(files):
+        # noise does not compress, decoding costs about as much as for real art of the same size
+        pixels = rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)
+        pygame.image.save(pygame.surfarray.make_surface(pixels), os.path.join(folders["images"], f"{i}.png"))
+        sheet = os.path.join(folders["spritesheets"], f"sheet_{i}")
+        os.makedirs(sheet)
+        pixels = rng.integers(0, 256, (64, 128, 3), dtype=np.uint8)
+        pygame.image.save(pygame.surfarray.make_surface(pixels), os.path.join(sheet, "sheet.png"))
+        pixels = rng.integers(0, 256, (108, 288, 3), dtype=np.uint8)
+        pygame.image.save(pygame.surfarray.make_surface(pixels), os.path.join(folders["backgrounds"], f"{i}.png"))
+        with wave.open(os.path.join(folders["sounds"], f"{i}.wav"), "wb") as w:
+            w.setnchannels(2)
+            w.setsampwidth(2)
+            w.setframerate(22050)
+            samples = [random.randint(-3000, 3000) for _ in range(22050 // 4)]
+            w.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+    empty = os.path.join(path, "empty")
+    os.makedirs(empty)
+    return replace(ResourcePaths(), animations=empty, fonts=empty, atlas=os.path.join(path, "atlas"), **folders)
+
+
+def sequential(paths: ResourcePaths) -> None:
+    # the managers and the sound manager before the AssetLoader
+    SpritesheetManager(paths.spritesheets).load_spritesheets()
+    ImageManager(paths.images).load_images()
+    BackgroundManager(paths.backgrounds).load_backgrounds()
+    SoundManager(SimpleNamespace(resource_paths=paths))
+
+
+def pipelined(paths: ResourcePaths, workers: int = 0) -> None:
+    ctx = SimpleNamespace(resource_paths=paths, window=None,
+                          game_settings=replace(GameSettings(), texture_atlas=False, asset_loader_workers=workers))
+    ctx.content = ContentManager(ctx)
+    SoundManager(ctx)
+    ctx.content.loader.shutdown()
+
+
+def run(*counts: int):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    print(f"{os.cpu_count()} cpus, 4 files per count")
+    print(f"  {'files':>6} {'sequential ms':>14} {'1 worker ms':>12} {'default ms':>11}")
+    for count in counts or (25, 100, 400):
+        with tempfile.TemporaryDirectory() as path:
+            paths = write_assets(path, count)
+            # the first run writes the default spritesheet configs and warms the file cache
+            sequential(paths)
+            timings = []
+            for load in (sequential, lambda p: pipelined(p, 1), pipelined):
+                start = time.perf_counter()
+                load(paths)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"  {count * 4:6} {timings[0]:14.1f} {timings[1]:12.1f} {timings[2]:11.1f}")
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,82 @@
+"""
+Asset cache benchmark, a run through scenes that each use a part of the content. Compares loading everything at boot
+with the lazy asset handles under a memory budget and reports the boot time, the resident memory after every scene
+and the loads and evictions. The texture atlas is off, its pages stay resident either way.
+
+    python -m benchmarks.asset_cache [files per folder] [scenes] [budget megabytes]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from types import SimpleNamespace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from benchmarks.animation_frames import STRIPS, write_animations
+from benchmarks.asset_boot import write_assets
+from engine.config.projectconfig import GameSettings
+from engine.content.contentmanager_new import ContentManager
+
+MEGABYTE = 1024 * 1024
+
+
+def play_scenes(content: ContentManager, scenes: int, files: int, characters: int) -> list[float]:
+    """
+    :return: the resident megabytes after every scene
+    """
+    rng = random.Random(16)
+    resident = []
+    previous = None
+    for scene in range(scenes):
+        name = f"scene_{scene}"
+        content.assets.scope = name
+        for i in rng.sample(range(files), files // 5):
+            content.get_image(str(i)).get_size()
+            content.get_background(str(i)).layer_surfaces
+        for c in rng.sample(range(characters), max(1, characters // 4)):
+            content.get_animation(f"character_{c}", rng.choice(STRIPS))
+        if previous:
+            content.release_scope(previous)
+        previous = name
+        resident.append(sum(entry["bytes"] for entry in content.stats().values()) / MEGABYTE)
+    return resident
+
+
+def run(files: int = 200, scenes: int = 20, budget_megabytes: float = 8):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    characters = 16
+    with tempfile.TemporaryDirectory() as path:
+        paths = write_assets(path, files)
+        animations = os.path.join(path, "animations")
+        write_animations(animations, characters)
+        paths = replace(paths, animations=animations)
+        print(f"{files} images and backgrounds, {characters} characters, {scenes} scenes, {budget_megabytes} MB budget")
+        print(f"  {'loading':>8} {'boot ms':>8} {'scenes ms':>10} {'peak MB':>8} {'last MB':>8} {'loads':>6} "
+              f"{'evictions':>10}")
+        for loading in ("EAGER", "LAZY"):
+            settings = replace(GameSettings(), texture_atlas=False, content_loading=loading,
+                               content_budget_megabytes=budget_megabytes)
+            ctx = SimpleNamespace(resource_paths=paths, window=None, game_settings=settings)
+            start = time.perf_counter()
+            ctx.content = ContentManager(ctx)
+            boot = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            resident = play_scenes(ctx.content, scenes, files, characters)
+            played = (time.perf_counter() - start) * 1000
+            stats = ctx.content.stats()
+            loads = sum(entry["loads"] for entry in stats.values())
+            evictions = sum(entry["evictions"] for entry in stats.values())
+            print(f"  {loading:>8} {boot:8.1f} {played:10.1f} {max(resident):8.1f} {resident[-1]:8.1f} {loads:6} "
+                  f"{evictions:10}")
+            ctx.content.loader.shutdown()
+
+
+if __name__ == "__main__":
+    run(*(float(a) if i == 2 else int(a) for i, a in enumerate(sys.argv[1:])))
@@ -0,0 +1,150 @@
+"""
+Render culling benchmark, a world of many rooms filled with sprites, particle emitters and VFX circles while the
+camera follows the focus through it. Compares rendering everything with render_culling and reports the render
+stages plus the drawn and culled counters of the PROFILER per frame.
+
+    python -m benchmarks.culling [entities] [frames]
+"""
+import os
+import random
+import sys
+import tempfile
+from dataclasses import replace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from pygame import Color, Vector2
+
+from benchmarks.frame_times import BenchmarkScene, Focus
+from benchmarks.synthetic_world import write_synthetic_world
+from engine.config.projectconfig import GameSettings, ResourcePaths
+from engine.core.headless import HeadlessRunner
+from engine.core.profiler import PROFILER
+from engine.entities.base.entity import Entity
+from engine.entities.base.particle_emitter import ParticleEmitter
+from engine.entities.base.particle_settings import ParticleBaseSettings
+from engine.entities.entitymanager import Manager
+from engine.input.input import Action
+from engine.vfx.vfxbase import VFXBase, VFXCircleEffect
+
+ROOMS_X = 4
+ROOMS_Y = 4
+STAGES = ("entities.render", "particles.render", "vfx.render", "scene.render")
+COUNTERS = ("entities", "particles", "vfx")
+
+
+class Drifter(Entity):
+    """
+    Moves in a straight line and bounces off the world border, no tilemap collision so the render dominates
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.velocity = Vector2(kwargs["velocity"])
+        self.bounds = kwargs["bounds"]
+
+    def update(self, dt):
+        self.position += self.velocity * dt
+        if not self.bounds.collidepoint(self.position):
+            self.velocity *= -1
+            self.position += self.velocity * dt * 2
+        return super().update(dt)
+
+
+class CullingWorld(BenchmarkScene):
+    def __init__(self, ctx, entities: int = 2000, emitters: int = 32, effects: int = 200):
+        super().__init__(ctx)
+        self.name = "culling_world"
+        self.amount = entities
+        self.emitter_amount = emitters
+        self.effect_amount = effects
+        self.rnd = random.Random(16)
+        self.emitters: list[ParticleEmitter] = []
+        self.vfx: VFXBase | None = None
+
+    def __world_point(self) -> Vector2:
+        return Vector2(self.rnd.uniform(16, self.world.width - 16), self.rnd.uniform(16, self.world.height - 16))
+
+    def load_scene(self):
+        settings = self.ctx.game_settings
+        self.world = pygame.Rect(0, 0, settings.room_width * ROOMS_X, settings.room_height * ROOMS_Y)
+        self.focus = Focus(self.ctx, (settings.room_width * 1.5, settings.room_height * 1.5), 120)
+        self.setup_world()
+        self.wctx.set_entities(Manager(self.ctx, self.wctx))
+        self.wctx.entities.instantiate_entities(self.wctx.tilemap.get_all_entity_data())
+        self.vfx = VFXBase(culling=settings.render_culling)
+        rnd = self.rnd
+        images = []
+        for i in range(4):
+            image = pygame.Surface((8, 12 + i * 4), pygame.SRCALPHA)
+            image.fill((60 + i * 40, 180, 120, 255))
+            images.append(image)
+        for _ in range(self.amount):
+            velocity = (rnd.uniform(-40, 40), rnd.uniform(-40, 40))
+            entity = Drifter(self.ctx, self.wctx, self.__world_point(), width=8, height=8, velocity=velocity,
+                             bounds=self.world.inflate(-16, -16))
+            entity.set_image(rnd.choice(images))
+            self.wctx.entities.add_entity(entity)
+        for _ in range(self.emitter_amount):
+            emitter = ParticleEmitter(self.ctx, self.wctx, self.__world_point(), width=8, height=8)
+            emitter.apply_config(ParticleBaseSettings(
+                color_start=Color(190, 74, 47), color_end=Color(234, 212, 170), end_alpha=0, start_size=3,
+                end_size=1, min_velocity=10, max_velocity=60, random_x_direction=True, random_y_direction=True,
+                lifetime=1.5, glow_size=2, backend="ARRAY", color_quantization=8, alpha_quantization=16,
+            ))
+            emitter.set_state(False)
+            self.emitters.append(emitter)
+            self.wctx.entities.add_entity(emitter)
+
+    def script(self, scripted_input, frames: int) -> None:
+        scripted_input.hold(Action.MOVE_RIGHT, 0, frames // 2).hold(Action.MOVE_DOWN, frames // 2, frames)
+
+    def update(self):
+        self.update_world()
+        for emitter in self.emitters:
+            emitter.spawn_particle_group(10)
+        while len(self.vfx.active_effect_animations) < self.effect_amount:
+            effect = VFXCircleEffect(self.__world_point(), (240, 240, 255), 1, 24, animation_speed=12)
+            self.vfx.active_effect_animations.append(effect)
+        self.wctx.entities.update(self.ctx.scene_manager.dt)
+        self.vfx.update(self.ctx.scene_manager.dt)
+
+    def render(self, surf):
+        self.render_world(surf)
+        scroll = self.wctx.camera.render_scroll
+        self.wctx.entities.render(surf, scroll)
+        self.vfx.render(surf, scroll)
+
+
+def run(entities: int = 2000, frames: int = 120):
+    settings = GameSettings()
+    with tempfile.TemporaryDirectory() as path:
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+        write_synthetic_world(path, ROOMS_X, ROOMS_Y, settings)
+        resource_paths = replace(ResourcePaths(), rooms=path)
+        print(f"{entities} entities in {ROOMS_X * ROOMS_Y} rooms, {frames} frames")
+        print(f"  {'culling':>7} " + " ".join(f"{stage:>16}" for stage in STAGES)
+              + " " + " ".join(f"{name + ' drawn/culled':>24}" for name in COUNTERS))
+        for culling in (False, True):
+            game_settings = replace(settings, room_cache=False, render_culling=culling)
+            runner = HeadlessRunner(lambda ctx: CullingWorld(ctx, entities), game_settings=game_settings,
+                                    resource_paths=resource_paths)
+            runner.scene.script(runner.input, frames + 30)
+            stats = runner.run(frames, warmup=30)
+            counters = PROFILER.counter_summary()
+            drawn = []
+            for name in COUNTERS:
+                shown = counters.get(f"{name}.drawn", {}).get("mean")
+                culled = counters.get(f"{name}.culled", {}).get("mean", 0)
+                # without culling nothing is counted, everything is drawn
+                drawn.append("all" if shown is None else f"{shown:.0f}/{culled:.0f}")
+            print(f"  {str(culling):>7} " + " ".join(f"{stats[stage]['p50']:16.3f}" for stage in STAGES)
+                  + " " + " ".join(f"{text:>24}" for text in drawn))
+            runner.scene.exit_scene()
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,113 @@
+"""
+Entity render benchmark, 1,000 sprites on a few render layers. Compares drawing every entity with its own blit, the
+way Manager.render did before the draw queue, with Manager.render submitting to the DrawQueue, with and without
+y sorting. Culling is off so every path draws all sprites. The paths take turns for a number of rounds and the
+fastest round of each is reported, which keeps the numbers comparable on a busy machine.
+
+    python -m benchmarks.draw_queue [sprites] [frames] [rounds]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import replace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from pygame import Vector2
+
+from benchmarks.frame_times import BenchmarkScene, Focus
+from benchmarks.synthetic_world import write_synthetic_world
+from engine.config.projectconfig import GameSettings, ResourcePaths
+from engine.core.headless import HeadlessRunner
+from engine.entities.base.entity import Entity
+from engine.entities.entitymanager import Manager
+
+LAYERS = 4
+
+
+class Sprites(BenchmarkScene):
+    def __init__(self, ctx, sprites: int = 1000):
+        super().__init__(ctx)
+        self.name = "sprites"
+        self.amount = sprites
+
+    def load_scene(self):
+        settings = self.ctx.game_settings
+        self.focus = Focus(self.ctx, (settings.room_width / 2, settings.room_height / 2), 0)
+        self.setup_world()
+        self.wctx.set_entities(Manager(self.ctx, self.wctx))
+        self.wctx.entities.instantiate_entities(self.wctx.tilemap.get_all_entity_data())
+        rnd = random.Random(16)
+        images = []
+        for i in range(8):
+            image = pygame.Surface((8 + i, 12), pygame.SRCALPHA)
+            image.fill((40 + i * 25, 200, 120, 255))
+            images.append(image)
+        for _ in range(self.amount):
+            position = Vector2(rnd.uniform(8, settings.room_width - 8), rnd.uniform(12, settings.room_height - 14))
+            entity = Entity(self.ctx, self.wctx, position, width=8, height=12)
+            entity.set_image(rnd.choice(images))
+            entity.render_priority = rnd.randrange(LAYERS)
+            self.wctx.entities.add_entity(entity)
+
+    def update(self):
+        self.update_world()
+        self.wctx.entities.update(self.ctx.scene_manager.dt)
+
+
+def render_each(manager: Manager, surf: pygame.Surface, offset) -> None:
+    # the loop of Manager.render before the draw queue, without drawing the global entities once per type
+    front = []
+    for entity in manager.get_all_entities():
+        if entity.render_priority:
+            front.append(entity)
+            continue
+        entity.render(surf, offset)
+    for entity in front:
+        entity.render(surf, offset)
+
+
+def run(sprites: int = 1000, frames: int = 30, rounds: int = 20):
+    settings = GameSettings()
+    with tempfile.TemporaryDirectory() as path:
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+        write_synthetic_world(path, 1, 1, settings)
+        resource_paths = replace(ResourcePaths(), rooms=path)
+        surf = pygame.Surface((settings.room_width, settings.room_height))
+        print(f"{sprites} sprites on {LAYERS} layers, best of {rounds} rounds of {frames} frames")
+        print(f"  {'render':>16} {'ms per frame':>13} {'batches':>8}")
+        runners = {}
+        for y_sort in (False, True):
+            game_settings = replace(settings, room_cache=False, entity_y_sort=y_sort, render_culling=False)
+            runners[y_sort] = HeadlessRunner(lambda ctx: Sprites(ctx, sprites), game_settings=game_settings,
+                                             resource_paths=resource_paths)
+            runners[y_sort].step()
+        manager = runners[False].scene.wctx.entities
+        sorted_manager = runners[True].scene.wctx.entities
+        paths = {
+            "per entity blit": lambda: render_each(manager, surf, (0, 0)),
+            "draw queue": lambda: manager.render(surf, (0, 0)),
+            "draw queue y": lambda: sorted_manager.render(surf, (0, 0)),
+        }
+        best = dict.fromkeys(paths, float("inf"))
+        for _ in range(rounds):
+            for name, render in paths.items():
+                start = time.perf_counter()
+                for _ in range(frames):
+                    render()
+                best[name] = min(best[name], (time.perf_counter() - start) * 1000 / frames)
+        batches = {"per entity blit": sprites, "draw queue": manager.draw_queue.batches,
+                   "draw queue y": sorted_manager.draw_queue.batches}
+        for name in paths:
+            print(f"  {name:>16} {best[name]:13.3f} {batches[name]:8}")
+        for runner in runners.values():
+            runner.scene.exit_scene()
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:4]))
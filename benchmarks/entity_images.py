@@ -0,0 +1,108 @@
+"""
+Entity image benchmark, rendering entities with flip, scale and opacity through Entity.img. Compares the old
+property, which copied the frame and transformed it on every read, with the shared SpriteTransformCache and checks
+that both produce the same pixels.
+
+    python -m benchmarks.entity_images [entities] [frames]
+"""
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from pygame import Vector2
+
+from benchmarks.sprite_batch import make_atlas
+from engine.entities.base.entity import Entity
+
+
+class FrameCycle:
+    """
+    Stand in for an animation, steps through a few frames
+    """
+
+    def __init__(self, frames: list[pygame.Surface]):
+        self.frames = frames
+        self.index = 0
+
+    def play(self, dt):
+        self.index = (self.index + 1) % len(self.frames)
+
+    def get_current_animation_frame(self) -> pygame.Surface:
+        return self.frames[self.index]
+
+    def get_offset(self):
+        return 0, 0
+
+
+def legacy_img(entity: Entity) -> pygame.Surface:
+    # Entity.img before the transform cache
+    if not entity.active_animation:
+        img = entity.current_image
+    else:
+        entity.set_image(entity.active_animation.get_current_animation_frame())
+        img = entity.current_image
+    if entity.scale != [1, 1]:
+        img = pygame.transform.scale(img, (max(1, int(entity.scale[0] * entity.image_base_dimensions[0])),
+                                           max(1, int(entity.scale[1] * entity.image_base_dimensions[1]))))
+    if any(entity.flip) and img:
+        img = pygame.transform.flip(img, entity.flip[0], entity.flip[1])
+    if entity.opacity != 255:
+        img.set_alpha(entity.opacity)
+    return img
+
+
+def legacy_render(entity: Entity, surf: pygame.Surface) -> None:
+    # the old render read img four times
+    if legacy_img(entity):
+        surf.blit(legacy_img(entity), (int(entity.position[0] - legacy_img(entity).get_width() // 2),
+                                       int(entity.position[1] - legacy_img(entity).get_height())))
+
+
+def make_entities(amount: int) -> list[Entity]:
+    atlas = make_atlas()
+    rng = random.Random(16)
+    wctx = SimpleNamespace(entities=None)
+    entities = []
+    for _ in range(amount):
+        entity = Entity(None, wctx, Vector2(rng.randrange(16, 400), rng.randrange(16, 300)), width=16, height=16)
+        if rng.random() < 0.7:
+            entity.active_animation = FrameCycle([rng.choice(atlas) for _ in range(4)])
+        else:
+            entity.set_image(rng.choice(atlas))
+        entity.flip = [rng.random() < 0.5, False]
+        entity.scale = rng.choice(([1, 1], [1, 1], [2, 2]))
+        entity.opacity = rng.choice((255, 255, 128))
+        entities.append(entity)
+    return entities
+
+
+def run(entities: int = 500, frames: int = 120):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    print(f"{entities} entities, {frames} frames")
+    results = []
+    for name, render in (("copy + transform", legacy_render), ("transform cache", Entity.render)):
+        random.seed(16)
+        group = make_entities(entities)
+        surf = pygame.Surface((416, 320))
+        start = time.perf_counter()
+        for _ in range(frames):
+            surf.fill((0, 0, 0))
+            for entity in group:
+                if entity.active_animation:
+                    entity.active_animation.play(0)
+                render(entity, surf)
+        elapsed = (time.perf_counter() - start) / frames
+        results.append(pygame.image.tobytes(surf, "RGB"))
+        print(f"  {name:18} {elapsed * 1000:8.2f} ms per frame")
+    cache = Entity.transform_cache
+    print(f"  identical {results[0] == results[1]}, {len(cache)} variants, hit rate {cache.hit_rate:.3f}")
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,112 @@
+"""
+Entity spawn benchmark, a barrage of short lived projectiles. Compares constructing every projectile with spawning
+them from an EntityPool of the Manager and reports the entity update time plus the allocations per frame: the
+constructed entities and the peak of the memory traced by tracemalloc during the frame.
+
+    python -m benchmarks.entity_pool [spawns per frame] [frames]
+"""
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from dataclasses import replace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from pygame import Vector2
+
+from benchmarks.frame_times import BenchmarkScene, Focus
+from benchmarks.synthetic_world import write_synthetic_world
+from engine.config.projectconfig import GameSettings, ResourcePaths
+from engine.core.headless import HeadlessRunner
+from engine.entities.base.entity import Entity
+from engine.entities.entitymanager import Manager
+
+
+class Projectile(Entity):
+    constructed = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        Projectile.constructed += 1
+        self.reset_entity(**kwargs)
+
+    def reset_entity(self, velocity=(0, 0), lifetime: float = 0.5, **kwargs):
+        self.velocity.update(velocity)
+        self.lifetime = lifetime
+
+    def update(self, dt):
+        self.position += self.velocity * dt
+        self.lifetime -= dt
+        if self.lifetime <= 0:
+            self.alive = False
+        return super().update(dt)
+
+
+class Barrage(BenchmarkScene):
+    def __init__(self, ctx, spawns: int = 100, pooled: bool = False):
+        super().__init__(ctx)
+        self.name = "barrage"
+        self.spawns = spawns
+        self.pooled = pooled
+        self.rnd = random.Random(16)
+
+    def load_scene(self):
+        settings = self.ctx.game_settings
+        self.focus = Focus(self.ctx, (settings.room_width * 1.5, settings.room_height * 1.5), 0)
+        self.setup_world()
+        self.wctx.set_entities(Manager(self.ctx, self.wctx))
+        self.wctx.entities.instantiate_entities(self.wctx.tilemap.get_all_entity_data())
+        if self.pooled:
+            self.wctx.entities.pool(Projectile, capacity=self.spawns * 60)
+
+    def update(self):
+        self.update_world()
+        entities = self.wctx.entities
+        rnd = self.rnd
+        for _ in range(self.spawns):
+            velocity = Vector2(rnd.uniform(-120, 120), rnd.uniform(-120, 120))
+            entities.spawn(Projectile, self.focus.position, width=2, height=2, velocity=velocity,
+                           lifetime=rnd.uniform(0.2, 0.8))
+        entities.update(self.ctx.scene_manager.dt)
+
+    def render(self, surf):
+        self.render_world(surf)
+
+
+def run(spawns: int = 100, frames: int = 120):
+    settings = GameSettings()
+    with tempfile.TemporaryDirectory() as path:
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+        write_synthetic_world(path, 3, 3, settings)
+        resource_paths = replace(ResourcePaths(), rooms=path)
+        game_settings = replace(settings, room_cache=False)
+        print(f"{spawns} projectiles spawned per frame, {frames} frames")
+        print(f"  {'spawn':>6} {'update p50 ms':>14} {'p95 ms':>8} {'constructed':>12} {'peak KB':>8}")
+        for pooled in (False, True):
+            runner = HeadlessRunner(lambda ctx: Barrage(ctx, spawns, pooled), game_settings=game_settings,
+                                    resource_paths=resource_paths)
+            # the first second fills the pool, after that the projectiles die as fast as they are spawned
+            stats = runner.run(frames, warmup=60)["entities.update"]
+            constructed = Projectile.constructed
+            peaks = []
+            tracemalloc.start()
+            for _ in range(frames):
+                tracemalloc.reset_peak()
+                start = tracemalloc.get_traced_memory()[0]
+                runner.step()
+                peaks.append(tracemalloc.get_traced_memory()[1] - start)
+            tracemalloc.stop()
+            per_frame = (Projectile.constructed - constructed) / frames
+            peaks.sort()
+            print(f"  {'pool' if pooled else 'new':>6} {stats['p50']:14.3f} {stats['p95']:8.3f} {per_frame:12.1f} "
+                  f"{peaks[len(peaks) // 2] / 1024:8.1f}")
+            runner.scene.exit_scene()
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,109 @@
+"""
+Entity update benchmark, 10k walkers spread over a world of many rooms with the focus walking through it. Compares
+Manager.update over all entities with the UpdateScheduler that only updates the entities around the focus and the
+camera. Walkers die after a while and are replaced, so the removal of dead entities is part of the numbers.
+
+    python -m benchmarks.entity_scheduler [entities] [frames]
+"""
+import os
+import random
+import sys
+import tempfile
+from dataclasses import replace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from pygame import Vector2
+
+from benchmarks.frame_times import BenchmarkScene, Focus, Walker
+from benchmarks.synthetic_world import write_synthetic_world
+from engine.config.projectconfig import GameSettings, ResourcePaths
+from engine.core.headless import HeadlessRunner
+from engine.entities.entitymanager import Manager
+from engine.input.input import Action
+
+ROOMS_X = 32
+ROOMS_Y = 4
+
+
+class MortalWalker(Walker):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lifetime = kwargs["lifetime"]
+
+    def update(self, dt):
+        self.lifetime -= dt
+        if self.lifetime <= 0:
+            self.alive = False
+        return super().update(dt)
+
+
+class EntityWorld(BenchmarkScene):
+    def __init__(self, ctx, entities: int = 10000):
+        super().__init__(ctx)
+        self.name = "entity_world"
+        self.amount = entities
+        self.rnd = random.Random(16)
+        self.sprite = pygame.Surface((6, 6))
+
+    def spawn(self) -> None:
+        settings = self.ctx.game_settings
+        rnd = self.rnd
+        position = Vector2(rnd.uniform(4, settings.room_width * ROOMS_X - 10),
+                           rnd.uniform(4, settings.room_height * ROOMS_Y - 10))
+        walker = MortalWalker(self.ctx, self.wctx, position, width=6, height=6,
+                              speed=rnd.choice((-1, 1)) * rnd.uniform(10, 40), lifetime=rnd.uniform(2, 30))
+        walker.set_image(self.sprite)
+        self.wctx.entities.add_entity(walker)
+
+    def load_scene(self):
+        settings = self.ctx.game_settings
+        self.focus = Focus(self.ctx, (settings.room_width / 2, settings.room_height * 1.5), 120)
+        self.setup_world()
+        self.wctx.set_entities(Manager(self.ctx, self.wctx))
+        self.wctx.entities.instantiate_entities(self.wctx.tilemap.get_all_entity_data())
+        for _ in range(self.amount):
+            self.spawn()
+
+    def script(self, scripted_input, frames: int) -> None:
+        scripted_input.hold(Action.MOVE_RIGHT, 0, frames)
+
+    def update(self):
+        self.update_world()
+        entities = self.wctx.entities
+        before = len(entities.get_all_entities())
+        entities.update(self.ctx.scene_manager.dt)
+        # keeps the amount of walkers constant, the replacements are added in the next update
+        for _ in range(max(0, before - len(entities.get_all_entities()))):
+            self.spawn()
+
+    def render(self, surf):
+        self.render_world(surf)
+
+
+def run(entities: int = 10000, frames: int = 60):
+    settings = GameSettings()
+    with tempfile.TemporaryDirectory() as path:
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+        write_synthetic_world(path, ROOMS_X, ROOMS_Y, settings)
+        resource_paths = replace(ResourcePaths(), rooms=path)
+        print(f"{entities} entities in {ROOMS_X * ROOMS_Y} rooms, {frames} frames")
+        print(f"  {'scheduler':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'updated':>8}")
+        for scheduler in (False, True):
+            game_settings = replace(settings, room_cache=False, entity_scheduler=scheduler)
+            runner = HeadlessRunner(lambda ctx: EntityWorld(ctx, entities), game_settings=game_settings,
+                                    resource_paths=resource_paths)
+            runner.scene.script(runner.input, frames + 2)
+            stats = runner.run(frames, warmup=2)["entities.update"]
+            manager = runner.scene.wctx.entities
+            counts = manager.scheduler.counts if manager.scheduler else {"active": len(manager.get_all_entities())}
+            updated = counts["active"] + counts.get("far", 0) + counts.get("woken", 0)
+            print(f"  {str(scheduler):>9} {stats['p50']:8.2f} {stats['p95']:8.2f} {stats['p99']:8.2f} {updated:8}")
+            runner.scene.exit_scene()
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,236 @@
+"""
+Frame time benchmark suite. Runs scripted scenes headless with a fixed seed and reports p50/p95/p99 of every
+subsystem stage recorded by the PROFILER, so regressions show up as numbers. The scenes add a few stages of their
+own on top of the ones the engine records.
+
+    python -m benchmarks.frame_times [frames] [json_path]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+from dataclasses import replace
+from types import SimpleNamespace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from pygame import Color, Vector2
+
+from benchmarks.synthetic_world import write_synthetic_world
+from engine.config.projectconfig import GameSettings, ResourcePaths
+from engine.core.headless import HeadlessRunner
+from engine.core.profiler import PERCENTILES, PROFILER
+from engine.core.tilemap import Tilemap
+from engine.entities.base.entity import Entity
+from engine.entities.base.particle_emitter import ParticleEmitter
+from engine.entities.base.particle_settings import MovementSettings, ParticleBaseSettings
+from engine.entities.entitymanager import Manager
+from engine.input.input import Action
+from engine.input.scripted import ScriptedInput
+from engine.render.camera import Camera
+from engine.scene.scene import Scene
+
+
+class Walker(Entity):
+    """
+    Walks back and forth and collides with the tilemap, a stand in for a simple enemy
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.velocity = Vector2(kwargs["speed"], 0)
+
+    def update(self, dt):
+        result = self.wctx.tilemap.move_and_collide(self.rect, self.velocity * dt)
+        self.position.update(result.position)
+        if result.wall:
+            self.velocity.x *= -1
+        return super().update(dt)
+
+
+class Focus:
+    """
+    The camera target, moved by the scripted input
+    """
+
+    def __init__(self, ctx, position, speed: float):
+        self.ctx = ctx
+        self.position = Vector2(position)
+        self.speed = speed
+
+    def update(self, dt: float) -> None:
+        x, y = self.ctx.input.get_move_direction()
+        self.position += Vector2(x, y) * self.speed * dt
+
+
+class BenchmarkScene(Scene):
+    def __init__(self, ctx):
+        super().__init__(ctx)
+        self.focus: Focus | None = None
+
+    def setup_world(self, streaming: bool = False) -> None:
+        self.wctx.set_camera(Camera(self.ctx, self.wctx))
+        tilemap = Tilemap(self.ctx)
+        tilemap.load_room_ldtk(streaming=streaming)
+        self.wctx.set_tilemap(tilemap)
+        self.wctx.camera.set_target(self.focus)
+
+    def update_world(self) -> None:
+        self.focus.update(self.ctx.scene_manager.dt)
+        with PROFILER.stage("camera"):
+            self.wctx.camera.update(self.ctx.scene_manager.dt)
+
+    def render_world(self, surf) -> None:
+        self.wctx.tilemap.render(surf, self.wctx.camera.render_view)
+
+    def script(self, scripted_input: ScriptedInput, frames: int) -> None:
+        """
+        Fills the scripted input for a run of frames
+        """
+        pass
+
+    def exit_scene(self):
+        tilemap = self.wctx.tilemap
+        if tilemap and tilemap.streamer:
+            tilemap.streamer.shutdown()
+
+
+class ParticleStorm(BenchmarkScene):
+    """
+    Emitters spawning every frame, SHOOT triggers a large burst in all of them
+    """
+
+    def __init__(self, ctx, emitters: int = 8, burst: int = 2000):
+        super().__init__(ctx)
+        self.name = "particle_storm"
+        self.burst = burst
+        self.amount = emitters
+        self.emitters: list[ParticleEmitter] = []
+
+    def load_scene(self):
+        self.wctx.set_camera(SimpleNamespace(render_scroll=Vector2(0, 0)))
+        width = self.ctx.window_settings.game_resolution_width
+        for i in range(self.amount):
+            emitter = ParticleEmitter(self.ctx, self.wctx, Vector2(width * (i + 0.5) / self.amount, 60),
+                                      width=8, height=8)
+            emitter.apply_config(ParticleBaseSettings(
+                color_start=Color(190, 74, 47), color_end=Color(234, 212, 170), end_alpha=0, start_size=3,
+                end_size=1, movement=MovementSettings(mode="cubic"), min_velocity=10, max_velocity=80,
+                random_x_direction=True, random_y_direction=True, gravity=30, lifetime=1.5, glow_size=2,
+                backend="ARRAY", color_quantization=8, alpha_quantization=16,
+            ))
+            emitter.set_state(False)
+            self.emitters.append(emitter)
+
+    def script(self, scripted_input: ScriptedInput, frames: int) -> None:
+        for frame in range(30, frames, 120):
+            scripted_input.hold(Action.SHOOT, frame, 1)
+
+    def update(self):
+        burst = self.ctx.input.pressed(Action.SHOOT)
+        for emitter in self.emitters:
+            with PROFILER.stage("particles.spawn"):
+                emitter.spawn_particle_group(self.burst if burst else 20)
+            emitter.update(self.ctx.scene_manager.dt)
+
+    def render(self, surf):
+        for emitter in self.emitters:
+            emitter.render(surf)
+
+
+class EntityRoom(BenchmarkScene):
+    """
+    A room with walking entities colliding with the tilemap, the focus is moved around by the script
+    """
+
+    def __init__(self, ctx, entities: int = 500):
+        super().__init__(ctx)
+        self.name = "entity_room"
+        self.amount = entities
+
+    def load_scene(self):
+        settings = self.ctx.game_settings
+        self.focus = Focus(self.ctx, (settings.room_width / 2, settings.room_height / 2), 60)
+        self.setup_world()
+        self.wctx.set_entities(Manager(self.ctx, self.wctx))
+        self.wctx.entities.instantiate_entities(self.wctx.tilemap.get_all_entity_data())
+        sprite = pygame.Surface((6, 6))
+        sprite.fill((90, 200, 120))
+        rnd = random.Random(16)
+        for _ in range(self.amount):
+            position = Vector2(rnd.uniform(4, settings.room_width - 10), rnd.uniform(4, settings.room_height - 10))
+            walker = Walker(self.ctx, self.wctx, position, width=6, height=6,
+                            speed=rnd.choice((-1, 1)) * rnd.uniform(10, 40))
+            walker.set_image(sprite)
+            self.wctx.entities.add_entity(walker)
+
+    def script(self, scripted_input: ScriptedInput, frames: int) -> None:
+        scripted_input.hold(Action.MOVE_RIGHT, 0, frames // 2).hold(Action.MOVE_LEFT, frames // 2, frames)
+
+    def update(self):
+        self.update_world()
+        self.wctx.entities.update(self.ctx.scene_manager.dt)
+
+    def render(self, surf):
+        self.render_world(surf)
+        self.wctx.entities.render(surf, self.wctx.camera.render_scroll)
+
+
+class RoomTransitions(BenchmarkScene):
+    """
+    The focus walks through a streamed world, crossing a room border every second or so
+    """
+
+    def __init__(self, ctx):
+        super().__init__(ctx)
+        self.name = "room_transitions"
+
+    def load_scene(self):
+        settings = self.ctx.game_settings
+        self.focus = Focus(self.ctx, (settings.room_width / 2, settings.room_height / 2), settings.room_width)
+        self.setup_world(streaming=True)
+
+    def script(self, scripted_input: ScriptedInput, frames: int) -> None:
+        scripted_input.hold(Action.MOVE_RIGHT, 0, frames).hold(Action.MOVE_DOWN, frames // 2, 20)
+
+    def update(self):
+        self.update_world()
+        with PROFILER.stage("rooms.stream"):
+            self.wctx.tilemap.stream_rooms(self.focus.position)
+
+    def render(self, surf):
+        self.render_world(surf)
+
+
+def run(frames: int = 600, json_path: str = None):
+    settings = GameSettings()
+    results = {}
+    with tempfile.TemporaryDirectory() as path:
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+        write_synthetic_world(path, 12, 3, settings)
+        resource_paths = replace(ResourcePaths(), rooms=path)
+        game_settings = replace(settings, room_cache=False)
+        for scene in (ParticleStorm, EntityRoom, RoomTransitions):
+            runner = HeadlessRunner(scene, game_settings=game_settings, resource_paths=resource_paths)
+            runner.scene.script(runner.input, frames)
+            results[runner.scene.name] = runner.run(frames, warmup=2)
+            runner.scene.exit_scene()
+            print_summary(runner.scene.name, results[runner.scene.name])
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"frames": frames, "scenes": results}, f, indent=2)
+
+
+def print_summary(name: str, summary: dict) -> None:
+    print(name)
+    print(f"  {'stage':18}" + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES) + f"{'max ms':>10}")
+    for stage, stats in summary.items():
+        print(f"  {stage:18}" + "".join(f"{stats[f'p{p}']:10.3f}" for p in PERCENTILES) + f"{stats['max']:10.3f}")
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:2]), *sys.argv[2:3])
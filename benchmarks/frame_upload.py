@@ -0,0 +1,84 @@
+"""
+Full frame upload benchmark, pygame.image.tobytes with a cpu flip versus SurfaceUploader (PBO ring updating the
+texture a frame late, zero copy, flip through the uv coordinates) at several internal resolutions. Uses a standalone
+context.
+
+    python -m benchmarks.frame_upload [frames]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import moderngl
+import numpy as np
+import pygame
+
+from benchmarks.sprite_batch import create_context
+from engine.render.moderngl.upload import SurfaceUploader
+
+RESOLUTIONS = ((416, 176), (1280, 720), (1920, 1080), (3840, 2160))
+
+
+def random_surface(size) -> pygame.Surface:
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    pixels = np.random.default_rng(16).integers(0, 256, (size[0], size[1], 4), dtype=np.uint8)
+    pygame.surfarray.pixels3d(surface)[:] = pixels[..., :3]
+    pygame.surfarray.pixels_alpha(surface)[:] = pixels[..., 3]
+    return surface
+
+
+def matches(gl_ctx: moderngl.Context, surface: pygame.Surface, texture: moderngl.Texture, top_down: bool) -> bool:
+    """
+    Copies the texture into a framebuffer with the shaders swizzle applied and compares it to the surface
+    """
+    fbo = gl_ctx.simple_framebuffer(surface.get_size())
+    program = gl_ctx.program(
+        vertex_shader="#version 330\nin vec2 in_vert; out vec2 v_tex; uniform bool top_down;\n"
+                      "void main() { v_tex = in_vert * 0.5 + 0.5; if (top_down) v_tex.y = 1.0 - v_tex.y;\n"
+                      "gl_Position = vec4(in_vert, 0.0, 1.0); }",
+        fragment_shader="#version 330\nuniform sampler2D tex; in vec2 v_tex; out vec4 f_color;\n"
+                        "void main() { f_color = texture(tex, v_tex); }",
+    )
+    program["top_down"].value = top_down
+    quad = gl_ctx.buffer(np.array([-1, -1, 1, -1, -1, 1, 1, 1], dtype="f4"))
+    fbo.use()
+    gl_ctx.disable(moderngl.BLEND)
+    texture.use(0)
+    gl_ctx.simple_vertex_array(program, quad, "in_vert").render(moderngl.TRIANGLE_STRIP)
+    return fbo.read(components=4) == pygame.image.tobytes(surface, "RGBA", True)
+
+
+def run(frames: int = 60):
+    pygame.init()
+    gl_ctx = create_context()
+    print(f"{frames} frames, {gl_ctx.info['GL_RENDERER']}")
+    for size in RESOLUTIONS:
+        surface = random_surface(size)
+        texture = gl_ctx.texture(size, 4)
+        texture.filter = (moderngl.NEAREST, moderngl.NEAREST)
+        start = time.perf_counter()
+        for _ in range(frames):
+            texture.write(pygame.image.tobytes(surface, "RGBA", True))
+        gl_ctx.finish()
+        tobytes = (time.perf_counter() - start) / frames
+
+        texture = gl_ctx.texture(size, 4)
+        texture.filter = (moderngl.NEAREST, moderngl.NEAREST)
+        uploader = SurfaceUploader(gl_ctx, surface, texture)
+        start = time.perf_counter()
+        for _ in range(frames):
+            uploader.upload()
+        gl_ctx.finish()
+        streamed = (time.perf_counter() - start) / frames
+        # the texture is a frame behind the surface
+        uploader.flush()
+        ok = matches(gl_ctx, surface, texture, uploader.top_down)
+        print(f"  {size[0]:4}x{size[1]:<4}  tobytes {tobytes * 1000:7.2f} ms  pbo {streamed * 1000:7.2f} ms  "
+              f"zero copy {uploader.zero_copy}  identical {ok}")
+        uploader.release()
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,59 @@
+"""
+Particle benchmark, OBJECT versus ARRAY backend of the ParticleEmitter with the same amount of live particles.
+
+    python -m benchmarks.particles [particles] [frames]
+"""
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from pygame import Color, Vector2
+
+from engine.entities.base.particle_emitter import ParticleEmitter
+from engine.entities.base.particle_settings import MovementSettings, ParticleBaseSettings
+
+
+def make_emitter(backend: str, particles: int) -> ParticleEmitter:
+    wctx = SimpleNamespace(entities=None, camera=SimpleNamespace(render_scroll=Vector2(0, 0)))
+    emitter = ParticleEmitter(None, wctx, Vector2(200, 150), width=64, height=16)
+    # lifetime longer than the default run so no particle dies, the spawn is done up front
+    emitter.apply_config(ParticleBaseSettings(
+        spawn_delay=1e9, color_start=Color(190, 74, 47), color_end=Color(234, 212, 170), start_alpha=255,
+        end_alpha=0, start_size=4, end_size=1, movement=MovementSettings(mode="cubic"), min_velocity=10,
+        max_velocity=60, random_x_direction=True, random_y_direction=True, gravity=20, lifetime=2,
+        backend=backend,
+    ))
+    emitter.spawn_particle_group(particles)
+    return emitter
+
+
+def run(particles: int = 20000, frames: int = 120):
+    pygame.init()
+    surf = pygame.display.set_mode((400, 300))
+    dt = 1 / 120
+    print(f"{particles} particles, {frames} frames")
+    for backend in ("OBJECT", "ARRAY"):
+        random.seed(16)
+        emitter = make_emitter(backend, particles)
+        start = time.perf_counter()
+        for _ in range(frames):
+            emitter.update(dt)
+        update = (time.perf_counter() - start) / frames
+        start = time.perf_counter()
+        for _ in range(frames):
+            emitter.render(surf)
+        render = (time.perf_counter() - start) / frames
+        cache = emitter.sprite_cache
+        stats = emitter.sprite_stats
+        print(f"  {backend:6}  update {update * 1000:8.2f} ms  render {render * 1000:8.2f} ms  "
+              f"sprites {len(cache)} hits {stats.hits} misses {stats.misses} hit rate {stats.hit_rate:.1%}")
+        cache.clear()
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,98 @@
+"""
+Line of sight benchmark, every enemy around the player checks whether it can see the player once per frame.
+Compares the deprecated Line.raycast over a dict of solid tiles, one Tilemap.line_of_sight per enemy and a single
+Tilemap.line_of_sight_batch for all of them.
+
+    python -m benchmarks.raycast [enemies] [frames]
+"""
+import os
+import sys
+import tempfile
+import time
+from dataclasses import replace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+from pygame import Vector2
+
+from benchmarks.frame_times import BenchmarkScene, Focus
+from benchmarks.synthetic_world import write_synthetic_world
+from engine.config.projectconfig import GameSettings, ResourcePaths
+from engine.core.engine_core_classes import Line
+from engine.core.headless import HeadlessRunner
+
+ROOMS_X = 3
+ROOMS_Y = 3
+# enemies are placed this far around the player, so many rays cross room borders
+RADIUS = 200
+
+
+class World(BenchmarkScene):
+    def __init__(self, ctx):
+        super().__init__(ctx)
+        self.name = "raycast_world"
+
+    def load_scene(self):
+        settings = self.ctx.game_settings
+        self.focus = Focus(self.ctx, (settings.room_width * 1.5, settings.room_height * 1.5), 0)
+        self.setup_world()
+
+    def update(self):
+        self.update_world()
+
+
+def run(enemies: int = 200, frames: int = 100):
+    settings = GameSettings()
+    with tempfile.TemporaryDirectory() as path:
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+        write_synthetic_world(path, ROOMS_X, ROOMS_Y, settings)
+        runner = HeadlessRunner(World, game_settings=replace(settings, room_cache=False),
+                                resource_paths=replace(ResourcePaths(), rooms=path))
+        runner.step()
+        tilemap = runner.scene.wctx.tilemap
+        grid = tilemap.collision
+        ts = settings.tile_size
+        tile_map = {(int(x) + grid.origin[0], int(y) + grid.origin[1]): True for y, x in zip(*np.nonzero(grid.solid))}
+
+        rng = np.random.default_rng(16)
+        player = np.array(runner.scene.focus.position)
+        angle = rng.uniform(0, 2 * np.pi, enemies)
+        distance = rng.uniform(16, RADIUS, enemies)
+        starts = player + np.column_stack((np.cos(angle), np.sin(angle))) * distance[:, None]
+        ends = np.repeat(player[None, :], enemies, axis=0)
+        lines = [Line(x, y, *player) for x, y in starts]
+        target = Vector2(*player)
+
+        def legacy():
+            # walks until it meets a tile, the hit only blocks the view if it is closer than the player
+            seen = 0
+            for line, start in zip(lines, starts):
+                point = line.raycast(tile_map, target, ts)
+                if point is False or point.distance_to(start) >= target.distance_to(start):
+                    seen += 1
+            return seen
+
+        def single():
+            return sum(tilemap.line_of_sight(start, end) for start, end in zip(starts.tolist(), ends.tolist()))
+
+        def batch():
+            return int(tilemap.line_of_sight_batch(starts, ends).sum())
+
+        print(f"{enemies} enemies checking the player, {frames} frames")
+        print(f"  {'query':>24} {'ms per frame':>13} {'visible':>8}")
+        for name, query in (("Line.raycast", legacy), ("line_of_sight", single), ("line_of_sight_batch", batch)):
+            visible = query()
+            start = time.perf_counter()
+            for _ in range(frames):
+                query()
+            elapsed = (time.perf_counter() - start) * 1000 / frames
+            print(f"  {name:>24} {elapsed:13.3f} {visible:8}")
+        runner.scene.exit_scene()
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:3]))
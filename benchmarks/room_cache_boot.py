@@ -0,0 +1,47 @@
+"""
+Boot benchmark for Tilemap.load_room_ldtk, LDtk simplified export versus the packed room cache.
+
+    python -m benchmarks.room_cache_boot [rooms_x rooms_y]
+"""
+import os
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from types import SimpleNamespace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from benchmarks.synthetic_world import write_synthetic_world
+from engine.config.projectconfig import GameSettings
+from engine.core.roomcache import build_room_cache
+from engine.core.tilemap import Tilemap
+
+
+def boot(ctx) -> float:
+    start = time.perf_counter()
+    Tilemap(ctx).load_room_ldtk(streaming=False)
+    return time.perf_counter() - start
+
+
+def run(rooms_x: int = 20, rooms_y: int = 20):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    with tempfile.TemporaryDirectory() as path:
+        write_synthetic_world(path, rooms_x, rooms_y)
+        ctx = SimpleNamespace(game_settings=GameSettings(), resource_paths=SimpleNamespace(rooms=path))
+        ldtk = boot(SimpleNamespace(game_settings=replace(ctx.game_settings, room_cache=False),
+                                    resource_paths=ctx.resource_paths))
+        start = time.perf_counter()
+        build_room_cache(path)
+        build = time.perf_counter() - start
+        cached = boot(ctx)
+    print(f"{rooms_x * rooms_y} rooms")
+    print(f"  ldtk export  {ldtk * 1000:8.1f} ms")
+    print(f"  room cache   {cached * 1000:8.1f} ms (build {build * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:3]))
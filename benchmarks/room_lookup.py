@@ -0,0 +1,55 @@
+"""
+Micro-benchmark for Tilemap.get_room_at_point.
+Compares the room grid lookup against the old linear scan over rooms_sorted_x for growing worlds.
+
+    python -m benchmarks.room_lookup
+"""
+import random
+import timeit
+from types import SimpleNamespace
+
+from engine.config.projectconfig import GameSettings
+from engine.core.tilemap import RoomData, Tilemap
+
+QUERIES = 10_000
+
+
+def build_tilemap(rooms_x: int, rooms_y: int) -> Tilemap:
+    settings = GameSettings()
+    tilemap = Tilemap(SimpleNamespace(game_settings=settings))
+    rooms = {}
+    for gy in range(rooms_y):
+        for gx in range(rooms_x):
+            room = RoomData(settings.tile_size)
+            room.position = [gx * settings.room_width, gy * settings.room_height]
+            room.width = settings.room_width
+            room.height = settings.room_height
+            rooms[(gx, gy)] = room
+    tilemap.register_rooms(rooms)
+    return tilemap
+
+
+def linear_lookup(tilemap: Tilemap, px, py):
+    for r in tilemap.rooms_sorted_x:
+        if r.contains(px, py):
+            return r
+    return None
+
+
+def run():
+    settings = GameSettings()
+    rnd = random.Random(16)
+    print(f"{'rooms':>8} {'linear us/query':>16} {'grid us/query':>14}")
+    for side in (5, 10, 25, 50):
+        tilemap = build_tilemap(side, side)
+        points = [
+            (rnd.uniform(0, side * settings.room_width), rnd.uniform(0, side * settings.room_height))
+            for _ in range(QUERIES)
+        ]
+        linear = timeit.timeit(lambda: [linear_lookup(tilemap, x, y) for x, y in points], number=1)
+        grid = timeit.timeit(lambda: [tilemap.get_room_at_point(x, y) for x, y in points], number=1)
+        print(f"{side * side:>8} {linear / QUERIES * 1e6:>16.2f} {grid / QUERIES * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,116 @@
+"""
+Headless benchmark of the two ModernGL render paths: software blits into the display surface plus the full frame
+upload, versus submitting to the instanced SpriteBatch. Uses a standalone context, no window is opened.
+
+    python -m benchmarks.sprite_batch [sprites] [particles] [frames]
+"""
+import os
+import random
+import sys
+import time
+from array import array
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import moderngl
+import pygame
+
+from benchmarks.particles import make_emitter
+from engine.render.moderngl.spritebatch import SpriteBatch
+from engine.render.moderngl.window import FRAGMENT_SHADER, VERTEX_SHADER
+
+RESOLUTION = (416, 176)
+
+
+def create_context() -> moderngl.Context:
+    try:
+        return moderngl.create_standalone_context()
+    except Exception:
+        # no X display, e.g. on a build server
+        return moderngl.create_standalone_context(backend="egl")
+
+
+def make_atlas() -> list[pygame.Surface]:
+    atlas = pygame.Surface((128, 128))
+    rng = random.Random(16)
+    for _ in range(2000):
+        atlas.set_at((rng.randrange(128), rng.randrange(128)), (rng.randrange(1, 256), 80, 120))
+    atlas.set_colorkey((0, 0, 0))
+    return [atlas.subsurface((x * 16, y * 16, 16, 16)) for y in range(8) for x in range(8)]
+
+
+def run(sprites: int = 2000, particles: int = 5000, frames: int = 120):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    gl_ctx = create_context()
+    gl_ctx.enable(moderngl.BLEND)
+    gl_ctx.blend_func = moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA
+    screen = gl_ctx.simple_framebuffer(RESOLUTION)
+
+    program = gl_ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
+    quad = gl_ctx.buffer(array("f", [-1.0, -1.0, 0.0, 0.0, 1.0, -1.0, 1.0, 0.0, -1.0, 1.0, 0.0, 1.0,
+                                     1.0, 1.0, 1.0, 1.0]))
+    vao = gl_ctx.simple_vertex_array(program, quad, "in_vert", "in_tex")
+    texture = gl_ctx.texture(RESOLUTION, 4)
+    display = pygame.Surface(RESOLUTION, pygame.SRCALPHA)
+    batch = SpriteBatch(gl_ctx, RESOLUTION)
+
+    frames_atlas = make_atlas()
+    rng = random.Random(16)
+    placed = [(rng.choice(frames_atlas), (rng.randrange(RESOLUTION[0]), rng.randrange(RESOLUTION[1])),
+               (rng.random() < 0.5, False)) for _ in range(sprites)]
+    random.seed(16)
+    emitter = make_emitter("ARRAY", particles)
+    emitter.update(1 / 120)
+
+    # each frame returns the time spent building the frame on the cpu, before anything is handed to OpenGL
+    def cpu_frame() -> float:
+        start = time.perf_counter()
+        display.fill((0, 0, 0, 0))
+        for img, position, flip in placed:
+            display.blit(pygame.transform.flip(img, *flip) if flip[0] else img, position)
+        emitter.render(display)
+        built = time.perf_counter() - start
+        texture.write(pygame.image.tobytes(display, "RGBA", True))
+        screen.use()
+        screen.clear()
+        texture.use(0)
+        vao.render(moderngl.TRIANGLE_STRIP)
+        return built
+
+    def gpu_frame() -> float:
+        start = time.perf_counter()
+        batch.begin()
+        for img, position, flip in placed:
+            batch.draw(img, position, flip=flip)
+        emitter.render(batch)
+        built = time.perf_counter() - start
+        batch.flush()
+        screen.use()
+        screen.clear()
+        gl_ctx.blend_func = moderngl.ONE, moderngl.ONE_MINUS_SRC_ALPHA
+        batch.target.use(0)
+        vao.render(moderngl.TRIANGLE_STRIP)
+        gl_ctx.blend_func = moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA
+        return built
+
+    print(f"{sprites} sprites, {particles} particles, {RESOLUTION[0]}x{RESOLUTION[1]}, {frames} frames, "
+          f"{gl_ctx.info['GL_RENDERER']}")
+    for name, frame in (("cpu blits + upload", cpu_frame), ("sprite batch", gpu_frame)):
+        frame()
+        gl_ctx.finish()
+        built = 0
+        start = time.perf_counter()
+        for _ in range(frames):
+            built += frame()
+            # wait for the GPU so both paths are measured end to end
+            gl_ctx.finish()
+        elapsed = (time.perf_counter() - start) / frames
+        print(f"  {name:20} {elapsed * 1000:8.2f} ms total  {built / frames * 1000:8.2f} ms building the frame")
+    # on a software rasterizer (llvmpipe) the GPU work of the batch runs on the cpu as well, compare the build times
+    print(f"  batch: {batch.draw_calls} draw calls, {batch.instances} instances, "
+          f"{batch.textures.uploads} texture uploads")
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:4]))
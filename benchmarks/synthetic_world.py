@@ -0,0 +1,42 @@
+"""
+Writes a synthetic LDtk simplified export (level folders with Collision_Layer.csv, data.json and _composite.png)
+for the benchmarks. Needs an initialized pygame.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pygame
+
+from engine.config.projectconfig import GameSettings
+
+
+def write_synthetic_world(path, rooms_x: int, rooms_y: int, settings: GameSettings = None, seed: int = 16) -> Path:
+    settings = settings or GameSettings()
+    path = Path(path)
+    rng = np.random.default_rng(seed)
+    columns = settings.room_width // settings.tile_size
+    rows = settings.room_height // settings.tile_size
+    for gy in range(rooms_y):
+        for gx in range(rooms_x):
+            folder = path / f"Level_{gy * rooms_x + gx:04d}"
+            folder.mkdir(parents=True, exist_ok=True)
+            grid = (rng.random((rows, columns)) < 0.2).astype(np.uint8)
+            (folder / "Collision_Layer.csv").write_text(
+                "".join(",".join(str(c) for c in row) + ",\n" for row in grid), encoding="utf-8"
+            )
+            level_data = {
+                "x": gx * settings.room_width,
+                "y": gy * settings.room_height,
+                "width": settings.room_width,
+                "height": settings.room_height,
+                "entities": {},
+            }
+            (folder / "data.json").write_text(json.dumps(level_data), encoding="utf-8")
+            img = pygame.Surface((settings.room_width, settings.room_height))
+            img.fill((24, 20, 37))
+            for y, x in zip(*np.nonzero(grid)):
+                img.fill((int(rng.integers(64, 255)), 110, 80),
+                         (x * settings.tile_size, y * settings.tile_size, settings.tile_size, settings.tile_size))
+            pygame.image.save(img, str(folder / "_composite.png"))
+    return path
@@ -0,0 +1,66 @@
+"""
+Texture atlas benchmark. Loads a synthetic set of sprites, sheets and images once file by file and once from a
+built atlas, and counts the root surfaces drawing all of them needs, which is the amount of textures and draw
+calls of the SpriteBatch.
+
+    python -m benchmarks.texture_atlas [files per folder]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from engine.content.atlas import ATLAS_SOURCES, TextureAtlas, build_atlas, discover_sources
+from engine.core.engine_core_funcs import load_img
+
+
+def write_sources(path: str, files: int) -> list[tuple[str, str]]:
+    rng = random.Random(16)
+    sources = []
+    for name, mode in ATLAS_SOURCES:
+        folder = os.path.join(path, name)
+        os.makedirs(folder)
+        for i in range(files):
+            surf = pygame.Surface((rng.choice((8, 16, 24, 32, 64)), rng.choice((8, 16, 24, 32, 48))), pygame.SRCALPHA)
+            surf.fill((rng.randrange(256), rng.randrange(256), rng.randrange(256), 255))
+            pygame.image.save(surf, os.path.join(folder, f"{i}.png"))
+        sources.append((folder, mode))
+    return sources
+
+
+def run(files: int = 200):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    with tempfile.TemporaryDirectory() as path:
+        sources = write_sources(path, files)
+        paths = [p for p, _ in discover_sources(sources).values()]
+
+        start = time.perf_counter()
+        single = [load_img(p, (0, 0, 0)) for p in paths]
+        single_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        build_atlas(sources, os.path.join(path, "atlas"))
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        atlas = TextureAtlas.open_if_valid(os.path.join(path, "atlas"), sources)
+        packed = [atlas.load_img(p, (0, 0, 0)) for p in paths]
+        atlas_time = time.perf_counter() - start
+
+        packed_pixels = sum(s.get_width() * s.get_height() for s in packed)
+        page_pixels = sum(p.get_width() * p.get_height() for p in atlas.pages)
+        print(f"{len(paths)} files")
+        print(f"  file by file  {single_time * 1000:8.1f} ms, {len({id(s.get_abs_parent()) for s in single})} textures")
+        print(f"  atlas         {atlas_time * 1000:8.1f} ms, {len({id(s.get_abs_parent()) for s in packed})} textures,"
+              f" {packed_pixels / page_pixels:.0%} of the page area used")
+        print(f"  atlas build   {build_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:2]))
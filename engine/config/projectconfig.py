@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Type
+from typing import Literal, Type
 
 from pygame import Color
 from engine.core.engine_core_funcs import resource_path
@@ -14,6 +14,9 @@ class WindowSettings:
     window_width: int = game_resolution_width * resoloution_scale
     window_height: int = game_resolution_height * resoloution_scale
     window_bg_color: Color = (255, 255, 255)
+    # create a GPU SpriteBatch in the ModernGL window, world rendering submits to Window.world_target. Scenes that
+    # enable it can only blit in Scene.render, pygame.draw and fill go to Scene.render_hud. Off keeps the CPU path
+    sprite_batch: bool = False
 
 
 @dataclass(frozen=True)
@@ -25,6 +28,61 @@ class GameSettings:
     rooms_y: int = 50
     world_width: int = room_width * rooms_x
     world_height: int = room_height * rooms_y
+    # only load room metadata at boot and stream collision and images in around the focus room
+    room_streaming: bool = False
+    room_stream_max_rooms: int = 16
+    room_stream_max_megabytes: float = 64
+    # load rooms from the packed cache of engine.core.roomcache when it exists and is up to date
+    room_cache: bool = True
+    # edge length in tiles and amount of the baked tile render chunks kept around the view
+    render_chunk_size: int = 16
+    render_chunk_cache_size: int = 32
+    # cell edge length in pixels of the entity spatial index
+    entity_cell_size: int = 64
+    # update only the entities around the focus entity and the camera, see engine.entities.scheduler. Within the
+    # active radius in pixels every tick, within the far radius every far interval ticks, beyond that not at all
+    entity_scheduler: bool = False
+    entity_active_radius: int = 320
+    entity_far_radius: int = 960
+    entity_far_interval: int = 4
+    # ticks a woken entity is updated at full rate wherever it is
+    entity_wake_ticks: int = 60
+    # draw the entities of a render layer ordered by the y of their position instead of grouped by their type, see
+    # Manager.render
+    entity_y_sort: bool = False
+    # draw only the entities, effects and particles inside the camera view, see Manager.render
+    render_culling: bool = True
+    # pixels the view is grown by for culling, at least how far images reach past the rect of their entity
+    render_cull_margin: int = 32
+    # simulation ticks per second, rendering runs at the display rate and interpolates between ticks
+    tick_rate: int = 60
+    # most ticks simulated in one frame before the simulation starts to lag behind the real time
+    max_ticks_per_frame: int = 5
+    # run exactly one tick per frame without a frame cap, for headless benchmarks
+    uncapped_simulation: bool = False
+    # EAGER bakes flipped and rotated animation frames at load time within the budget and the rest on first use,
+    # LAZY bakes every variant on first use
+    animation_bake: Literal["EAGER", "LAZY"] = "EAGER"
+    animation_bake_megabytes: float = 32
+    # rotation angles per full turn baked for rotating entities, 0 rotates the frame every time it is drawn
+    animation_rotation_steps: int = 0
+    # play the animations the updated entities scheduled in one pass per tick after the scene update instead of in
+    # every Entity.update
+    animation_batched: bool = False
+    # batched animations of entities culled by the last render keep their frame instead of playing on, see
+    # Manager.render
+    animation_skip_culled: bool = False
+    # hand out images from the pages of engine.content.atlas, packed at boot if the built atlas is missing or stale
+    texture_atlas: bool = True
+    texture_atlas_page_size: int = 2048
+    # threads decoding image and sound files at boot, 0 for the cpu count capped at 8
+    asset_loader_workers: int = 0
+    # EAGER loads every asset at boot, LAZY only the atlas pages and the rest on first use by a scene
+    content_loading: Literal["EAGER", "LAZY"] = "EAGER"
+    # assets no scene references are evicted least recently used first beyond this
+    content_budget_megabytes: float = 256
+    # record per stage frame timings in engine.core.profiler.PROFILER, see engine.overlay.perfoverlay
+    profiling: bool = False
 
 
 @dataclass(frozen=True)
@@ -45,6 +103,7 @@ class ResourcePaths:
     savegames: str = resource_path("resources/save")
     fonts: str = resource_path("resources/fonts")
     sounds: str = resource_path("resources/sounds")
+    atlas: str = resource_path("resources/atlas")
 
 @dataclass(frozen=True)
 class InstantiableEntities:
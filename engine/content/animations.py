@@ -1,78 +1,349 @@
 import logging
 import json
-from copy import copy, deepcopy
+from typing import Optional
 from engine.core.engine_core_funcs import *
 from engine.core.engineconfig import SUPPORTED_IMAGE_FORMATS, GLOBAL_FRAMERATE
 
 
 class AnimationManager:
-    def __init__(self, path):
+    def __init__(self, path, bake: str = "EAGER", bake_megabytes: float = 32, rotation_steps: int = 0,
+                 batched: bool = False, skip_culled: bool = False, loader=None):
+        """
+        :param path: folder with one sub folder per character
+        :param bake: "EAGER" bakes the flipped and rotated frames at load time until bake_megabytes are used and the
+        rest on first use, "LAZY" bakes every variant on first use
+        :param bake_megabytes: memory budget of the frames baked at load time
+        :param rotation_steps: amount of rotation angles per full turn baked for every strip, 0 for none
+        :param batched: the animations handed out are played by advance for the time their owners scheduled
+        :param skip_culled: owners culled by the last render do not schedule their batched animations
+        :param loader: the AssetLoader the sprite atlases are loaded through
+        """
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self._animations = {}
         self.animation_path = path
+        self.bake = bake
+        self.bake_budget = int(bake_megabytes * 1024 * 1024)
+        self.rotation_steps = rotation_steps
+        self.baked_bytes = 0
+        # character -> bytes of its frames baked within the budget
+        self.__baked: dict[str, int] = {}
+        self.batched = batched
+        self.skip_culled = skip_culled
+        self.loader = loader
+        # the animations scheduled since the last advance, owners that are not updated schedule nothing
+        self.__due: list["Animation"] = []
 
-    def load_animations(self):
+    def characters(self) -> list[str]:
+        """
+        :return: the names of all characters, without loading them
+        """
         try:
-            for character in os.listdir(self.animation_path):
-                if ".py" in character:
-                    continue
-                self._animations[character] = AnimationData(self.animation_path + "/" + character)
+            return [character for character in os.listdir(self.animation_path) if ".py" not in character]
         except FileNotFoundError:
+            return []
+
+    def load_character(self, character: str, bake: bool = True) -> Optional["AnimationData"]:
+        """
+        :param bake: bake the variants of the character within the remaining budget if the manager bakes eagerly
+        :return: the animations of the character, None if it does not exist
+        """
+        if not os.path.isdir(self.animation_path + "/" + character):
+            return None
+        self._animations[character] = AnimationData(
+            self.animation_path + "/" + character, rotation_steps=self.rotation_steps, loader=self.loader
+        )
+        if bake and self.bake == "EAGER":
+            self.bake_frames([character])
+        return self._animations[character]
+
+    def unload_character(self, character: str) -> None:
+        """
+        Drops the frames of the character and returns its baked bytes to the budget. Animations handed out keep
+        their clip until they are set to a new one
+        """
+        self._animations.pop(character, None)
+        self.baked_bytes -= self.__baked.pop(character, 0)
+
+    def load_animations(self):
+        if not os.path.isdir(self.animation_path):
             self.logger.warning("No animations in %s", self.animation_path)
-        else:
-            self.logger.info("Animations loaded")
-    def get_animation(self, character_id, action_id):
-        a: AnimationData = self._animations[character_id]
-        b: Animation = a.get_animation(action_id)
-        b.rewind()
-        return b
+            return
+        for character in self.characters():
+            self.load_character(character, bake=False)
+        self.logger.info("Animations loaded")
+        if self.bake == "EAGER":
+            self.bake_frames()
+
+    def bake_frames(self, characters: list[str] = None) -> None:
+        """
+        Bakes the flipped and rotated strips of the animations until the budget is used. The flips of every strip
+        come before any rotation, variants that do not fit are baked on first use
+        :param characters: the characters to bake, all loaded ones by default
+        """
+        characters = self._animations.keys() if characters is None else characters
+        pending = [
+            (character, frame_set, key)
+            for character in characters
+            for frame_set in self._animations[character].get_frame_sets()
+            for key in frame_set.keys()
+            if key not in frame_set.variants
+        ]
+        pending.sort(key=lambda item: item[2][2] != 0)
+        for character, frame_set, key in pending:
+            size = frame_set.strip_bytes(key)
+            if self.baked_bytes + size > self.bake_budget:
+                continue
+            frame_set.bake(key)
+            self.baked_bytes += size
+            self.__baked[character] = self.__baked.get(character, 0) + size
+        self.logger.info("Baked %.1f MB of animation frames", self.baked_bytes / (1024 * 1024))
+
+    def get_animation(self, character_id, action_id) -> "Animation":
+        """
+        :return: a new Animation at the start of the clip, if the manager is batched it is played by advance
+        once its owner scheduled it
+        """
+        animation = self._animations[character_id].get_animation(action_id)
+        if self.batched:
+            animation.attach(self.__due, self.skip_culled)
+        return animation
+
+    def get_clip(self, character_id, action_id) -> "AnimationClip":
+        return self._animations[character_id].get_clip(action_id)
+
+    def get_animation_array(self, character_id, action_id) -> "Animation":
+        """
+        :return: a new Animation of the clip that is never played by advance, e.g. to read its frames with
+        get_frames. Use get_clip for the shared clip itself
+        """
+        return self._animations[character_id].get_animation(action_id)
+
+    def advance(self) -> int:
+        """
+        Plays the animations scheduled since the last advance in one pass, each by the time scheduled for it.
+        Animations of sleeping, frozen or pooled entities are not updated and keep their frame, like those of
+        culled entities with skip_culled
+        :return: amount of animations played
+        """
+        due = self.__due
+        for animation in due:
+            animation.play_scheduled()
+        played = len(due)
+        due.clear()
+        return played
+
+    def get_sprite_atlases(self) -> list:
+        return [animation_data.get_sprite_atlas() for animation_data in self._animations.values()]
+
+
+class FrameSet:
+    """
+    The frames of a single animation strip plus its flipped and rotated variants. A variant is a whole strip, baked
+    either up front by AnimationData.bake or on first use, so playback only indexes into lists. Rotations are
+    quantized to rotation_steps angles per full turn and applied after the flip, counter clockwise like
+    pygame.transform.rotate. The frame set belongs to the AnimationClip of the strip.
+    """
+
+    def __init__(self, frames: list[pygame.Surface], rotation_steps: int = 0):
+        self.frames = frames
+        self.rotation_steps = rotation_steps
+        # (flip_x, flip_y, rotation index) -> frames
+        self.variants: dict[tuple[bool, bool, int], list[pygame.Surface]] = {(False, False, 0): frames}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(f.get_width() * f.get_height() * f.get_bytesize() for v in self.variants.values() for f in v)
+
+    def rotation_index(self, angle: float) -> int:
+        """
+        :param angle: degrees
+        :return: index of the closest baked angle, always 0 without rotation steps
+        """
+        if not self.rotation_steps:
+            return 0
+        return round(angle * self.rotation_steps / 360) % self.rotation_steps
+
+    def keys(self) -> list[tuple[bool, bool, int]]:
+        """
+        :return: every variant, the flips first, then the rotations of the unflipped and the mirrored strips
+        """
+        flips = [(False, False), (True, False), (False, True), (True, True)]
+        keys = [(x, y, 0) for x, y in flips]
+        keys.extend((x, y, r) for x, y in flips for r in range(1, max(self.rotation_steps, 1)))
+        return keys
+
+    def strip_bytes(self, key: tuple[bool, bool, int]) -> int:
+        """
+        :return: approximate memory of the variant, rotated frames are larger than the source frames
+        """
+        size = sum(f.get_width() * f.get_height() * f.get_bytesize() for f in self.frames)
+        return size * 2 if key[2] else size
 
-    def get_animation_array(self, character_id, action_id):
-        a: AnimationData = self._animations[character_id]
-        b: Animation = a.get_animation(action_id)
-        return b
+    def get(self, flip_x: bool = False, flip_y: bool = False, rotation_index: int = 0) -> list[pygame.Surface]:
+        key = (bool(flip_x), bool(flip_y), rotation_index)
+        frames = self.variants.get(key)
+        if frames is None:
+            frames = self.bake(key)
+        return frames
+
+    def bake(self, key: tuple[bool, bool, int]) -> list[pygame.Surface]:
+        flip_x, flip_y, rotation_index = key
+        frames = self.frames
+        if flip_x or flip_y:
+            frames = [pygame.transform.flip(f, flip_x, flip_y) for f in frames]
+        if rotation_index:
+            angle = rotation_index * 360 / self.rotation_steps
+            frames = [pygame.transform.rotate(f, angle) for f in frames]
+        self.variants[key] = frames
+        return frames
+
+
+class AnimationClip:
+    """
+    The immutable part of an animation strip, its frames and its config. One clip exists per strip and is shared by
+    every Animation playing it.
+    """
+
+    __slots__ = ("name", "frame_set", "frames", "loop", "speed", "center", "offset")
+
+    def __init__(self, name: str, frame_set: FrameSet, animation_config: dict):
+        self.name = name
+        self.frame_set = frame_set
+        self.frames = animation_config["frames"]
+        self.loop = animation_config["loop"]
+        self.speed = animation_config["speed"]
+        self.center = tuple(animation_config["center"])
+        self.offset = tuple(animation_config["offset"])
 
 
 class Animation:
     """
-    A class actually holding an animation (including its data)
+    The playback state of an AnimationClip. It only holds a frame counter and a few flags, the frames and the
+    config stay in the shared clip.
     """
 
-    def __init__(self, animation_frames, animation_config):
-        self.__animation_frames = animation_frames
-        self.__animation_config = deepcopy(animation_config)
+    __slots__ = (
+        "__weakref__",
+        "__clip",
+        "__paused",
+        "__current_frame",
+        "__should_loop",
+        "__speed",
+        "__frame",
+        "__flip",
+        "__rotation",
+        "__frames",
+        "__just_looped",
+        "__done",
+        "center_x",
+        "center_y",
+        "batched",
+        "skip_culled",
+        "__due",
+        "__scheduled",
+    )
+
+    def __init__(self, clip: AnimationClip):
+        self.__flip = (False, False)
+        self.__rotation = 0
+        self.center_x = False
+        self.center_y = False
+        # set by the AnimationManager when its advance plays this animation
+        self.batched = False
+        # set by the AnimationManager, the owner does not schedule the animation while it is culled
+        self.skip_culled = False
+        # the due list of the AnimationManager and the time scheduled for its next advance
+        self.__due: list | None = None
+        self.__scheduled = 0.0
+        self.set_clip(clip)
+
+    def set_clip(self, clip: AnimationClip) -> None:
+        """
+        Plays clip from its start with its own speed and looping, the flip and the rotation are kept. Lets an
+        entity switch animations without a new Animation
+        """
+        self.__clip = clip
         self.__paused = False
-        self.__current_frame = None
-        self.__should_loop = self.__animation_config["loop"]
+        self.__should_loop = clip.loop
+        self.__speed = clip.speed
         self.__frame = 0
-        self.__flip = [False, False]
-        self.__calc_img()
-        self.__rotation = 0
         self.__just_looped = False
         self.__done = False
-        self.center_x = False
-        self.center_y = False
-        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        # the strip of the current flip and rotation, playback indexes into it
+        self.__frames = clip.frame_set.get(*self.__flip, self.__rotation)
+        self.__calc_img()
+
+    @property
+    def clip(self) -> AnimationClip:
+        return self.__clip
 
     def __calc_img(self):
-        img = self.__animation_frames[int(self.__frame)]
-        if sum(self.__flip) != 0:
-            img = pygame.transform.flip(img, *self.__flip)
-        self.__current_frame = img
+        self.__current_frame = self.__frames[int(self.__frame)]
 
     def get_frames(self):
-        return self.__animation_frames
+        return self.__clip.frame_set.frames
+
+    @property
+    def rotation_steps(self) -> int:
+        return self.__clip.frame_set.rotation_steps
+
+    def set_flip(self, flip_x: bool, flip_y: bool) -> None:
+        """
+        Plays the flipped strip from now on
+        """
+        self.__flip = (bool(flip_x), bool(flip_y))
+        self.__frames = self.__clip.frame_set.get(*self.__flip, self.__rotation)
+        self.__calc_img()
+
+    def set_rotation(self, angle: float) -> None:
+        """
+        Plays the strip rotated by the closest baked angle from now on
+        :param angle: degrees, counter clockwise
+        """
+        frame_set = self.__clip.frame_set
+        self.__rotation = frame_set.rotation_index(angle)
+        self.__frames = frame_set.get(*self.__flip, self.__rotation)
+        self.__calc_img()
+
+    def get_frame(self, flip_x: bool = False, flip_y: bool = False, angle: float = 0) -> pygame.Surface:
+        """
+        :return: the current frame of another variant, independent of set_flip and set_rotation
+        """
+        frame_set = self.__clip.frame_set
+        frames = frame_set.get(flip_x, flip_y, frame_set.rotation_index(angle))
+        return frames[min(int(self.__frame), len(frames) - 1)]
+
+    def attach(self, due: list, skip_culled: bool = False) -> None:
+        """
+        Hands the playback to an AnimationManager, schedule queues the animation in its due list
+        """
+        self.batched = True
+        self.skip_culled = skip_culled
+        self.__due = due
+
+    def schedule(self, dt: float) -> None:
+        """
+        Plays dt more in the next AnimationManager.advance
+        """
+        if not self.__scheduled:
+            self.__due.append(self)
+        self.__scheduled += dt
+
+    def play_scheduled(self) -> None:
+        dt, self.__scheduled = self.__scheduled, 0.0
+        self.play(dt)
 
     def play(self, dt):
         if not self.__paused:
-            self.__frame += dt * self.__animation_config["speed"]
-        if self.__frame > self.__animation_config["frames"] - 1 and self.__should_loop:
+            self.__frame += dt * self.__speed
+        last = self.__clip.frames - 1
+        if self.__frame > last and self.__should_loop:
             self.__frame = 0
             self.__just_looped = True
-        if self.__frame > self.__animation_config["frames"] - 1 and not self.__should_loop:
+        if self.__frame > last and not self.__should_loop:
             self.__done = True
             return
-        if self.__just_looped and self.__animation_config["loop"] or not self.__just_looped:
+        if self.__just_looped and self.__clip.loop or not self.__just_looped:
             self.__calc_img()
 
     def rewind(self):
@@ -83,13 +354,13 @@ class Animation:
         self.__should_loop = loop
 
     def set_speed(self, speed):
-        self.__animation_config["speed"] = speed
+        self.__speed = speed
 
     def pause(self):
         self.__paused = True
 
     def get_center(self):
-        return self.__animation_config["center"]
+        return self.__clip.center
 
     def is_done(self):
         return self.__done
@@ -104,18 +375,21 @@ class Animation:
         return self.__current_frame
 
     def get_offset(self):
-        return self.__animation_config["offset"]
+        return self.__clip.offset
 
 
 class AnimationData:
-    def __init__(self, path: str, colorkey=(0, 0, 0)):
+    def __init__(self, path: str, colorkey=(0, 0, 0), rotation_steps: int = 0, loader=None):
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self.id = path.split("/")[-1]
         self.__path = path
-        self.__animations = {}
+        self.__clips: dict[str, AnimationClip] = {}
+        self.__frame_sets: dict[str, FrameSet] = {}
+        self.__rotation_steps = rotation_steps
         self.__sprite_atlas = None
         self.__config = None
         self.__colorkey = colorkey
+        self.__loader = loader
         self.__init_animation()
 
     def __init_animation(self):
@@ -128,9 +402,10 @@ class AnimationData:
         possible to adress
         :return:
         """
+        load = self.__loader.load_img if self.__loader else load_img
         for img_name in os.listdir(self.__path):
             if img_name.split(".")[-1] in SUPPORTED_IMAGE_FORMATS:
-                self.__sprite_atlas = load_img(resource_path(self.__path + "/" + img_name), None, True)
+                self.__sprite_atlas = load(resource_path(self.__path + "/" + img_name), None, True)
         try:
             f = open(resource_path(self.__path + "/config.json"), "r")
             self.__config = json.loads(f.read())
@@ -169,8 +444,19 @@ class AnimationData:
                     animation_frames.append(img)
                 except ValueError:
                     self.logger.warning("Image could not be found, exception handling has not been implemented")
-            self.__animations[animatio_name] = Animation(animation_frames, self.__config[animatio_name])
+            frame_set = FrameSet(animation_frames, self.__rotation_steps)
+            self.__frame_sets[animatio_name] = frame_set
+            self.__clips[animatio_name] = AnimationClip(animatio_name, frame_set, self.__config[animatio_name])
             y_offset += height  # Add height of current animation row to offset
 
-    def get_animation(self, animation_name):
-        return copy(self.__animations[animation_name])
+    def get_clip(self, animation_name) -> AnimationClip:
+        return self.__clips[animation_name]
+
+    def get_animation(self, animation_name) -> Animation:
+        return Animation(self.__clips[animation_name])
+
+    def get_sprite_atlas(self):
+        return self.__sprite_atlas
+
+    def get_frame_sets(self) -> list[FrameSet]:
+        return list(self.__frame_sets.values())
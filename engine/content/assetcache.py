@@ -0,0 +1,208 @@
+import logging
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Iterable, Optional
+
+import pygame
+
+
+def asset_bytes(value, exclude: set = frozenset()) -> int:
+    """
+    :param value: a surface, an object with an nbytes attribute or a list, tuple or dict of them
+    :param exclude: ids of root surfaces owned by someone else, e.g. the atlas pages
+    :return: the pixel memory of the distinct root surfaces of value, subsurfaces count their root once
+    """
+    roots = {}
+    total = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, pygame.Surface):
+            root = item.get_abs_parent()
+            if id(root) not in exclude:
+                roots[id(root)] = root
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif hasattr(item, "nbytes"):
+            total += item.nbytes
+    return total + sum(r.get_width() * r.get_height() * r.get_bytesize() for r in roots.values())
+
+
+class AssetHandle:
+    """
+    A lazy reference to one asset. The asset is loaded on the first get and may be evicted again once no scene
+    references it, the next get then loads it again. Attribute access is forwarded to the asset, pygame functions
+    need the asset itself from get.
+    """
+
+    __slots__ = ("category", "name", "value", "nbytes", "refs", "_cache")
+
+    def __init__(self, cache: "AssetCache", category: str, name: str):
+        self._cache = cache
+        self.category = category
+        self.name = name
+        self.value = None
+        self.nbytes = 0
+        # scope -> amount of acquisitions
+        self.refs: Counter = Counter()
+
+    def __repr__(self):
+        return f"AssetHandle({self.category!r}, {self.name!r}, loaded={self.loaded})"
+
+    def __bool__(self):
+        return True
+
+    @property
+    def loaded(self) -> bool:
+        return self.value is not None
+
+    def get(self):
+        value = self.value
+        if value is None:
+            return self._cache.load(self)
+        self._cache.touch(self)
+        return value
+
+    def __getattr__(self, item):
+        return getattr(self.get(), item)
+
+
+class AssetCache:
+    """
+    Handles of all assets of the ContentManager by category and name. Handles requested while a scope is set,
+    usually the name of the scene being loaded or played, are referenced by that scope until release_scope.
+    Loaded assets no scope references are evicted least recently used first once the resident bytes exceed the
+    budget. Each category registers how its assets are loaded, unloaded and listed.
+    """
+
+    def __init__(self, budget_megabytes: float = 256):
+        self.budget = int(budget_megabytes * 1024 * 1024)
+        self.scope: Optional[str] = None
+        self.resident_bytes = 0
+        # ids of root surfaces that are accounted elsewhere, see asset_bytes
+        self.shared_surfaces: set[int] = set()
+        self.__categories: dict[str, tuple[Callable, Optional[Callable], Optional[Callable], Optional[Callable]]] = {}
+        self.__handles: dict[tuple[str, str], AssetHandle] = {}
+        # loaded handles, least recently used first
+        self.__loaded: OrderedDict[tuple[str, str], AssetHandle] = OrderedDict()
+        self.loads: Counter = Counter()
+        self.evictions: Counter = Counter()
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    def register(self, category: str, load: Callable[[str], Any], unload: Callable[[str], None] = None,
+                 names: Callable[[], Iterable[str]] = None, measure: Callable[[Any], Any] = None) -> None:
+        """
+        :param load: loads the asset of a name and returns it
+        :param unload: drops the asset of a name from its manager, called on eviction
+        :param names: lists the names of all assets of the category without loading them
+        :param measure: returns the surfaces of a loaded asset for asset_bytes, the asset itself by default
+        """
+        self.__categories[category] = (load, unload, names, measure)
+
+    def names(self, category: str) -> list[str]:
+        names = self.__categories[category][2]
+        return list(names()) if names else []
+
+    def handle(self, category: str, name: str, acquire: bool = True) -> AssetHandle:
+        """
+        :param acquire: reference the handle from the current scope
+        :return: the handle of the asset, nothing is loaded yet
+        """
+        key = (category, name)
+        handle = self.__handles.get(key)
+        if handle is None:
+            if category not in self.__categories:
+                raise KeyError(f"Unknown asset category {category}")
+            handle = AssetHandle(self, category, name)
+            self.__handles[key] = handle
+        if acquire and self.scope is not None:
+            handle.refs[self.scope] += 1
+        return handle
+
+    def get(self, category: str, name: str, acquire: bool = True):
+        return self.handle(category, name, acquire).get()
+
+    def load(self, handle: AssetHandle, evict: bool = True):
+        value = self.__categories[handle.category][0](handle.name)
+        if value is None:
+            raise KeyError(f"No {handle.category} asset named {handle.name}")
+        measure = self.__categories[handle.category][3]
+        handle.value = value
+        handle.nbytes = asset_bytes(measure(value) if measure else value, self.shared_surfaces)
+        self.resident_bytes += handle.nbytes
+        self.loads[handle.category] += 1
+        self.__loaded[(handle.category, handle.name)] = handle
+        if evict:
+            self.evict(keep=handle)
+        return value
+
+    def touch(self, handle: AssetHandle) -> None:
+        self.__loaded.move_to_end((handle.category, handle.name))
+
+    def preload(self, category: str) -> int:
+        """
+        Loads every asset of the category without referencing it. Nothing is evicted, the budget applies from the
+        next release_scope on
+        :return: amount of loaded assets
+        """
+        names = self.names(category)
+        for name in names:
+            handle = self.handle(category, name, acquire=False)
+            if not handle.loaded:
+                self.load(handle, evict=False)
+        return len(names)
+
+    def release_scope(self, scope: str) -> None:
+        """
+        Drops all references of the scope, then evicts down to the budget
+        """
+        for handle in self.__handles.values():
+            handle.refs.pop(scope, None)
+        self.evict()
+
+    def unload(self, handle: AssetHandle) -> None:
+        unload = self.__categories[handle.category][1]
+        if unload:
+            unload(handle.name)
+        del self.__loaded[(handle.category, handle.name)]
+        self.resident_bytes -= handle.nbytes
+        handle.value = None
+        handle.nbytes = 0
+
+    def evict(self, budget: int = None, keep: AssetHandle = None) -> int:
+        """
+        Unloads unreferenced assets, least recently used first, until the resident bytes fit the budget
+        :param keep: a handle that stays loaded in any case, e.g. the one that is being loaded
+        :return: amount of evicted assets
+        """
+        budget = self.budget if budget is None else budget
+        evicted = 0
+        for handle in list(self.__loaded.values()):
+            if self.resident_bytes <= budget:
+                break
+            if handle.refs or handle is keep:
+                continue
+            self.unload(handle)
+            self.evictions[handle.category] += 1
+            evicted += 1
+        if evicted:
+            self.logger.debug("Evicted %d assets, %.1f MB resident", evicted, self.resident_bytes / (1024 * 1024))
+        return evicted
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        :return: per category the loaded and referenced assets, their resident bytes, loads and evictions
+        """
+        stats = {
+            category: {"loaded": 0, "referenced": 0, "bytes": 0, "loads": self.loads[category],
+                       "evictions": self.evictions[category]}
+            for category in self.__categories
+        }
+        for handle in self.__handles.values():
+            entry = stats[handle.category]
+            entry["referenced"] += bool(handle.refs)
+            if handle.loaded:
+                entry["loaded"] += 1
+                entry["bytes"] += handle.nbytes
+        return stats
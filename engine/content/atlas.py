@@ -0,0 +1,391 @@
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+import pygame
+
+from engine.core.engine_core_funcs import load_img
+from engine.core.engineconfig import SUPPORTED_IMAGE_FORMATS
+
+"""
+Packs the image files of the content managers into a few large pages so that sprites, tiles, animation frames and
+font glyphs share textures and the SpriteBatch can draw them in one call. The atlas is a folder holding
+
+    atlas.json | page_0.png | page_1.png | ...
+
+The manifest holds the source stamps used for invalidation and the page and rect of every packed file. Files are
+keyed by their path relative to the common folder of all packed resource folders. The managers ask the atlas for
+their files and get subsurfaces of the pages, a file that is not in the atlas is loaded on its own.
+
+Build it with:
+
+    python -m engine.content.atlas [atlas folder]
+"""
+
+MANIFEST_FILE_NAME = "atlas.json"
+VERSION = 1
+
+# how a file is converted before it gets packed, the same way its manager loaded it on its own
+OPAQUE = "opaque"
+ALPHA = "alpha"
+KEYED = "keyed"
+KEY_COLOR = (0, 0, 0)
+# ResourcePaths fields packed into the atlas and the conversion of their files
+ATLAS_SOURCES = (
+    ("spritesheets", OPAQUE),
+    ("animations", ALPHA),
+    ("images", KEYED),
+    ("backgrounds", KEYED),
+    ("fonts", KEYED),
+)
+
+logger = logging.getLogger(__name__)
+
+
+def atlas_sources(resource_paths) -> list[tuple[str, str]]:
+    """
+    :param resource_paths: a ResourcePaths
+    :return: the folders packed into the atlas and the conversion of their files
+    """
+    return [(getattr(resource_paths, name), mode) for name, mode in ATLAS_SOURCES]
+
+
+def _source_root(sources: list[tuple[str, str]]) -> str:
+    return os.path.commonpath([os.path.abspath(folder) for folder, _ in sources])
+
+
+def _key(path, root: str) -> str:
+    path = os.fspath(path)
+    # the managers ask with absolute paths below the root, relpath is only needed for anything else
+    if path.startswith(root) and path[len(root):len(root) + 1] == os.sep and "/." not in path and "//" not in path:
+        return path[len(root) + 1:].replace(os.sep, "/")
+    return os.path.relpath(os.path.abspath(path), root).replace(os.sep, "/")
+
+
+def discover_sources(sources: list[tuple[str, str]]) -> dict[str, tuple[str, str]]:
+    """
+    :param sources: folders and the conversion of their files
+    :return: key -> (path, conversion) of every image file in the folders and their sub folders
+    """
+    root = _source_root(sources)
+    files = {}
+    for folder, mode in sources:
+        for current, dirs, names in os.walk(folder):
+            dirs.sort()
+            for name in sorted(names):
+                if name.split(".")[-1].lower() in SUPPORTED_IMAGE_FORMATS:
+                    path = os.path.join(current, name)
+                    files[_key(path, root)] = (path, mode)
+    return files
+
+
+def source_stamps(files: dict[str, tuple[str, str]]) -> dict[str, list]:
+    """
+    :return: per file the mtime, the size and the conversion, used to detect a stale atlas
+    """
+    stamps = {}
+    for key, (path, mode) in files.items():
+        st = os.stat(path)
+        stamps[key] = [st.st_mtime_ns, st.st_size, mode]
+    return stamps
+
+
+def _load_source(path: str, mode: str, loader=None) -> pygame.Surface:
+    img = loader.get_image(path) if loader else pygame.image.load(path)
+    if mode == ALPHA:
+        return img.convert_alpha()
+    img = img.convert()
+    if mode == KEYED:
+        # keyed pixels turn fully transparent
+        img.set_colorkey(KEY_COLOR)
+    return img.convert_alpha()
+
+
+class SkylinePacker:
+    """
+    Bottom left skyline bin packing. The skyline is the list of [x, y, width] segments of the top edge of the
+    packed rects, a rect is placed on the segment where it ends up lowest and on the narrowest one for ties.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.skyline: list[list[int]] = [[0, 0, width]]
+        # bottom edge of the highest placed rect
+        self.used_height = 0
+
+    def __fit(self, index: int, width: int, height: int) -> Optional[int]:
+        x = self.skyline[index][0]
+        if x + width > self.width:
+            return None
+        y = 0
+        remaining = width
+        while remaining > 0:
+            _, segment_y, segment_width = self.skyline[index]
+            y = max(y, segment_y)
+            if y + height > self.height:
+                return None
+            remaining -= segment_width
+            index += 1
+        return y
+
+    def insert(self, width: int, height: int) -> Optional[tuple[int, int]]:
+        """
+        :return: the top left corner of the placed rect, None if it does not fit anymore
+        """
+        best_index, best_y, best_width = -1, self.height, self.width + 1
+        for index, (_, _, segment_width) in enumerate(self.skyline):
+            y = self.__fit(index, width, height)
+            if y is not None and (y < best_y or y == best_y and segment_width < best_width):
+                best_index, best_y, best_width = index, y, segment_width
+        if best_index < 0:
+            return None
+        x = self.skyline[best_index][0]
+        self.__add_segment(best_index, x, best_y + height, width)
+        self.used_height = max(self.used_height, best_y + height)
+        return x, best_y
+
+    def __add_segment(self, index: int, x: int, y: int, width: int) -> None:
+        skyline = self.skyline
+        skyline.insert(index, [x, y, width])
+        # cut the segments covered by the new one
+        end = x + width
+        i = index + 1
+        while i < len(skyline) and skyline[i][0] < end:
+            segment = skyline[i]
+            shrink = end - segment[0]
+            if segment[2] <= shrink:
+                del skyline[i]
+                continue
+            segment[0] += shrink
+            segment[2] -= shrink
+            break
+        # merge neighbours of the same height
+        i = 0
+        while i < len(skyline) - 1:
+            if skyline[i][1] == skyline[i + 1][1]:
+                skyline[i][2] += skyline[i + 1][2]
+                del skyline[i + 1]
+            else:
+                i += 1
+
+
+def pack_surfaces(surfaces: dict[str, pygame.Surface], page_size: int = 2048,
+                  padding: int = 1) -> tuple[list[pygame.Surface], dict[str, list[int]]]:
+    """
+    :param surfaces: key -> per pixel alpha surface
+    :param page_size: edge length of a page, larger surfaces get a page of their own
+    :param padding: empty pixels between two rects
+    :return: the pages and key -> [page, x, y, width, height]
+    """
+    packers: list[SkylinePacker] = []
+    placed: list[list[tuple[str, int, int]]] = []
+    # tall and wide first, the skyline stays flat
+    for key in sorted(surfaces, key=lambda k: (surfaces[k].get_height(), surfaces[k].get_width()), reverse=True):
+        width, height = surfaces[key].get_size()
+        for page, packer in enumerate(packers):
+            position = packer.insert(width + padding, height + padding)
+            if position is not None:
+                break
+        else:
+            page = len(packers)
+            packer = SkylinePacker(max(page_size, width + padding), max(page_size, height + padding))
+            packers.append(packer)
+            placed.append([])
+            position = packer.insert(width + padding, height + padding)
+        placed[page].append((key, *position))
+
+    pages = []
+    entries = {}
+    for page, (packer, page_entries) in enumerate(zip(packers, placed)):
+        # the last shelf rarely reaches the bottom, pages are cut to the used height
+        surface = pygame.Surface((packer.width, packer.used_height), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 0))
+        for key, x, y in page_entries:
+            # max against the transparent page copies the pixels including their alpha
+            surface.blit(surfaces[key], (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+            entries[key] = [page, x, y, *surfaces[key].get_size()]
+        pages.append(surface)
+    return pages, entries
+
+
+class TextureAtlas:
+    """
+    The pages of an atlas and the rect of every packed file. Files come out as subsurfaces of the pages, they must
+    not be drawn onto as that would change the page and every other file on it.
+    """
+
+    def __init__(self, pages: list[pygame.Surface], entries: dict[str, list[int]], root: str):
+        self.pages = pages
+        self.entries = entries
+        self.root = root
+        self.__surfaces: dict[str, pygame.Surface] = {}
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, path) -> bool:
+        return _key(path, self.root) in self.entries
+
+    @classmethod
+    def build(cls, sources: list[tuple[str, str]], page_size: int = 2048, padding: int = 1,
+              files: dict[str, tuple[str, str]] = None, loader=None) -> "TextureAtlas":
+        """
+        Packs the files in memory. Needs an initialized pygame display as the files are converted
+        :param sources: folders and the conversion of their files, see atlas_sources
+        :param files: the discovered sources if they are known already
+        :param loader: an AssetLoader the files were requested from
+        """
+        files = discover_sources(sources) if files is None else files
+        surfaces = {key: _load_source(path, mode, loader) for key, (path, mode) in files.items()}
+        pages, entries = pack_surfaces(surfaces, page_size, padding)
+        return cls(pages, entries, _source_root(sources))
+
+    @staticmethod
+    def read_manifest(atlas_path, sources: list[tuple[str, str]], files: dict[str, tuple[str, str]] = None
+                      ) -> Optional[dict]:
+        """
+        :param atlas_path: folder written by build_atlas
+        :param sources: folders and the conversion of their files, see atlas_sources
+        :param files: the discovered sources if they are known already
+        :return: the manifest if it exists and matches the sources, None otherwise
+        """
+        manifest_path = Path(atlas_path) / MANIFEST_FILE_NAME
+        if not manifest_path.is_file():
+            return None
+        try:
+            with manifest_path.open("r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest["version"] != VERSION:
+                raise ValueError(f"{manifest_path} is not a version {VERSION} atlas")
+            files = discover_sources(sources) if files is None else files
+            stale = manifest["sources"] != source_stamps(files)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable texture atlas %s: %r", atlas_path, e)
+            return None
+        if stale:
+            logger.warning("Texture atlas %s is stale. Rebuild it with python -m engine.content.atlas", atlas_path)
+            return None
+        return manifest
+
+    @staticmethod
+    def page_paths(atlas_path, manifest: dict) -> list[str]:
+        return [str(Path(atlas_path) / page) for page in manifest["pages"]]
+
+    @classmethod
+    def from_manifest(cls, atlas_path, manifest: dict, sources: list[tuple[str, str]],
+                      loader=None) -> Optional["TextureAtlas"]:
+        """
+        :param manifest: a manifest returned by read_manifest
+        :param loader: an AssetLoader the pages were requested from
+        :return: the atlas, None if a page can not be read
+        """
+        try:
+            pages = [
+                (loader.get_image(path) if loader else pygame.image.load(path)).convert_alpha()
+                for path in cls.page_paths(atlas_path, manifest)
+            ]
+        except (OSError, pygame.error) as e:
+            logger.warning("Ignoring unreadable texture atlas %s: %r", atlas_path, e)
+            return None
+        return cls(pages, manifest["entries"], _source_root(sources))
+
+    @classmethod
+    def open_if_valid(cls, atlas_path, sources: list[tuple[str, str]]) -> Optional["TextureAtlas"]:
+        """
+        :param atlas_path: folder written by build_atlas
+        :param sources: folders and the conversion of their files, see atlas_sources
+        :return: the atlas if it exists and matches the sources, None otherwise
+        """
+        manifest = cls.read_manifest(atlas_path, sources)
+        return cls.from_manifest(atlas_path, manifest, sources) if manifest else None
+
+    @classmethod
+    def load(cls, atlas_path, sources: list[tuple[str, str]], page_size: int = 2048,
+             padding: int = 1) -> "TextureAtlas":
+        """
+        :return: the atlas written by build_atlas if it is up to date, otherwise the files packed at runtime
+        """
+        atlas = cls.open_if_valid(atlas_path, sources)
+        if atlas is None:
+            atlas = cls.build(sources, page_size, padding)
+            logger.info("Packed %d files into %d atlas pages at runtime", len(atlas), len(atlas.pages))
+        return atlas
+
+    def get(self, path) -> Optional[pygame.Surface]:
+        """
+        :param path: path of a packed file
+        :return: the subsurface of the file, the same surface on every call, None if the file is not packed
+        """
+        key = _key(path, self.root)
+        surface = self.__surfaces.get(key)
+        if surface is None:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            page, x, y, width, height = entry
+            surface = self.pages[page].subsurface((x, y, width, height))
+            self.__surfaces[key] = surface
+        return surface
+
+    def uv(self, path) -> Optional[tuple[int, tuple[float, float, float, float]]]:
+        """
+        :param path: path of a packed file
+        :return: the page index and the normalized uv rect (u0, v0, u1, v1) of the file, None if it is not packed
+        """
+        entry = self.entries.get(_key(path, self.root))
+        if entry is None:
+            return None
+        page, x, y, width, height = entry
+        pw, ph = self.pages[page].get_size()
+        return page, (x / pw, y / ph, (x + width) / pw, (y + height) / ph)
+
+    def load_img(self, path: str, colorkey=None, retain_alpha=False) -> pygame.Surface:
+        """
+        Drop in for engine_core_funcs.load_img, files that are not packed are loaded on their own
+        """
+        surface = self.get(path)
+        if surface is None:
+            self.logger.debug("%s is not in the atlas", path)
+            return load_img(path, colorkey, retain_alpha)
+        return surface
+
+
+def build_atlas(sources: list[tuple[str, str]], atlas_path, page_size: int = 2048, padding: int = 1) -> Path:
+    """
+    Packs the files and writes the pages and the manifest. Needs an initialized pygame display (a dummy video
+    driver is fine) as the files are converted the same way the managers do it
+    :param sources: folders and the conversion of their files, see atlas_sources
+    :param atlas_path: output folder
+    :return: the path of the written manifest
+    """
+    atlas_path = Path(atlas_path)
+    atlas_path.mkdir(parents=True, exist_ok=True)
+    files = discover_sources(sources)
+    atlas = TextureAtlas.build(sources, page_size, padding, files)
+    page_names = []
+    for index, page in enumerate(atlas.pages):
+        page_names.append(f"page_{index}.png")
+        pygame.image.save(page, str(atlas_path / page_names[-1]))
+    manifest = {"version": VERSION, "sources": source_stamps(files), "pages": page_names, "entries": atlas.entries}
+    manifest_path = atlas_path / MANIFEST_FILE_NAME
+    with manifest_path.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    logger.info("Wrote texture atlas with %d files on %d pages to %s", len(atlas), len(page_names), atlas_path)
+    return manifest_path
+
+
+if __name__ == "__main__":
+    from engine.config.projectconfig import GameSettings, ResourcePaths
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    logging.basicConfig(level=logging.INFO)
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    paths = ResourcePaths()
+    build_atlas(atlas_sources(paths), sys.argv[1] if len(sys.argv) > 1 else paths.atlas,
+                GameSettings().texture_atlas_page_size)
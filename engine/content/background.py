@@ -9,26 +9,44 @@ PARALLAXCLASS = [0, 0.05, 0.07, 0.06, 0.85, 0.095]
 
 
 class BackgroundManager:
-    def __init__(self, path):
+    def __init__(self, path, loader=None):
         self.__backgrounds = {}
         # this has already resource_path executed upon
         self.path = path
+        self.loader = loader
         self.active_background = None
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
-    def load_backgrounds(self):
+    def names(self) -> dict[str, str]:
+        """
+        :return: name -> file name of every background, without loading them
+        """
         try:
-            for background in os.listdir(self.path):
-                if ".py" in background:
-                    continue
-                _bg_img = load_img(self.path + "/" + background, (0, 0, 0))
-                _bg = Background(_bg_img)
-                _bg_name = background[:-4]
-                self.__backgrounds[_bg_name] = _bg
+            return {background[:-4]: background for background in os.listdir(self.path) if ".py" not in background}
         except FileNotFoundError:
+            return {}
+
+    def load_background(self, name: str, file_name: str = None):
+        load = self.loader.load_img if self.loader else load_img
+        file_name = file_name or self.names().get(name)
+        if file_name is None:
+            return None
+        self.__backgrounds[name] = Background(load(self.path + "/" + file_name, (0, 0, 0)))
+        return self.__backgrounds[name]
+
+    def unload_background(self, name: str) -> None:
+        background = self.__backgrounds.pop(name, None)
+        if background is not None and background is self.active_background:
+            self.active_background = None
+
+    def load_backgrounds(self):
+        names = self.names()
+        if not names and not os.path.isdir(self.path):
             self.logger.warning("No backgrounds found at %s", self.path)
-        else:
-            self.logger.info("Backgrounds loaded")
+            return
+        for name, file_name in names.items():
+            self.load_background(name, file_name)
+        self.logger.info("Backgrounds loaded")
 
     def update(self, dt):
         if not self.active_background:
@@ -36,6 +54,8 @@ class BackgroundManager:
         self.active_background.update(dt)
 
     def set_background(self, bg_name="default"):
+        if bg_name not in self.__backgrounds:
+            self.load_background(bg_name)
         self.active_background = self.__backgrounds[bg_name]
 
     def render(self, surf, offset):
@@ -44,6 +64,9 @@ class BackgroundManager:
     def get_backgrounds(self, room_name):
         return self.__backgrounds[room_name]
 
+    def get_all_backgrounds(self) -> list:
+        return list(self.__backgrounds.values())
+
 
 class Background:
     def __init__(self, bg_img):
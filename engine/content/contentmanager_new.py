@@ -1,27 +1,133 @@
+from typing import Callable, Iterator
+
+import pygame
+
 from engine.content.animations import AnimationManager
+from engine.content.assetcache import AssetCache, AssetHandle, asset_bytes
+from engine.content.atlas import TextureAtlas, atlas_sources, discover_sources
+from engine.content.loader import AssetLoader
 from engine.content.spritesheets import SpritesheetManager
 from engine.content.imagemanager import ImageManager
 from engine.content.background import BackgroundManager
 from engine.content.fontmanager import FontManager
 
+# seconds load_steps waits for the decoding workers before it yields again
+LOAD_POLL_SECONDS = 1 / 60
+
 
 class ContentManager:
 
-    def __init__(self, ctx):
+    def __init__(self, ctx, on_progress: Callable[[float, str], None] = None):
+        """
+        :param on_progress: called on the main thread while the assets load, with the progress from 0 to 1 and the
+        current stage, e.g. to present a LoadingOverlay
+        """
         self.ctx = ctx
-        self.__animations = AnimationManager(self.ctx.resource_paths.animations)
-        self.__sprite_sheet_manager = SpritesheetManager(self.ctx.resource_paths.spritesheets)
-        self.__image_manager = ImageManager(self.ctx.resource_paths.images)
-        self.__background_manager = BackgroundManager(self.ctx.resource_paths.backgrounds)
-        self.__font_manager = FontManager(self.ctx.resource_paths.fonts)
-        self.load_assets()
-
-    def load_assets(self):
-        self.__animations.load_animations()
-        self.__sprite_sheet_manager.load_spritesheets()
-        self.__image_manager.load_images()
-        self.__font_manager.load_images()
-        self.__background_manager.load_backgrounds()
+        settings = self.ctx.game_settings
+        self.loader = AssetLoader(settings.asset_loader_workers)
+        self.__animations = AnimationManager(
+            self.ctx.resource_paths.animations,
+            bake=settings.animation_bake,
+            bake_megabytes=settings.animation_bake_megabytes,
+            rotation_steps=settings.animation_rotation_steps,
+            batched=settings.animation_batched,
+            skip_culled=settings.animation_skip_culled,
+            loader=self.loader,
+        )
+        self.__sprite_sheet_manager = SpritesheetManager(self.ctx.resource_paths.spritesheets, self.loader)
+        self.__image_manager = ImageManager(self.ctx.resource_paths.images, self.loader)
+        self.__background_manager = BackgroundManager(self.ctx.resource_paths.backgrounds, self.loader)
+        self.__font_manager = FontManager(self.ctx.resource_paths.fonts, self.loader)
+        self.assets = AssetCache(settings.content_budget_megabytes)
+        self.__register_assets()
+        self.load_assets(on_progress)
+
+    def __register_assets(self) -> None:
+        images = self.__image_manager
+        sheets = self.__sprite_sheet_manager
+        backgrounds = self.__background_manager
+        fonts = self.__font_manager
+        animations = self.__animations
+        self.assets.register("images", images.load_image, images.unload_image, images.names)
+        self.assets.register("spritesheets", sheets.load_spritesheet, sheets.unload_spritesheet, sheets.names,
+                             lambda sheet: sheet.spritesheet)
+        self.assets.register("backgrounds", backgrounds.load_background, backgrounds.unload_background,
+                             backgrounds.names, lambda background: background.layer_surfaces)
+        self.assets.register("fonts", fonts.load_font, fonts.unload_font, fonts.names)
+        self.assets.register("animations", animations.load_character, animations.unload_character,
+                             animations.characters,
+                             lambda data: [data.get_sprite_atlas(), [f.variants for f in data.get_frame_sets()]])
+
+    def load_assets(self, on_progress: Callable[[float, str], None] = None):
+        for progress, stage in self.load_steps():
+            if on_progress:
+                on_progress(progress, stage)
+
+    def load_steps(self) -> Iterator[tuple[float, str]]:
+        """
+        Loads all assets, or with LAZY content loading only the atlas, the rest then loads on first use. The image
+        files are decoded on the AssetLoader workers first, the managers then convert and cut them on the calling
+        thread. Yields the progress from 0 to 1 and the current stage at least every LOAD_POLL_SECONDS while
+        decoding and after every manager, so the caller can draw a loading screen
+        """
+        settings = self.ctx.game_settings
+        paths = self.ctx.resource_paths
+        eager = settings.content_loading == "EAGER"
+        sources = atlas_sources(paths)
+        files = discover_sources(sources)
+        manifest = TextureAtlas.read_manifest(paths.atlas, sources, files) if settings.texture_atlas else None
+        if manifest:
+            self.loader.request_images(TextureAtlas.page_paths(paths.atlas, manifest))
+        elif eager or settings.texture_atlas:
+            self.loader.request_images(path for path, _ in files.values())
+
+        stages = [("atlas", lambda: self.__load_atlas(manifest, sources, files))]
+        if eager:
+            stages.extend(
+                (category, lambda category=category: self.assets.preload(category))
+                for category in ("animations", "spritesheets", "images", "fonts", "backgrounds")
+            )
+        stages.append(("textures", self.upload_textures))
+        total = self.loader.requested + len(stages)
+        while not self.loader.wait(LOAD_POLL_SECONDS):
+            yield self.loader.decoded / total, "decoding"
+        for done, (stage, load) in enumerate(stages):
+            yield (self.loader.requested + done) / total, stage
+            load()
+        # files nobody asked for, e.g. images in sub folders the managers do not look into
+        self.loader.release()
+        yield 1.0, "done"
+
+    def __load_atlas(self, manifest, sources, files) -> None:
+        settings = self.ctx.game_settings
+        if not settings.texture_atlas:
+            return
+        atlas_path = self.ctx.resource_paths.atlas
+        atlas = TextureAtlas.from_manifest(atlas_path, manifest, sources, self.loader) if manifest else None
+        if atlas is None:
+            atlas = TextureAtlas.build(sources, settings.texture_atlas_page_size, files=files, loader=self.loader)
+        self.loader.atlas = atlas
+        # the pages stay resident, assets cut out of them cost nothing extra
+        self.assets.shared_surfaces.update(id(page) for page in atlas.pages)
+
+    def upload_textures(self):
+        """
+        Uploads all loaded images to the GPU once if the window renders with a SpriteBatch. Frames cut out of a
+        sheet share the texture of the sheet and packed files share the texture of their atlas page.
+        """
+        textures = getattr(self.ctx.window, "textures", None)
+        if textures is None:
+            return
+        surfaces = list(self.loader.atlas.pages) if self.loader.atlas else []
+        surfaces.extend(sheet.spritesheet for sheet in self.__sprite_sheet_manager.get_all_sheets())
+        surfaces.extend(self.__image_manager.images.values())
+        surfaces.extend(self.__animations.get_sprite_atlases())
+        for background in self.__background_manager.get_all_backgrounds():
+            surfaces.extend(background.layer_surfaces)
+        textures.preload(surfaces)
+
+    def get_atlas(self):
+        return self.loader.atlas
 
     def get_sprite_sheet_manager(self):
         return self.__sprite_sheet_manager
@@ -35,14 +141,62 @@ class ContentManager:
     def get_image_manager(self):
         return self.__image_manager
 
-    def get_image(self, name: str):
-        return self.__image_manager.get_image(name)
+    def get_handle(self, category: str, name: str) -> AssetHandle:
+        """
+        :param category: images, spritesheets, backgrounds, fonts or animations
+        :return: a handle of the asset that loads it on first use, referenced by the current scene
+        """
+        return self.assets.handle(category, name)
+
+    def get_image(self, name: str) -> pygame.Surface:
+        """
+        :return: the image, loaded first if it is not resident and referenced by the current scene
+        """
+        return self.assets.get("images", name)
+
+    def get_spritesheet(self, name: str):
+        return self.assets.get("spritesheets", name)
+
+    def get_background(self, name: str):
+        return self.assets.get("backgrounds", name)
+
+    def get_font(self, name: str = "base"):
+        return self.assets.get("fonts", name)
+
+    def get_animation_data(self, character_id):
+        return self.assets.get("animations", character_id)
 
     def get_animation(self, character_id, animation_id):
+        """
+        :return: a new playback cursor, the frames of the character are loaded first if they are not resident
+        """
+        self.assets.get("animations", character_id)
         return self.__animations.get_animation(character_id, animation_id)
 
+    def get_animation_clip(self, character_id, animation_id):
+        self.assets.get("animations", character_id)
+        return self.__animations.get_clip(character_id, animation_id)
+
     def get_animation_array(self, character_id, animation_id):
+        self.assets.get("animations", character_id)
         return self.__animations.get_animation_array(character_id, animation_id)
 
+    def release_scope(self, scope: str) -> None:
+        """
+        Drops the references of a scene to its assets, they are evicted once the budget needs the memory
+        """
+        self.assets.release_scope(scope)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        :return: per asset category the loaded and referenced assets, resident bytes, loads and evictions, plus
+        the bytes of the atlas pages
+        """
+        stats = self.assets.stats()
+        pages = self.loader.atlas.pages if self.loader.atlas else []
+        stats["atlas"] = {"loaded": len(pages), "referenced": len(pages), "bytes": asset_bytes(pages),
+                          "loads": len(pages), "evictions": 0}
+        return stats
+
     def get_font_manager(self):
         return self.__font_manager
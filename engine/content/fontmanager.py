@@ -5,8 +5,9 @@ import os
 
 
 class FontManager:
-    def __init__(self, path):
+    def __init__(self, path, loader=None):
         self.__path = path
+        self.loader = loader
         self.__fonts = {}
         self.__font_order = [
             "A",
@@ -42,20 +43,37 @@ class FontManager:
         self.char_width = 5
         self.char_height = 5
 
+    def names(self) -> dict[str, str]:
+        """
+        :return: name -> file name of every font, without loading them
+        """
+        return {img.split(".", 1)[0]: img for img in os.listdir(self.__path) if img.split(".")[-1] == "png"}
+
+    def load_font(self, name: str, file_name: str = None):
+        load = self.loader.load_img if self.loader else load_img
+        file_name = file_name or self.names().get(name)
+        if file_name is None:
+            return None
+        self.__fonts[name] = {}
+        _font_img = load(self.__path + "/" + file_name, (0, 0, 0))
+        for i in range(len(self.__font_order)):
+            subsurf = _font_img.subsurface(
+                pygame.Rect(i * self.char_width, 0, self.char_width, self.char_height)
+            )
+            self.__fonts[name][self.__font_order[i]] = subsurf
+        return self.__fonts[name]
+
+    def unload_font(self, name: str) -> None:
+        self.__fonts.pop(name, None)
+
     def load_images(self):
-        for img in os.listdir(self.__path):
-            if img.split(".")[-1] == "png":
-                name = img.split(".", 1)[0]
-                self.__fonts[name] = {}
-                _font_img = load_img(self.__path + "/" + img, (0, 0, 0))
-                for i in range(len(self.__font_order)):
-                    subsurf = _font_img.subsurface(
-                        pygame.Rect(i * self.char_width, 0, self.char_width, self.char_height)
-                    )
-                    self.__fonts[name][self.__font_order[i]] = subsurf
+        for name, file_name in self.names().items():
+            self.load_font(name, file_name)
 
     def get_surface(self, char):
-        return self.__fonts["base"][char]
+        return self.get_font()[char]
 
-    def get_font(self):
-        return self.__fonts["base"]
+    def get_font(self, name: str = "base"):
+        if name not in self.__fonts:
+            self.load_font(name)
+        return self.__fonts[name]
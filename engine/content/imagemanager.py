@@ -5,22 +5,40 @@ from engine.core.engine_core_funcs import load_img
 
 
 class ImageManager:
-    def __init__(self, path):
+    def __init__(self, path, loader=None):
         self.images = {}
         self.resource_path = path
+        self.loader = loader
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
-    def load_images(self):
+    def names(self) -> dict[str, str]:
+        """
+        :return: name -> file name of every image, without loading them
+        """
         try:
-            for img in os.listdir(self.resource_path):
-                if img.split(".")[-1] == "png":
-                    name = img.split(".", 1)[0]
-                    _img = load_img(self.resource_path + "/" + img, (0, 0, 0))
-                    self.images[name] = _img
+            return {img.split(".", 1)[0]: img for img in os.listdir(self.resource_path) if img.split(".")[-1] == "png"}
         except FileNotFoundError:
+            return {}
+
+    def load_image(self, name: str, file_name: str = None):
+        load = self.loader.load_img if self.loader else load_img
+        file_name = file_name or self.names().get(name)
+        if file_name is None:
+            return None
+        self.images[name] = load(self.resource_path + "/" + file_name, (0, 0, 0))
+        return self.images[name]
+
+    def unload_image(self, name: str) -> None:
+        self.images.pop(name, None)
+
+    def load_images(self):
+        names = self.names()
+        if not names and not os.path.isdir(self.resource_path):
             self.logger.warning("No images found at %s", self.resource_path)
-        else:
-            self.logger.info("Images loaded")
+            return
+        for name, file_name in names.items():
+            self.load_image(name, file_name)
+        self.logger.info("Images loaded")
 
     def get_image(self, name):
         return self.images[name]
@@ -0,0 +1,140 @@
+import io
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable
+
+import pygame
+
+
+def _decode_image(path: str) -> pygame.Surface:
+    with open(path, "rb") as f:
+        data = f.read()
+    return pygame.image.load(io.BytesIO(data), os.path.basename(path))
+
+
+def _decode_sound(path: str) -> pygame.mixer.Sound:
+    with open(path, "rb") as f:
+        data = f.read()
+    return pygame.mixer.Sound(file=io.BytesIO(data))
+
+
+class AssetLoader:
+    """
+    Decodes image and sound files on a thread pool. Files are requested up front and decoded in parallel, the
+    managers then take them with load_img and get_sound, which only wait if the file is not decoded yet. Images
+    are converted to the display format on the calling thread, convert and convert_alpha must not run on the
+    workers. Files of the atlas come out of it instead and are never decoded on their own.
+    """
+
+    def __init__(self, workers: int = 0, atlas=None):
+        """
+        :param workers: decoding threads, 0 for the cpu count capped at 8. With a single cpu the threads would only
+        compete with the main thread, the files are then decoded when they are taken
+        :param atlas: a TextureAtlas load_img serves the packed files from
+        """
+        self.atlas = atlas
+        cpus = os.cpu_count() or 1
+        workers = workers or (min(8, cpus) if cpus > 1 else 0)
+        self.__executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="AssetLoader") if workers else None
+        # normalized path -> future of the decoded file, until the file is taken
+        self.__pending: dict[str, Future] = {}
+        # notified by the worker that decoded the last requested file
+        self.__decoded = threading.Condition()
+        self.requested = 0
+        self.decoded = 0
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    @property
+    def progress(self) -> float:
+        """
+        :return: share of the requested files that are decoded, 1 if nothing was requested
+        """
+        return self.decoded / self.requested if self.requested else 1.0
+
+    @property
+    def finished(self) -> bool:
+        return self.decoded >= self.requested
+
+    def __count(self, _: Future) -> None:
+        # runs on the worker that finished the future
+        with self.__decoded:
+            self.decoded += 1
+            if self.decoded >= self.requested:
+                self.__decoded.notify_all()
+
+    def __request(self, paths: Iterable[str], decode) -> None:
+        if self.__executor is None:
+            return
+        for path in paths:
+            key = os.path.normpath(path)
+            if key in self.__pending:
+                continue
+            future = self.__executor.submit(decode, key)
+            self.__pending[key] = future
+            self.requested += 1
+            future.add_done_callback(self.__count)
+
+    def request_images(self, paths: Iterable[str]) -> None:
+        """
+        Starts decoding the image files
+        """
+        self.__request(paths, _decode_image)
+
+    def request_sounds(self, paths: Iterable[str]) -> None:
+        """
+        Starts decoding the sound files, the mixer has to be initialized
+        """
+        self.__request(paths, _decode_sound)
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Waits until all requested files are decoded or the timeout passed
+        :return: True if all requested files are decoded
+        """
+        with self.__decoded:
+            return self.__decoded.wait_for(lambda: self.finished, timeout)
+
+    def __take(self, path: str, decode):
+        key = os.path.normpath(path)
+        future = self.__pending.pop(key, None)
+        return future.result() if future is not None else decode(key)
+
+    def get_image(self, path: str) -> pygame.Surface:
+        """
+        :return: the unconverted image, decoded on the calling thread if it was not requested
+        """
+        return self.__take(path, _decode_image)
+
+    def get_sound(self, path: str) -> pygame.mixer.Sound:
+        """
+        :return: the sound, decoded on the calling thread if it was not requested
+        """
+        return self.__take(path, _decode_sound)
+
+    def load_img(self, path: str, colorkey=None, retain_alpha=False) -> pygame.Surface:
+        """
+        Drop in for engine_core_funcs.load_img, serves packed files from the atlas
+        """
+        surface = self.atlas.get(path) if self.atlas else None
+        if surface is not None:
+            return surface
+        img = self.get_image(path)
+        img = img.convert_alpha() if retain_alpha else img.convert()
+        if colorkey:
+            img.set_colorkey(colorkey)
+        return img
+
+    def release(self) -> None:
+        """
+        Drops decoded files nobody took, requested files still decoding are cancelled
+        """
+        for future in self.__pending.values():
+            future.cancel()
+        self.__pending.clear()
+
+    def shutdown(self) -> None:
+        self.release()
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
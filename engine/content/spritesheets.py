@@ -21,7 +21,7 @@ class Spritesheet:
     A class holding a single spritesheet and its sprite elements
     """
 
-    def __init__(self, path: str, colorkey=COLORKEY):
+    def __init__(self, path: str, colorkey=COLORKEY, loader=None):
         """
         the path directory gets recursively searched, all spritesheet pngs get added to the spritesheet variable
         if no config for the spritesheet exists, a config will be created with tilesetDefault values
@@ -30,6 +30,7 @@ class Spritesheet:
 
         :param path: a path to the folder with all the spritesheets (can have subfolders)
         :param colorkey: a colorkey to key out the background
+        :param loader: the AssetLoader the sheet is loaded through
         """
         self.id = path.split("/")[-1]
         self.tile_list = []
@@ -40,9 +41,10 @@ class Spritesheet:
         self.logger.info("os.path.exists: %s", os.path.exists(path))
         self.logger.info("os.path.isdir: %s", os.path.isdir(path))
 
+        load = loader.load_img if loader else load_img
         for img in os.listdir(path):
             if img.split(".")[-1] == "png":
-                self.spritesheet = load_img(path + "/" + img, None, False)
+                self.spritesheet = load(path + "/" + img, None, False)
         try:
             f = open(path + "/config.json", "r")
             self.config = json.loads(f.read())
@@ -85,21 +87,37 @@ class SpritesheetManager:
     getter function
     """
 
-    def __init__(self, path):
+    def __init__(self, path, loader=None):
         self.spritesheets = {}
         self.path = path
+        self.loader = loader
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
-    def load_spritesheets(self):
+    def names(self) -> list[str]:
+        """
+        :return: the names of all spritesheets, without loading them
+        """
         try:
-            for ssheet in os.listdir(self.path):
-                if ".py" in ssheet:
-                    continue
-                self.spritesheets[ssheet.lower()] = Spritesheet(self.path + "/" + ssheet.lower(), COLORKEY)
+            return [ssheet.lower() for ssheet in os.listdir(self.path) if ".py" not in ssheet]
         except FileNotFoundError:
+            return []
+
+    def load_spritesheet(self, name: str):
+        if not os.path.isdir(self.path + "/" + name):
+            return None
+        self.spritesheets[name] = Spritesheet(self.path + "/" + name, COLORKEY, self.loader)
+        return self.spritesheets[name]
+
+    def unload_spritesheet(self, name: str) -> None:
+        self.spritesheets.pop(name, None)
+
+    def load_spritesheets(self):
+        if not os.path.isdir(self.path):
             self.logger.warning("No spritesheets found at %s", self.path)
-        else:
-            self.logger.info("Spritesheets loaded")
+            return
+        for name in self.names():
+            self.load_spritesheet(name)
+        self.logger.info("Spritesheets loaded")
 
     def get_spritesheet(self, sheetname: str) -> list:
         """
@@ -0,0 +1,307 @@
+import math
+from dataclasses import dataclass, field
+from typing import Iterable
+
+import numpy as np
+from pygame import Rect, Vector2
+
+# columns of the contact array returned by CollisionGrid.move_batch
+CONTACT_GROUND = 0
+CONTACT_WALL = 1
+CONTACT_CEILING = 2
+
+
+@dataclass
+class CollisionResult:
+    position: Vector2
+    ground: bool = False
+    wall: bool = False
+    ceiling: bool = False
+
+
+@dataclass
+class RaycastResult:
+    # the first solid tile face on the ray, the end point if nothing was hit
+    point: Vector2
+    hit: bool = False
+    # outward normal of the hit face, (0, 0) if nothing was hit or the ray starts inside a solid tile
+    normal: Vector2 = field(default_factory=Vector2)
+
+
+class CollisionGrid:
+    """
+    A world wide boolean grid of solid tiles, composed from the collision grids of all loaded rooms.
+    It allows collision queries across room borders without looking up the room first and is the data
+    the vectorized movement and raycast queries read from. Cells outside of the grid are never solid.
+    """
+
+    def __init__(self, tile_size: int, solid_value: int = 1):
+        self.tile_size = tile_size
+        self.solid_value = solid_value
+        self.solid: np.ndarray = np.zeros((0, 0), dtype=bool)
+        # world tile index of solid[0, 0]
+        self.origin: tuple[int, int] = (0, 0)
+
+    def build(self, rooms: Iterable) -> None:
+        """
+        Allocates the grid so it covers all given rooms and stamps their collision grids into it
+        :param rooms: RoomData objects
+        :return: Nothing
+        """
+        rooms = list(rooms)
+        if not rooms:
+            self.solid = np.zeros((0, 0), dtype=bool)
+            self.origin = (0, 0)
+            return
+        ts = self.tile_size
+        x0 = min(r.position[0] for r in rooms) // ts
+        y0 = min(r.position[1] for r in rooms) // ts
+        x1 = max(r.position[0] // ts + max(-(-r.width // ts), r.collision_grid.shape[1]) for r in rooms)
+        y1 = max(r.position[1] // ts + max(-(-r.height // ts), r.collision_grid.shape[0]) for r in rooms)
+        self.origin = (x0, y0)
+        self.solid = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+        for room in rooms:
+            self.stamp(room)
+
+    def __room_window(self, room):
+        rows, columns = room.collision_grid.shape
+        gx = room.position[0] // self.tile_size - self.origin[0]
+        gy = room.position[1] // self.tile_size - self.origin[1]
+        return self.solid[gy:gy + rows, gx:gx + columns], rows, columns
+
+    def stamp(self, room) -> None:
+        window, rows, columns = self.__room_window(room)
+        window[...] = room.collision_grid[:window.shape[0], :window.shape[1]] == self.solid_value
+
+    def clear(self, room) -> None:
+        window, _, _ = self.__room_window(room)
+        window[...] = False
+
+    def sample(self, tx, ty) -> np.ndarray:
+        """
+        Vectorized solid lookup
+        :param tx: world tile x indices (array like)
+        :param ty: world tile y indices (array like), broadcastable against tx
+        :return: boolean array, True where the tile is solid
+        """
+        gx, gy = np.broadcast_arrays(
+            np.asarray(tx, dtype=np.int64) - self.origin[0], np.asarray(ty, dtype=np.int64) - self.origin[1]
+        )
+        rows, columns = self.solid.shape
+        inside = (gx >= 0) & (gx < columns) & (gy >= 0) & (gy < rows)
+        result = np.zeros(gx.shape, dtype=bool)
+        result[inside] = self.solid[gy[inside], gx[inside]]
+        return result
+
+    def __sweep(self, lead, target, span0, span1, horizontal):
+        """
+        Sweeps the leading edges of N boxes along one axis
+        :param lead: leading edge in pixels, right/bottom edge when moving positive, left/top edge otherwise
+        :param target: leading edge after the move
+        :param span0: first tile index covered on the other axis
+        :param span1: last tile index covered on the other axis
+        :param horizontal: True if sweeping along x
+        :return: (hit mask, pixel coordinate the leading edge is stopped at)
+        """
+        ts = self.tile_size
+        positive = target > lead
+        # tiles whose near face lies in the swept interval
+        first = np.where(positive, np.ceil(lead / ts), np.floor(target / ts)).astype(np.int64)
+        last = np.where(positive, np.ceil(target / ts) - 1, np.floor(lead / ts) - 1).astype(np.int64)
+        count = np.maximum(last - first + 1, 0)
+        hit = np.zeros(lead.shape, dtype=bool)
+        stop = target.copy()
+        if not count.any():
+            return hit, stop
+
+        steps = np.arange(int(count.max()))
+        # walk from the tile closest to the start of the move outwards
+        along = np.where(positive[:, None], first[:, None] + steps, last[:, None] - steps)
+        valid = steps[None, :] < count[:, None]
+        spans = np.arange(int((span1 - span0).max()) + 1)
+        across = span0[:, None] + spans
+        across_valid = across <= span1[:, None]
+        if horizontal:
+            cells = self.sample(along[:, None, :], across[:, :, None])
+        else:
+            cells = self.sample(across[:, :, None], along[:, None, :])
+        blocked = (cells & across_valid[:, :, None]).any(axis=1) & valid
+        hit = blocked.any(axis=1)
+        tile = along[np.arange(len(lead)), blocked.argmax(axis=1)]
+        stop = np.where(hit, np.where(positive, tile * ts, (tile + 1) * ts), target)
+        return hit, stop
+
+    def move_batch(self, rects, velocities) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Moves N axis aligned boxes by their velocity and resolves them against the solid tiles, x first then y.
+        :param rects: array like of shape (N, 4) with x, y, w, h in world pixels
+        :param velocities: array like of shape (N, 2) with the movement of this step in pixels
+        :return: resolved top left positions (N, 2) and contact flags (N, 3), see the CONTACT_* columns
+        """
+        rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        velocities = np.asarray(velocities, dtype=np.float64).reshape(-1, 2)
+        x, y, w, h = rects.T
+        vx, vy = velocities.T
+        ts = self.tile_size
+        contacts = np.zeros((len(rects), 3), dtype=bool)
+
+        # horizontal pass
+        row0 = np.floor(y / ts).astype(np.int64)
+        row1 = (np.ceil((y + h) / ts) - 1).astype(np.int64)
+        lead = np.where(vx > 0, x + w, x)
+        hit, stop = self.__sweep(lead, lead + vx, row0, row1, horizontal=True)
+        x = np.where(vx > 0, stop - w, stop)
+        contacts[:, CONTACT_WALL] = hit
+
+        # vertical pass with the resolved x
+        col0 = np.floor(x / ts).astype(np.int64)
+        col1 = (np.ceil((x + w) / ts) - 1).astype(np.int64)
+        lead = np.where(vy > 0, y + h, y)
+        hit, stop = self.__sweep(lead, lead + vy, col0, col1, horizontal=False)
+        y = np.where(vy > 0, stop - h, stop)
+        contacts[:, CONTACT_CEILING] = hit & (vy < 0)
+
+        # standing on ground also counts when not moving down, probe the pixel row below the feet
+        feet = np.floor((y + h) / ts).astype(np.int64)
+        spans = np.arange(int((col1 - col0).max()) + 1) if len(rects) else np.arange(0)
+        across = col0[:, None] + spans
+        below = self.sample(across, feet[:, None]) & (across <= col1[:, None])
+        contacts[:, CONTACT_GROUND] = (hit & (vy > 0)) | ((vy >= 0) & below.any(axis=1))
+        return np.stack((x, y), axis=1), contacts
+
+    def move(self, rect: Rect, velocity) -> CollisionResult:
+        """
+        Single box version of move_batch
+        :param rect: the entity rect in world pixels
+        :param velocity: movement of this step in pixels
+        :return: the resolved position and contact flags
+        """
+        positions, contacts = self.move_batch(
+            ((rect[0], rect[1], rect[2], rect[3]),), ((velocity[0], velocity[1]),)
+        )
+        return CollisionResult(
+            position=Vector2(positions[0, 0], positions[0, 1]),
+            ground=bool(contacts[0, CONTACT_GROUND]),
+            wall=bool(contacts[0, CONTACT_WALL]),
+            ceiling=bool(contacts[0, CONTACT_CEILING]),
+        )
+
+    def __crossings(self, origin, delta, cell, count, step, steps):
+        """
+        Ray parameters of the tile borders N rays cross along one axis
+        :return: (N, steps) array of t in [0, 1], inf past the count of crossed borders
+        """
+        k = np.arange(steps)
+        border = cell[:, None] + (step > 0)[:, None] + step[:, None] * k
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (border - origin[:, None]) / delta[:, None]
+        t[k >= count[:, None]] = np.inf
+        return t
+
+    def raycast_batch(self, starts, ends) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Casts N rays from their start to their end point and finds the first solid tile on each, a DDA over all
+        rays at once: the borders every ray crosses are merged in the order they are crossed and the tiles behind
+        them are sampled in one go.
+        :param starts: array like of shape (N, 2) in world pixels
+        :param ends: array like of shape (N, 2) in world pixels
+        :return: hit mask (N,), hit points (N, 2), the end point where nothing was hit, and the outward normals
+        of the hit tile faces (N, 2), zero where nothing was hit or the ray starts inside a solid tile
+        """
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+        n = len(starts)
+        origin = starts / self.tile_size
+        delta = ends / self.tile_size - origin
+        cell = np.floor(origin).astype(np.int64)
+        step = np.sign(delta).astype(np.int64)
+        count = np.abs(np.floor(origin + delta).astype(np.int64) - cell)
+        inside = self.sample(cell[:, 0], cell[:, 1])
+
+        steps_x = int(count[:, 0].max()) if n else 0
+        steps_y = int(count[:, 1].max()) if n else 0
+        t = np.concatenate((
+            self.__crossings(origin[:, 0], delta[:, 0], cell[:, 0], count[:, 0], step[:, 0], steps_x),
+            self.__crossings(origin[:, 1], delta[:, 1], cell[:, 1], count[:, 1], step[:, 1], steps_y),
+        ), axis=1)
+        hit = inside.copy()
+        normals = np.zeros((n, 2))
+        t_hit = np.where(inside, 0.0, 1.0)
+        if t.shape[1]:
+            order = np.argsort(t, axis=1, kind="stable")
+            t = np.take_along_axis(t, order, axis=1)
+            # True where the crossing is a horizontal border, i.e. the ray moves on to the next row
+            vertical = order >= steps_x
+            tx = cell[:, 0, None] + step[:, 0, None] * np.cumsum(~vertical, axis=1)
+            ty = cell[:, 1, None] + step[:, 1, None] * np.cumsum(vertical, axis=1)
+            solid = self.sample(tx, ty) & np.isfinite(t)
+            first = solid.argmax(axis=1)
+            rows = np.arange(n)
+            entered = solid[rows, first] & ~inside
+            hit |= entered
+            t_hit = np.where(entered, t[rows, first], t_hit)
+            crossed_row = vertical[rows, first]
+            normals[:, 0] = np.where(entered & ~crossed_row, -step[:, 0], 0)
+            normals[:, 1] = np.where(entered & crossed_row, -step[:, 1], 0)
+        points = starts + (ends - starts) * t_hit[:, None]
+        return hit, points, normals
+
+    def raycast(self, start, end) -> RaycastResult:
+        """
+        Single ray version of raycast_batch. Walks the tiles one by one, for a single ray that is cheaper than
+        setting up the arrays
+        :param start: world position
+        :param end: world position
+        :return: the hit point, whether a solid tile was hit and the normal of its face
+        """
+        ts = self.tile_size
+        start = float(start[0]), float(start[1])
+        end = float(end[0]), float(end[1])
+        ox, oy = start[0] / ts, start[1] / ts
+        dx, dy = end[0] / ts - ox, end[1] / ts - oy
+        cx, cy = math.floor(ox), math.floor(oy)
+        sx, sy = (dx > 0) - (dx < 0), (dy > 0) - (dy < 0)
+        nx, ny = abs(math.floor(ox + dx) - cx), abs(math.floor(oy + dy) - cy)
+        solid = self.solid
+        rows, columns = solid.shape
+        gx0, gy0 = self.origin
+
+        def is_solid(x, y):
+            x -= gx0
+            y -= gy0
+            return 0 <= x < columns and 0 <= y < rows and solid[y, x]
+
+        if is_solid(cx, cy):
+            return RaycastResult(point=Vector2(start[0], start[1]), hit=True)
+        # ray parameter of the next border on each axis, the borders on x win ties like in raycast_batch
+        tx = (cx + (sx > 0) - ox) / dx if nx else math.inf
+        ty = (cy + (sy > 0) - oy) / dy if ny else math.inf
+        while nx or ny:
+            if tx <= ty:
+                cx += sx
+                nx -= 1
+                t, normal = tx, (-sx, 0)
+                tx = (cx + (sx > 0) - ox) / dx if nx else math.inf
+            else:
+                cy += sy
+                ny -= 1
+                t, normal = ty, (0, -sy)
+                ty = (cy + (sy > 0) - oy) / dy if ny else math.inf
+            if is_solid(cx, cy):
+                return RaycastResult(
+                    point=Vector2(start[0] + (end[0] - start[0]) * t, start[1] + (end[1] - start[1]) * t),
+                    hit=True,
+                    normal=Vector2(normal),
+                )
+        return RaycastResult(point=Vector2(end[0], end[1]))
+
+    def line_of_sight_batch(self, starts, ends) -> np.ndarray:
+        """
+        :param starts: array like of shape (N, 2) in world pixels
+        :param ends: array like of shape (N, 2) in world pixels
+        :return: boolean array (N,), True where no solid tile is between start and end
+        """
+        return ~self.raycast_batch(starts, ends)[0]
+
+    def line_of_sight(self, start, end) -> bool:
+        return not self.raycast(start, end).hit
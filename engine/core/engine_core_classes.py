@@ -67,6 +67,8 @@ class Line:
 
     def raycast(self, tile_map: dict, target_position: pygame.Vector2, tile_size: int) -> pygame.Vector2:
         """
+        Deprecated, probes a dict of tiles the Tilemap no longer has. Use Tilemap.raycast and
+        Tilemap.line_of_sight, or their batch versions, which read the collision grid across room borders.
         Calculates the pixel position of where the line object intersects with the tiles on a tilemap
         E.g. if you want to test the line of sight you pass in the target_position of the enemy or the player_entities as vector2
         If the function returns False, meaning your line does not collide with a rect, there is line of sight as no tiles obstruct the view
@@ -0,0 +1,139 @@
+import logging
+import random
+import time
+import zlib
+from typing import Callable, Optional
+
+import numpy as np
+import pygame
+
+from engine.config.projectconfig import GameSettings, ResourcePaths, WindowSettings
+from engine.content.contentmanager_new import ContentManager
+from engine.core.gamecontext import GameContext
+from engine.core.profiler import PROFILER, percentile_summary
+from engine.core.savegame import SaveGame
+from engine.eventsystem.eventbus import EventBus
+from engine.input.scripted import ScriptedInput
+from engine.render.headless.window import Window
+from engine.render.moderngl.renderer import Renderer
+from engine.scene.scene import Scene
+from engine.scene.scenemanager import SceneManager
+from engine.sound.soundmanager import SoundManager
+
+
+class StageTimings:
+    """
+    Collects every frame of PROFILER.last_frame for a whole run, unlike the ring buffers of the profiler, so the
+    percentiles cover all measured frames. Stages that did not run in a frame get no sample.
+    """
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+
+    def add_frame(self, stages: dict[str, float]) -> None:
+        for stage, seconds in stages.items():
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def clear(self) -> None:
+        self.samples.clear()
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        :return: per stage the amount of samples and the mean, p50, p95, p99 and max in milliseconds
+        """
+        return {stage: {"frames": len(samples), **percentile_summary(samples)}
+                for stage, samples in self.samples.items()}
+
+
+class HeadlessRunner:
+    """
+    Runs a scene without a window: offscreen display, scripted input, seeded random and a fixed frame time.
+    Every frame runs input, one simulation tick and the render, as fast as possible. The same seed and script give
+    the same frames, see capture. The PROFILER is enabled, every frame of its stages plus the whole frame time is
+    kept in timings.
+    """
+
+    def __init__(
+        self,
+        scene_factory: Callable[[GameContext], Scene],
+        seed: int = 16,
+        script: Optional[dict] = None,
+        window_settings: Optional[WindowSettings] = None,
+        game_settings: Optional[GameSettings] = None,
+        resource_paths: Optional[ResourcePaths] = None,
+        capture: bool = False,
+    ):
+        """
+        :param scene_factory: creates the scene to run from the GameContext, e.g. the scene class
+        :param seed: seeds random and the numpy legacy generator before anything is created
+        :param script: input events per frame, see ScriptedInput. More can be added through runner.input
+        :param capture: keep a crc32 of every rendered frame in frame_checksums
+        """
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        random.seed(seed)
+        np.random.seed(seed)
+
+        self.ctx = GameContext()
+        self.ctx.set_game_settings(game_settings or GameSettings())
+        self.ctx.set_window_settings(window_settings or WindowSettings())
+        self.ctx.set_resource_paths(resource_paths or ResourcePaths())
+
+        self.ctx.set_window(Window(self.ctx))
+        self.ctx.set_input(ScriptedInput(self.ctx, script))
+        self.ctx.set_global_eventmanager(EventBus())
+        self.ctx.set_content(ContentManager(self.ctx))
+        self.ctx.set_renderer(Renderer(self.ctx))
+        self.ctx.set_savegame(SaveGame(self.ctx))
+        self.ctx.set_sound(SoundManager(self.ctx))
+        self.ctx.set_scene_manager(SceneManager(self.ctx))
+        self.ctx.freeze()
+
+        self.dt = 1 / self.ctx.game_settings.tick_rate
+        self.timings = StageTimings()
+        PROFILER.enabled = True
+        PROFILER.reset()
+        self.capture = capture
+        self.frame_checksums: list[int] = []
+
+        self.scene = scene_factory(self.ctx)
+        self.ctx.scene_manager.register_scene(self.scene)
+        self.ctx.scene_manager.set_active_scene(self.scene)
+
+    @property
+    def input(self) -> ScriptedInput:
+        return self.ctx.input
+
+    @property
+    def frame(self) -> int:
+        return self.ctx.window.frame
+
+    def step(self) -> None:
+        """
+        Runs a single frame
+        """
+        start = time.perf_counter()
+        with PROFILER.stage("input"):
+            self.ctx.input.update()
+        self.ctx.scene_manager.update(self.dt)
+        self.ctx.input.end_tick()
+        self.ctx.renderer.render(1.0)
+        if self.capture:
+            self.frame_checksums.append(zlib.crc32(pygame.image.tobytes(self.ctx.window.display, "RGBA")))
+        # ends the frame of the profiler
+        self.ctx.window.render_frame()
+        self.timings.add_frame({"frame": time.perf_counter() - start, **PROFILER.last_frame})
+
+    def run(self, frames: int, warmup: int = 0) -> dict[str, dict[str, float]]:
+        """
+        :param frames: amount of measured frames
+        :param warmup: frames run before the measurement, e.g. to fill caches
+        :return: StageTimings.summary of the measured frames
+        """
+        for _ in range(warmup):
+            self.step()
+        self.timings.clear()
+        start = time.perf_counter()
+        for _ in range(frames):
+            self.step()
+        self.logger.info("%d frames in %.3f s", frames, time.perf_counter() - start)
+        return self.timings.summary()
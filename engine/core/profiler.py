@@ -0,0 +1,222 @@
+import csv
+import json
+import time
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile_summary(seconds) -> dict[str, float]:
+    """
+    :param seconds: samples in seconds
+    :return: mean, p50, p95, p99 and max of the samples in milliseconds
+    """
+    ms = np.asarray(seconds, dtype=float) * 1000
+    return {
+        "mean": float(ms.mean()),
+        **{f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES))},
+        "max": float(ms.max()),
+    }
+
+
+class _Scope:
+    __slots__ = ("profiler", "stage", "start")
+
+    def __init__(self, profiler: "Profiler", stage: str):
+        self.profiler = profiler
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class Profiler:
+    """
+    Per stage frame timings kept in ring buffers of the last history frames. Subsystems wrap their work in
+    `with PROFILER.stage("name"):`, a stage entered several times in a frame adds up. Stages are inclusive, a stage
+    entered inside another one, e.g. particles.update inside entities.update, is also part of the outer one.
+    Counters, e.g. drawn and culled sprites, are kept the same way: count adds to the counter of the current frame.
+    While disabled stage returns a shared no-op scope, count and end_frame return right away.
+    """
+
+    def __init__(self, history: int = 240, enabled: bool = False):
+        """
+        :param history: amount of frames kept per stage
+        :param enabled: record timings
+        """
+        self.enabled = enabled
+        self.size = history
+        # seconds per stage of the frame that is currently running
+        self.current: dict[str, float] = {}
+        # seconds per stage of the last finished frame
+        self.last_frame: dict[str, float] = {}
+        # counters of the current and the last finished frame
+        self.current_counts: dict[str, int] = {}
+        self.last_counts: dict[str, int] = {}
+        self.frames = 0
+        self.__index = 0
+        self.__frame_times = np.zeros(history)
+        self.__stages: dict[str, np.ndarray] = {}
+        self.__counters: dict[str, np.ndarray] = {}
+        self.__last_end = None
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.current[name] = self.current.get(name, 0.0) + seconds
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Adds to a counter of the current frame
+        """
+        if self.enabled:
+            self.current_counts[name] = self.current_counts.get(name, 0) + amount
+
+    def end_frame(self, frame_time: float = None) -> None:
+        """
+        Moves the timings of the current frame into the ring buffers
+        :param frame_time: seconds of the whole frame, the time since the last end_frame if None
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if frame_time is None:
+            frame_time = now - self.__last_end if self.__last_end is not None else 0.0
+        self.__last_end = now
+        i = self.__index
+        self.__frame_times[i] = frame_time
+        for name in self.current.keys() - self.__stages.keys():
+            self.__stages[name] = np.zeros(self.size)
+        for name, buffer in self.__stages.items():
+            buffer[i] = self.current.get(name, 0.0)
+        for name in self.current_counts.keys() - self.__counters.keys():
+            self.__counters[name] = np.zeros(self.size)
+        for name, buffer in self.__counters.items():
+            buffer[i] = self.current_counts.get(name, 0)
+        self.__index = (i + 1) % self.size
+        self.frames += 1
+        self.last_frame, self.current = self.current, {}
+        self.last_counts, self.current_counts = self.current_counts, {}
+
+    def reset(self) -> None:
+        self.current = {}
+        self.last_frame = {}
+        self.current_counts = {}
+        self.last_counts = {}
+        self.frames = 0
+        self.__index = 0
+        self.__frame_times[:] = 0
+        self.__stages.clear()
+        self.__counters.clear()
+        self.__last_end = None
+
+    @property
+    def stages(self) -> list[str]:
+        return list(self.__stages)
+
+    def __ordered(self, buffer: np.ndarray) -> np.ndarray:
+        if self.frames < self.size:
+            return buffer[:self.frames].copy()
+        return np.roll(buffer, -self.__index)
+
+    def frame_times(self) -> np.ndarray:
+        """
+        :return: seconds of the recorded frames, oldest first
+        """
+        return self.__ordered(self.__frame_times)
+
+    def history(self, name: str) -> np.ndarray:
+        """
+        :param name: a stage name
+        :return: seconds of the stage in the recorded frames, oldest first, 0 where the stage did not run
+        """
+        buffer = self.__stages.get(name)
+        if buffer is None:
+            return np.zeros(min(self.frames, self.size))
+        return self.__ordered(buffer)
+
+    @property
+    def counters(self) -> list[str]:
+        return list(self.__counters)
+
+    def counter_history(self, name: str) -> np.ndarray:
+        """
+        :return: the counter in the recorded frames, oldest first, 0 where nothing was counted
+        """
+        buffer = self.__counters.get(name)
+        if buffer is None:
+            return np.zeros(min(self.frames, self.size))
+        return self.__ordered(buffer)
+
+    def counter_summary(self) -> dict[str, dict[str, float]]:
+        """
+        :return: per counter the mean and max per frame over the recorded frames
+        """
+        if not self.frames:
+            return {}
+        return {name: {"mean": float(values.mean()), "max": float(values.max())}
+                for name, values in ((name, self.counter_history(name)) for name in self.__counters)}
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        :return: per stage and for the whole frame the mean, p50, p95, p99 and max in milliseconds
+        """
+        if not self.frames:
+            return {}
+        summary = {"frame": percentile_summary(self.frame_times())}
+        for name in self.__stages:
+            summary[name] = percentile_summary(self.history(name))
+        return summary
+
+    def dump_csv(self, path) -> None:
+        """
+        Writes one row per recorded frame with the frame time and every stage in milliseconds
+        """
+        stages = self.stages
+        columns = np.column_stack([self.frame_times(), *(self.history(s) for s in stages)]) * 1000
+        first = self.frames - len(columns)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "frame_ms", *(f"{s}_ms" for s in stages)])
+            for i, row in enumerate(columns):
+                writer.writerow([first + i, *(f"{v:.4f}" for v in row)])
+
+    def dump_json(self, path) -> None:
+        """
+        Writes the summary plus the raw milliseconds of every recorded frame
+        """
+        data = {
+            "frames": self.frames,
+            "summary": self.summary(),
+            "frame_ms": (self.frame_times() * 1000).round(4).tolist(),
+            "stages_ms": {s: (self.history(s) * 1000).round(4).tolist() for s in self.stages},
+            "counters": self.counter_summary(),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+# the profiler the engine subsystems record into, enabled through GameSettings.profiling
+PROFILER = Profiler()
@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pygame
+
+"""
+A packed cache of an LDtk simplified export. All rooms are stored in a single file:
+
+    magic (8 bytes) | version (uint32) | header length (uint32) | json header | data blobs
+
+The json header holds the room metadata (position, size, entities), the source stamps used for invalidation and
+offsets into the data blobs. The blobs are the raw uint8 collision grids and the composite images as RGB bytes,
+so loading a room is a memory mapped slice instead of csv parsing and png decoding.
+
+Build it with:
+
+    python -m engine.core.roomcache <path to the simplified export>
+"""
+
+CACHE_FILE_NAME = "rooms.cache"
+MAGIC = b"PYCO16RC"
+VERSION = 1
+SOURCE_FILES = ("Collision_Layer.csv", "data.json", "_composite.png")
+_PREAMBLE = struct.Struct("<8sII")
+
+logger = logging.getLogger(__name__)
+
+
+def _level_folders(rooms_path: Path) -> list[Path]:
+    return sorted((d for d in rooms_path.iterdir() if d.is_dir()), key=lambda p: p.name)
+
+
+def source_stamps(rooms_path: Path) -> dict[str, list[int]]:
+    """
+    :param rooms_path: path of the simplified export
+    :return: per level folder the mtime and size of every source file, used to detect a stale cache
+    """
+    # plain os calls, this runs on every boot and pathlib dominates the cost for thousands of rooms
+    stamps = {}
+    for entry in sorted((e for e in os.scandir(rooms_path) if e.is_dir()), key=lambda e: e.name):
+        stamp = []
+        for name in SOURCE_FILES:
+            st = os.stat(os.path.join(entry.path, name))
+            stamp.extend((st.st_mtime_ns, st.st_size))
+        stamps[entry.name] = stamp
+    return stamps
+
+
+def build_room_cache(rooms_path, cache_path=None) -> Path:
+    """
+    Packs every level folder of the export into a single cache file. Needs an initialized pygame display
+    (a dummy video driver is fine) as the composite images are converted the same way the Tilemap does it
+    :param rooms_path: path of the simplified export
+    :param cache_path: output file, defaults to rooms_path/rooms.cache
+    :return: the path of the written cache
+    """
+    # imported here, tilemap imports this module
+    from engine.core.tilemap import COMPOSITE_COLORKEY, read_collision_layer
+
+    rooms_path = Path(rooms_path)
+    cache_path = Path(cache_path) if cache_path else rooms_path / CACHE_FILE_NAME
+    rooms = []
+    blobs = []
+    offset = 0
+
+    def add_blob(data: bytes) -> int:
+        nonlocal offset
+        start = offset
+        blobs.append(data)
+        offset += len(data)
+        return start
+
+    for folder in _level_folders(rooms_path):
+        with (folder / "data.json").open("r", encoding="utf-8") as f:
+            level_data = json.load(f)
+        grid = np.ascontiguousarray(read_collision_layer(folder / "Collision_Layer.csv"), dtype=np.uint8)
+        img = pygame.image.load(str(folder / "_composite.png")).convert()
+        img.set_colorkey(COMPOSITE_COLORKEY)
+        rooms.append({
+            "folder": folder.name,
+            "x": level_data["x"],
+            "y": level_data["y"],
+            "width": level_data["width"],
+            "height": level_data["height"],
+            "entities": level_data["entities"],
+            "grid": [add_blob(grid.tobytes()), *grid.shape],
+            "pixels": [add_blob(pygame.image.tobytes(img, "RGB")), img.get_width(), img.get_height()],
+        })
+
+    header = json.dumps({"sources": source_stamps(rooms_path), "rooms": rooms}).encode("utf-8")
+    with cache_path.open("wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    logger.info("Wrote room cache with %d rooms to %s", len(rooms), cache_path)
+    return cache_path
+
+
+class RoomCache:
+    """
+    Read only view of a cache written by build_room_cache. The data section is memory mapped, collision grids are
+    returned as views into it and images are only copied once when they get converted.
+    """
+
+    def __init__(self, cache_path):
+        self.path = Path(cache_path)
+        with self.path.open("rb") as f:
+            magic, version, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{self.path} is not a version {VERSION} room cache")
+            header = json.loads(f.read(header_length).decode("utf-8"))
+        self.sources: dict[str, list[int]] = header["sources"]
+        self.rooms: list[dict] = header["rooms"]
+        self.__by_folder = {room["folder"]: room for room in self.rooms}
+        self.__data = np.memmap(self.path, dtype=np.uint8, mode="r", offset=_PREAMBLE.size + header_length)
+
+    @classmethod
+    def open_if_valid(cls, rooms_path) -> Optional["RoomCache"]:
+        """
+        :param rooms_path: path of the simplified export
+        :return: the cache of the export if it exists and matches the sources, None otherwise
+        """
+        rooms_path = Path(rooms_path)
+        cache_path = rooms_path / CACHE_FILE_NAME
+        if not cache_path.is_file():
+            return None
+        try:
+            cache = cls(cache_path)
+            stale = cache.sources != source_stamps(rooms_path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable room cache %s: %r", cache_path, e)
+            return None
+        if stale:
+            logger.warning("Room cache %s is stale, loading the LDtk export. Rebuild it with "
+                           "python -m engine.core.roomcache", cache_path)
+            return None
+        return cache
+
+    def get_level_data(self, folder: Path) -> dict:
+        return self.__by_folder[Path(folder).name]
+
+    def read_payload(self, folder: Path) -> tuple[np.ndarray, pygame.Surface]:
+        """
+        Same contract as tilemap.read_room_payload, safe to call from a worker thread
+        :param folder: the level folder
+        :return: collision grid (read only view) and the unconverted composite image
+        """
+        room = self.__by_folder[Path(folder).name]
+        offset, rows, columns = room["grid"]
+        grid = self.__data[offset:offset + rows * columns].reshape(rows, columns)
+        offset, width, height = room["pixels"]
+        pixels = self.__data[offset:offset + width * height * 3]
+        return grid, pygame.image.frombuffer(pixels, (width, height), "RGB")
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    logging.basicConfig(level=logging.INFO)
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    build_room_cache(sys.argv[1])
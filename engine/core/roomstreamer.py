@@ -0,0 +1,104 @@
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+
+class RoomStreamer:
+    """
+    Streams room payloads (collision grid and composite image) in and out around a focus position.
+    Only the metadata of every room is known up front. The focus room is loaded synchronously if it is not
+    resident yet, its neighbours are decoded on a worker thread and finished on the main thread.
+    Resident rooms are evicted least recently used first once the room count or megabyte budget is exceeded,
+    the focus room and its neighbours are never evicted.
+    """
+
+    def __init__(self, tilemap, loader: Callable, max_rooms: int = 16, max_megabytes: float = 64):
+        """
+        :param tilemap: the Tilemap owning the rooms
+        :param loader: decodes a level folder into (collision grid, unconverted surface), runs on the worker
+        :param max_rooms: maximum amount of resident rooms
+        :param max_megabytes: maximum memory of all resident payloads
+        """
+        self.tilemap = tilemap
+        self.loader = loader
+        self.max_rooms = max_rooms
+        self.max_bytes = int(max_megabytes * 1024 * 1024)
+        self.resident: OrderedDict = OrderedDict()
+        self.pending: dict = {}
+        self.focus_room = None
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="RoomStreamer")
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(room.payload_bytes for room in self.resident.values())
+
+    def update(self, world_position) -> None:
+        room = self.tilemap.get_room_at_point(world_position[0], world_position[1])
+        self.__finish_pending()
+        if room is None:
+            return
+        self.focus_room = room
+        if not room.loaded:
+            self.load_now(room)
+        self.__touch(room)
+
+        neighbours = self.tilemap.get_neighbour_rooms(room)
+        for neighbour in neighbours:
+            if neighbour.loaded:
+                self.__touch(neighbour)
+            elif neighbour.room_key not in self.pending:
+                self.pending[neighbour.room_key] = (neighbour, self.__executor.submit(self.loader, neighbour.folder))
+        self.__evict({room.room_key, *(n.room_key for n in neighbours)})
+
+    def load_now(self, room) -> None:
+        """
+        Loads a room on the calling thread, waiting for a prefetch of it if one is already running
+        :param room: the RoomData to load
+        :return: Nothing
+        """
+        pending = self.pending.pop(room.room_key, None)
+        payload = pending[1].result() if pending else self.loader(room.folder)
+        self.__apply(room, payload)
+
+    def __finish_pending(self) -> None:
+        for room_key, (room, future) in list(self.pending.items()):
+            if not future.done():
+                continue
+            del self.pending[room_key]
+            self.__apply(room, future)
+
+    def __apply(self, room, payload) -> None:
+        if isinstance(payload, Future):
+            try:
+                payload = payload.result()
+            except (OSError, ValueError) as e:
+                self.logger.error("Failed to stream room %s: %r", room.folder, e)
+                return
+        room.apply_payload(*payload)
+        self.tilemap.collision.stamp(room)
+        self.tilemap.render_cache.invalidate(room.room_bounding_box)
+        self.__touch(room)
+        self.logger.debug("Streamed in room %s", room.folder)
+
+    def __touch(self, room) -> None:
+        self.resident[room.room_key] = room
+        self.resident.move_to_end(room.room_key)
+
+    def __evict(self, keep: set) -> None:
+        for room_key in list(self.resident.keys()):
+            if len(self.resident) <= self.max_rooms and self.resident_bytes <= self.max_bytes:
+                return
+            if room_key in keep:
+                continue
+            room = self.resident.pop(room_key)
+            # the collision mask window is derived from the grid shape, clear it before dropping the grid
+            self.tilemap.collision.clear(room)
+            self.tilemap.render_cache.invalidate(room.room_bounding_box)
+            room.unload_payload()
+            self.logger.debug("Evicted room %s", room.folder)
+
+    def shutdown(self) -> None:
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+        self.pending.clear()
@@ -1,17 +1,51 @@
+import bisect
 import logging
 
+import numpy as np
 import pygame
 
+from engine.core.collision import CollisionGrid, CollisionResult, RaycastResult
+from engine.core.profiler import PROFILER
 from engine.core.tile import Tile
 from pygame import Surface
 import json
-import csv
 
-from engine.core.engine_core_funcs import load_img
+from engine.core.roomcache import RoomCache
+from engine.core.roomstreamer import RoomStreamer
+from engine.render.renderchunks import RenderChunkCache
 from pathlib import Path
 from typing import Optional
 
 
+# IntGrid value of solid cells in the collision layer
+TILE_SOLID = 1
+# background color of the LDtk composite images
+COMPOSITE_COLORKEY = (24, 20, 37)
+
+
+def read_collision_layer(path: Path) -> np.ndarray:
+    """
+    Reads an LDtk IntGrid csv export (one row per line, trailing comma) into a uint8 grid
+    :param path: path to the csv file
+    :return: the grid indexed as [y, x]
+    """
+    with path.open("r", encoding="utf-8") as f:
+        lines = [line.rstrip(",") for line in f.read().splitlines() if line.strip()]
+    if not lines:
+        return np.zeros((0, 0), dtype=np.uint8)
+    return np.fromstring(",".join(lines), dtype=np.uint8, sep=",").reshape(len(lines), -1)
+
+
+def read_room_payload(folder: Path) -> tuple[np.ndarray, Surface]:
+    """
+    Decodes the collision layer and the composite image of a level folder. Nothing here touches the display,
+    so it is safe to call from a worker thread
+    :param folder: the level folder of the simplified export
+    :return: collision grid and the unconverted composite image
+    """
+    return read_collision_layer(folder / "Collision_Layer.csv"), pygame.image.load(str(folder / "_composite.png"))
+
+
 class EntityData:
     def __init__(self):
         self.all_entities = {}
@@ -20,57 +54,98 @@ class EntityData:
 
 class RoomData:
     def __init__(self, tile_size):
-        self.collider_array = []
-        self.tile_array = []
+        # IntGrid values of the collision layer indexed as [y, x], Tile objects are only created on demand
+        self.collision_grid: np.ndarray = np.zeros((0, 0), dtype=np.uint8)
         self.composite_img = None
         self.position = [0, 0]
         self.width = 0
         self.height = 0
         self.__tile_size = tile_size
         self.entities = {}
+        # level folder of the export, payloads are read from here when streaming
+        self.folder: Optional[Path] = None
+        # False while only the metadata of the room is known
+        self.loaded = False
 
     @property
     def room_bounding_box(self):
         return [self.position[0], self.position[1], self.width, self.height]
 
-    def get_tile(self, x, y) -> Optional[Tile]:
+    @property
+    def room_key(self) -> tuple[int, int, int, int]:
+        return self.position[0], self.position[1], self.width, self.height
+
+    @property
+    def payload_bytes(self) -> int:
+        """
+        :return: approximate memory held by the collision grid and the composite image
+        """
+        size = self.collision_grid.nbytes
+        if self.composite_img is not None:
+            size += self.composite_img.get_width() * self.composite_img.get_height() * self.composite_img.get_bytesize()
+        return size
+
+    def apply_payload(self, collision_grid: np.ndarray, composite_img: Surface) -> None:
+        """
+        Sets the decoded collision grid and composite image of this room. The image gets converted here, so this
+        has to be called from the main thread
+        """
+        self.collision_grid = collision_grid
+        self.composite_img = composite_img.convert()
+        self.composite_img.set_colorkey(COMPOSITE_COLORKEY)
+        self.loaded = True
+
+    def unload_payload(self) -> None:
+        self.collision_grid = np.zeros((0, 0), dtype=np.uint8)
+        self.composite_img = None
+        self.loaded = False
+
+    def is_solid(self, x, y) -> bool:
         yi = int(y)
         xi = int(x)
-        if yi < 0 or yi >= len(self.tile_array):
-            return None
-        row = self.tile_array[yi]
-        if xi < 0 or xi >= len(row):
+        rows, columns = self.collision_grid.shape
+        if yi < 0 or yi >= rows or xi < 0 or xi >= columns:
+            return False
+        return self.collision_grid[yi, xi] == TILE_SOLID
+
+    def get_tile(self, x, y) -> Optional[Tile]:
+        if not self.is_solid(x, y):
             return None
-        return row[xi]
+        return self.create_tile(int(x), int(y))
+
+    def create_tile(self, x: int, y: int) -> Tile:
+        """
+        Creates a Tile view for the local tile indices x, y. The tile is not stored, the collision grid
+        stays the only source of truth
+        :param x: local tile x index
+        :param y: local tile y index
+        :return: a solid Tile
+        """
+        # Convert room's position (pixels) to tile indices
+        room_tile_x = self.position[0] // self.__tile_size
+        room_tile_y = self.position[1] // self.__tile_size
+        return Tile(
+            tile_size=self.__tile_size,
+            pos=pygame.Vector2(x, y),  # Local tile position (tile indices)
+            world_pos=pygame.Vector2(room_tile_x + x, room_tile_y + y),  # World tile indices
+            solid=True,
+        )
+
+    def get_solid_tiles_in_area(self, x0: int, y0: int, x1: int, y1: int) -> list[Tile]:
+        """
+        Returns Tile views for all solid cells in the local tile area [x0, x1] x [y0, y1], row by row
+        :return: list of tiles, cells outside the room are ignored
+        """
+        cx0, cy0 = max(x0, 0), max(y0, 0)
+        window = self.collision_grid[cy0:max(y1 + 1, 0), cx0:max(x1 + 1, 0)]
+        ys, xs = np.nonzero(window == TILE_SOLID)
+        return [self.create_tile(cx0 + int(x), cy0 + int(y)) for y, x in zip(ys, xs)]
 
     def contains(self, px: int, py: int) -> bool:
         """Prüft, ob der Punkt (px,py) in diesem Room liegt (AABB)."""
         x0, y0 = self.position[0], self.position[1]
         return x0 <= px <= x0 + self.width and y0 <= py <= y0 + self.height
 
-    def populate_tile_array(self):
-        for y, row in enumerate(self.collider_array):
-            row_array = []
-            for x, cell in enumerate(row):
-                if cell == "1":
-                    # Convert room's position (pixels) to tile indices
-                    room_tile_x = self.position[0] // self.__tile_size
-                    room_tile_y = self.position[1] // self.__tile_size
-                    # Calculate world tile indices
-                    world_tile_x = room_tile_x + x
-                    world_tile_y = room_tile_y + y
-                    row_array.append(
-                        Tile(
-                            tile_size=self.__tile_size,
-                            pos=pygame.Vector2(x, y),  # Local tile position (tile indices)
-                            world_pos=pygame.Vector2(world_tile_x, world_tile_y),  # World tile indices
-                            solid=True,
-                        )
-                    )
-                elif cell == "0":
-                    row_array.append(None)
-            self.tile_array.append(row_array)
-
     def fix_entity_positions_to_world(self):
         """Convert entity local (x,y) to world (x,y) in-place."""
         rx, ry = self.position  # room world top-left
@@ -91,10 +166,24 @@ class Tilemap:
     def __init__(self,ctx=None):
         self.ctx = ctx
         self.__tile_size: int = self.ctx.game_settings.tile_size
-        self.__tileset_surface: Surface = None
+        # baked chunks of the room composite images, only the visible part of the world is kept
+        self.render_cache = RenderChunkCache(
+            self.__tile_size,
+            self.ctx.game_settings.render_chunk_size,
+            self.ctx.game_settings.render_chunk_cache_size,
+            self.get_rooms_in_rect,
+        )
         self.__room_data: dict[tuple[int, int], RoomData] = {}
         self.rooms_sorted_x = []
         self._rooms_x_starts = []
+        # maps a room grid cell (x // room_width, y // room_height) to the rooms covering it
+        self._room_grid: dict[tuple[int, int], list[RoomData]] = {}
+        self._max_room_width = 0
+        # world wide solid mask used by the movement queries
+        self.collision = CollisionGrid(self.__tile_size, TILE_SOLID)
+        # set by load_room_ldtk in streaming mode
+        self.streamer: Optional[RoomStreamer] = None
+        self.__room_cache: Optional[RoomCache] = None
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
     def get_surround_tiles(self, world_position, radius):
@@ -108,14 +197,63 @@ class Tilemap:
             (int(world_position.x) - room_world_x) // self.__tile_size,
             (int(world_position.y) - room_world_y) // self.__tile_size,
         )
-        rects = []
-        for dy in range(-radius, radius + 1):
-            for dx in range(-radius, radius + 1):
-                check_location = [local_entity_position[0] + dx, local_entity_position[1] + dy]
-                tile = room.get_tile(check_location[0], check_location[1])
-                if isinstance(tile, Tile) and tile.solid:
-                    rects.append(tile)
-        return rects
+        return room.get_solid_tiles_in_area(
+            local_entity_position[0] - radius,
+            local_entity_position[1] - radius,
+            local_entity_position[0] + radius,
+            local_entity_position[1] + radius,
+        )
+
+    def move_and_collide(self, rect: pygame.Rect, velocity) -> CollisionResult:
+        """
+        Moves a rect by velocity (x first, then y) and stops it at solid tiles
+        :param rect: the entity rect in world pixels
+        :param velocity: movement of this step in pixels
+        :return: the resolved top left position plus ground, wall and ceiling contacts
+        """
+        return self.collision.move(rect, velocity)
+
+    def move_and_collide_batch(self, rects, velocities):
+        """
+        Vectorized move_and_collide for many entities at once
+        :param rects: array like of shape (N, 4) with x, y, w, h in world pixels
+        :param velocities: array like of shape (N, 2)
+        :return: resolved positions (N, 2) and contact flags (N, 3) indexed by engine.core.collision.CONTACT_*
+        """
+        return self.collision.move_batch(rects, velocities)
+
+    def raycast(self, start, end) -> RaycastResult:
+        """
+        Finds the first solid tile between two world positions, across room borders
+        :param start: world position
+        :param end: world position
+        :return: the hit point, whether a solid tile was hit and the outward normal of the hit face
+        """
+        return self.collision.raycast(start, end)
+
+    def raycast_batch(self, starts, ends):
+        """
+        Vectorized raycast for many rays at once
+        :param starts: array like of shape (N, 2) in world pixels
+        :param ends: array like of shape (N, 2) in world pixels
+        :return: hit mask (N,), hit points (N, 2) and hit normals (N, 2)
+        """
+        return self.collision.raycast_batch(starts, ends)
+
+    def line_of_sight(self, start, end) -> bool:
+        """
+        :return: True if no solid tile is between the two world positions
+        """
+        return self.collision.line_of_sight(start, end)
+
+    def line_of_sight_batch(self, starts, ends):
+        """
+        Vectorized line_of_sight, e.g. every enemy against the player in one call
+        :param starts: array like of shape (N, 2) in world pixels
+        :param ends: array like of shape (N, 2) in world pixels
+        :return: boolean array (N,), True where the view is free
+        """
+        return self.collision.line_of_sight_batch(starts, ends)
 
     def get_all_entity_data(self):
         all_entity_data = {}
@@ -126,8 +264,7 @@ class Tilemap:
                 if key not in entity_data.all_entities:
                     entity_data.all_entities[key] = []
                 entity_data.all_entities[key].append(lst)
-            room_key = (rd.position[0], rd.position[1], rd.width, rd.height)
-            all_entity_data[room_key] = entity_data
+            all_entity_data[rd.room_key] = entity_data
         return all_entity_data
 
     def get_tile_cell(self, x: int, y: int, room_position: tuple[int, int]):
@@ -148,41 +285,57 @@ class Tilemap:
             return tile
 
     def __reset_room(self):
-        self.__tileset_surface = None
+        self.render_cache.invalidate()
         self.__room_data = None
-
-    def load_room_ldtk(self, room_name: str = None):
+        self._room_grid = {}
+        if self.streamer:
+            self.streamer.shutdown()
+            self.streamer = None
+
+    def load_room_ldtk(self, room_name: str = None, streaming: bool = None):
+        """
+        Loads the LDtk simplified export.
+        :param room_name: load only this level folder
+        :param streaming: only read the level metadata now and stream collision and images in around the focus
+        room, see stream_rooms. Defaults to GameSettings.room_streaming
+        :return: Nothing
+        """
+        if streaming is None:
+            streaming = self.ctx.game_settings.room_streaming
         self.__reset_room()
+        # a packed room cache built with engine.core.roomcache replaces csv, json and png parsing if it is up to date
+        self.__room_cache = None
+        if self.ctx.game_settings.room_cache:
+            self.__room_cache = RoomCache.open_if_valid(self.ctx.resource_paths.rooms)
+        if self.__room_cache:
+            self.logger.info("Using room cache %s", self.__room_cache.path)
         if room_name:
-            self.__read_room_data_ldtk_gridvania_by_name(room_name)
+            self.__read_room_data_ldtk_gridvania_by_name(room_name, not streaming)
         else:
-            self.__read_room_data_ldtk_gridvania()
-        self.create_ldtk_tilemap_surface()
+            self.__read_room_data_ldtk_gridvania(not streaming)
+        if streaming:
+            self.streamer = RoomStreamer(
+                self,
+                self.__payload_loader,
+                max_rooms=self.ctx.game_settings.room_stream_max_rooms,
+                max_megabytes=self.ctx.game_settings.room_stream_max_megabytes,
+            )
 
-    def create_ldtk_tilemap_surface(self):
-        self.__tileset_surface = pygame.Surface(
-            (self.ctx.game_settings.world_width, self.ctx.game_settings.world_height),
-            flags=pygame.SRCALPHA,
-        )
-        self.__tileset_surface.fill((0, 0, 0, 0))
-        for rd in self.__room_data.values():
-            self.__tileset_surface.blit(rd.composite_img, rd.position)
+    @property
+    def __payload_loader(self):
+        return self.__room_cache.read_payload if self.__room_cache else read_room_payload
 
-    def __read_room_data_ldtk_gridvania_by_name(self, room_name: str):
-        base = Path(self.ctx.resource_paths.rooms) / room_name
-        rooms: dict[tuple[int, int], RoomData] = {}
-        room_width = self.ctx.game_settings.room_width
-        room_height = self.ctx.game_settings.room_height
-        self.logger.info("Load room from path: %s", base)
+    def __read_room(self, folder: Path, with_payload: bool = True) -> RoomData:
         room = RoomData(self.__tile_size)
-        # Collision layer
-        with (base / "Collision_Layer.csv").open("r", newline="", encoding="utf-8") as f:
-            self.logger.info("Level Name: %s ", base)
-            room.collider_array = list(csv.reader(f))
+        room.folder = folder
+        self.logger.info("Level Name: %s ", folder)
 
         # Level metadata
-        with (base / "data.json").open("r", encoding="utf-8") as f:
-            level_data = json.load(f)
+        if self.__room_cache:
+            level_data = self.__room_cache.get_level_data(folder)
+        else:
+            with (folder / "data.json").open("r", encoding="utf-8") as f:
+                level_data = json.load(f)
         room.position[0] = level_data["x"]
         room.position[1] = level_data["y"]
         room.width = level_data["width"]
@@ -190,74 +343,134 @@ class Tilemap:
         room.entities = level_data["entities"]
         # soon more
 
-        # Composite image
-        room.composite_img = load_img(str(base / "_composite.png"), colorkey=(24, 20, 37))
+        # Collision layer and composite image
+        if with_payload:
+            room.apply_payload(*self.__payload_loader(folder))
 
         # init the room data
-        room.populate_tile_array()
         room.fix_entity_positions_to_world()
+        return room
 
+    def __add_room(self, rooms: dict[tuple[int, int], RoomData], room: RoomData):
         # Calculate grid position
-        grid_x = room.position[0] // room_width
-        grid_y = room.position[1] // room_height
+        grid_x = room.position[0] // self.ctx.game_settings.room_width
+        grid_y = room.position[1] // self.ctx.game_settings.room_height
         rooms[(grid_x, grid_y)] = room
 
-        self.__room_data = rooms
-        self.rooms_sorted_x = sorted(rooms.values(), key=lambda r: r.position[0])
-        self._rooms_x_starts = [r.position[0] for r in self.rooms_sorted_x]
+    def __read_room_data_ldtk_gridvania_by_name(self, room_name: str, with_payload: bool = True):
+        base = Path(self.ctx.resource_paths.rooms) / room_name
+        rooms: dict[tuple[int, int], RoomData] = {}
+        self.logger.info("Load room from path: %s", base)
+        self.__add_room(rooms, self.__read_room(base, with_payload))
+        self.register_rooms(rooms)
 
-    def __read_room_data_ldtk_gridvania(self):
+    def __read_room_data_ldtk_gridvania(self, with_payload: bool = True):
         base = Path(self.ctx.resource_paths.rooms)
         rooms: dict[tuple[int, int], RoomData] = {}
-        room_width = self.ctx.game_settings.room_width
-        room_height = self.ctx.game_settings.room_height
 
         # Deterministic order (level0, level1, ...)
         for folder in sorted((d for d in base.iterdir() if d.is_dir()), key=lambda p: p.name):
-            room = RoomData(self.__tile_size)
-
-            # Collision layer
-            with (folder / "Collision_Layer.csv").open("r", newline="", encoding="utf-8") as f:
-                self.logger.info("Level Name: %s ", folder)
-                room.collider_array = list(csv.reader(f))
-
-            # Level metadata
-            with (folder / "data.json").open("r", encoding="utf-8") as f:
-                level_data = json.load(f)
-            room.position[0] = level_data["x"]
-            room.position[1] = level_data["y"]
-            room.width = level_data["width"]
-            room.height = level_data["height"]
-            room.entities = level_data["entities"]
-            # soon more
-
-            # Composite image
-            room.composite_img = load_img(str(folder / "_composite.png"), colorkey=(24, 20, 37))
-
-            # init the room data
-            room.populate_tile_array()
-            room.fix_entity_positions_to_world()
-
-            # Calculate grid position
-            grid_x = room.position[0] // room_width
-            grid_y = room.position[1] // room_height
-            rooms[(grid_x, grid_y)] = room
+            self.__add_room(rooms, self.__read_room(folder, with_payload))
+
+        self.register_rooms(rooms)
+
+    def stream_rooms(self, world_position) -> None:
+        """
+        Keeps the room at world_position and its neighbours resident when the tilemap was loaded in streaming mode.
+        Should be called once per frame with the focus entity position. Does nothing otherwise.
+        :param world_position: the focus position in world pixels
+        :return: Nothing
+        """
+        if self.streamer:
+            self.streamer.update(world_position)
+
+    def __rooms_in_cells(self, gx0: int, gy0: int, gx1: int, gy1: int) -> list[RoomData]:
+        rooms = []
+        for gy in range(gy0, gy1 + 1):
+            for gx in range(gx0, gx1 + 1):
+                for room in self._room_grid.get((gx, gy), ()):
+                    if room not in rooms:
+                        rooms.append(room)
+        return rooms
+
+    def get_neighbour_rooms(self, room: RoomData) -> list[RoomData]:
+        """
+        :param room: a registered room
+        :return: all rooms touching the room grid cells around room, without room itself
+        """
+        room_width = self.ctx.game_settings.room_width
+        room_height = self.ctx.game_settings.room_height
+        x0, y0 = room.position[0], room.position[1]
+        neighbours = self.__rooms_in_cells(
+            x0 // room_width - 1,
+            y0 // room_height - 1,
+            (x0 + max(room.width, 1) - 1) // room_width + 1,
+            (y0 + max(room.height, 1) - 1) // room_height + 1,
+        )
+        return [n for n in neighbours if n is not room]
 
+    def get_rooms_in_rect(self, rect: pygame.Rect) -> list[RoomData]:
+        """
+        :param rect: a rect in world pixels
+        :return: all rooms overlapping rect
+        """
+        room_width = self.ctx.game_settings.room_width
+        room_height = self.ctx.game_settings.room_height
+        candidates = self.__rooms_in_cells(
+            rect.left // room_width,
+            rect.top // room_height,
+            (rect.right - 1) // room_width,
+            (rect.bottom - 1) // room_height,
+        )
+        return [r for r in candidates if rect.colliderect(r.room_bounding_box)]
+
+    def register_rooms(self, rooms: dict[tuple[int, int], RoomData]):
+        """
+        Sets the loaded rooms and rebuilds the lookup structures used by get_room_at_point.
+        Rooms larger than a single room cell (e.g. 2x1 gridvania levels) are registered in every cell they cover.
+        :param rooms: the rooms keyed by their grid position
+        :return: Nothing
+        """
+        room_width = self.ctx.game_settings.room_width
+        room_height = self.ctx.game_settings.room_height
         self.__room_data = rooms
         self.rooms_sorted_x = sorted(rooms.values(), key=lambda r: r.position[0])
         self._rooms_x_starts = [r.position[0] for r in self.rooms_sorted_x]
-
-    def get_room_at_point(self, px: int, py: int):
-        for r in self.rooms_sorted_x:
+        self._max_room_width = max((r.width for r in self.rooms_sorted_x), default=0)
+        self._room_grid = {}
+        for room in self.rooms_sorted_x:
+            x0, y0 = room.position[0], room.position[1]
+            # the last cell is exclusive, a room ending exactly on a cell border does not cover the next cell
+            for gy in range(y0 // room_height, (y0 + max(room.height, 1) - 1) // room_height + 1):
+                for gx in range(x0 // room_width, (x0 + max(room.width, 1) - 1) // room_width + 1):
+                    self._room_grid.setdefault((gx, gy), []).append(room)
+        self.collision.build(self.rooms_sorted_x)
+        self.render_cache.invalidate()
+
+    def get_room_at_point(self, px: int, py: int) -> Optional[RoomData]:
+        cell = (int(px // self.ctx.game_settings.room_width), int(py // self.ctx.game_settings.room_height))
+        for room in self._room_grid.get(cell, ()):
+            if room.contains(px, py):
+                return room
+        # Fallback for rooms that are not aligned to the room grid and for points on a rooms outer border.
+        # Only rooms starting at most one room width left of px can contain it
+        for i in range(bisect.bisect_right(self._rooms_x_starts, px) - 1, -1, -1):
+            r = self.rooms_sorted_x[i]
+            if r.position[0] + self._max_room_width < px:
+                break
             if r.contains(px, py):
                 return r
         return None
 
+    def render(self, surf: Surface, view: pygame.Rect) -> None:
+        """
+        Draws the part of the world inside view, e.g. Camera.render_view, to surf
+        :param surf: the target surface or a SpriteBatch, view.topleft ends up at (0, 0)
+        :param view: the visible world rect in pixels
+        :return: Nothing
+        """
+        with PROFILER.stage("tilemap.render"):
+            self.render_cache.render(surf, view)
+
     def render_single_surface_subsurface(self, surf: Surface, offset, room_size_px):
-        try:
-            surf.blit(
-                self.__tileset_surface.subsurface(pygame.Rect(offset[0], offset[1], room_size_px.x, room_size_px.y)),
-                (0, 0),
-            )
-        except ValueError as e:
-            self.logger.error("Failed to render subsurface to buffer %r", e)
+        self.render(surf, pygame.Rect(offset[0], offset[1], room_size_px.x, room_size_px.y))
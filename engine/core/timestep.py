@@ -0,0 +1,41 @@
+class FixedTimestep:
+    """
+    Accumulator for a fixed simulation rate. Every frame the measured frame time is added and the amount of
+    simulation ticks to run is returned, the remainder is kept for the next frame. alpha is the fraction of a tick
+    the simulation is behind the real time, renderers interpolate between the previous and the current tick with it.
+    """
+
+    def __init__(self, tick_rate: float = 60, max_ticks: int = 5):
+        """
+        :param tick_rate: simulation ticks per second
+        :param max_ticks: most ticks run in a single frame, time beyond that is dropped so a slow frame can not
+        start a spiral of ever longer catch ups
+        """
+        self.tick_rate = tick_rate
+        self.dt = 1 / tick_rate
+        self.max_ticks = max_ticks
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.ticks = 0
+        self.dropped_time = 0.0
+
+    def advance(self, frame_time: float) -> int:
+        """
+        :param frame_time: real seconds since the last frame
+        :return: the amount of ticks to simulate this frame
+        """
+        self.accumulator += max(frame_time, 0.0)
+        ticks = int(self.accumulator // self.dt)
+        if ticks > self.max_ticks:
+            dropped = (ticks - self.max_ticks) * self.dt
+            self.accumulator -= dropped
+            self.dropped_time += dropped
+            ticks = self.max_ticks
+        self.accumulator -= ticks * self.dt
+        self.alpha = self.accumulator / self.dt
+        self.ticks += ticks
+        return ticks
+
+    def reset(self) -> None:
+        self.accumulator = 0.0
+        self.alpha = 0.0
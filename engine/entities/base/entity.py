@@ -2,6 +2,11 @@ from copy import deepcopy
 from pygame import Vector2, Rect, Surface
 from engine.core.engine_core_funcs import *
 from engine.core.engine_dataclasses import ENTITYTYPES
+from engine.content.animations import Animation
+from engine.entities.base.sprite_transforms import TRANSFORM_CACHE, SpriteTransformCache
+from engine.entities.scheduler import Activity
+from engine.render.drawqueue import DrawQueue
+from engine.render.moderngl.spritebatch import SpriteBatch
 
 
 class Entity:
@@ -12,6 +17,11 @@ class Entity:
     sprite and mask properties, mathematical functions, rendering and the update loop.
     """
 
+    # scaled, flipped and faded variants of the images are built once and shared between all entities
+    transform_cache: SpriteTransformCache = TRANSFORM_CACHE
+    # the Manager culls the entity by its rect, False tests render_bounds against the view instead
+    culled_by_rect: bool = True
+
     def __init__(self, ctx, wctx, position: Vector2, controllable: bool = False, *args, **kwargs):
         """
         Sets up the basic Entity with default values
@@ -24,7 +34,11 @@ class Entity:
 
         self.ctx = ctx
         self.wctx = wctx
-        self.position: Vector2 = deepcopy(position)
+        self.position: Vector2 = Vector2(position)
+        # the position before the last tick, rendering interpolates from it to position, see store_previous
+        self.previous_position: Vector2 = Vector2(position)
+        # interpolation factor of the current render for entities that draw themselves, set by the Manager
+        self.render_alpha: float = 1.0
         self.size: Vector2 = Vector2(kwargs.get("width"), kwargs.get("height"))
         self.flags: ENTITYTYPES = ENTITYTYPES()
         self.creator = kwargs.get("creator")
@@ -50,44 +64,65 @@ class Entity:
         self.active_animation: None
         self.current_image: Surface = None
         self.image_base_dimensions = None
-        self.render_priority = 0
+        # render layer, lower layers are drawn first, see engine.render.drawqueue
+        self.render_priority: int = 0
         self.active_animation = None
         self.paused = False
         self.is_global = False
+        # see engine.entities.scheduler, the slot staggers the reduced rate updates of far entities
+        self.activity: Activity = Activity.ACTIVE
+        self.update_slot: int = 0
+        # the slot of the entity in the Manager, None while it is not managed
+        self.handle = None
+        # counts up with every entity the Manager adds, orders the drawing of a type, see Manager.render
+        self.spawn_order: int = 0
+        # the type and then the spawn_order packed into one int, the Manager draws the entities of a layer by it
+        self.draw_order: int = 0
+        # False while render culled the entity, work that only prepares drawing can be skipped then
+        self.on_screen: bool = True
 
     @property
     def img(self) -> Surface:
-        if not self.active_animation:
-            img = self.current_image
-        else:
-            self.set_image(self.active_animation.get_current_animation_frame())
-            img = self.current_image
+        """
+        :return: the current image with scale, flip and opacity applied, a shared surface that must not be modified
+        """
+        animation = self.active_animation
+        if animation:
+            self.__set_frame(animation.get_current_animation_frame())
+        img = self.current_image
+        if not img:
+            return img
+        if self.scale == [1, 1] and isinstance(animation, Animation):
+            # the flipped strips are baked by the animation, only the opacity is left to the cache. Other frame
+            # sources are flipped by the cache like still images
+            return self.transform_cache.get(animation.get_frame(self.flip[0], self.flip[1]), alpha=self.opacity)
+        size = None
         if self.scale != [1, 1]:
-            img = pygame.transform.scale(
-                img,
-                (
-                    max(1, int(self.scale[0] * self.image_base_dimensions[0])),
-                    max(1, int(self.scale[1] * self.image_base_dimensions[1])),
-                ),
+            size = (
+                max(1, int(self.scale[0] * self.image_base_dimensions[0])),
+                max(1, int(self.scale[1] * self.image_base_dimensions[1])),
             )
-        if any(self.flip) and img:
-            img = pygame.transform.flip(img, self.flip[0], self.flip[1])
-        if self.opacity != 255:
-            img.set_alpha(self.opacity)
-        return img
+        return self.transform_cache.get(img, size, self.flip[0], self.flip[1], self.opacity)
 
     @property
     def rect(self) -> Rect:
         if not self.centered:
             return pygame.Rect(self.position.x, self.position.y, self.size.x, self.size.y)
         else:
+            width = self.img.get_width()
             return pygame.Rect(
-                (self.position.x - self.img.get_width()) // 1,
-                (self.position.y - self.img.get_width()) // 1,
+                (self.position.x - width) // 1,
+                (self.position.y - width) // 1,
                 self.size.x,
                 self.size.y,
             )
 
+    def render_bounds(self) -> Rect:
+        """
+        :return: the world rect the entity draws into, used for culling if culled_by_rect is False
+        """
+        return self.rect
+
     @property
     def ground_check(self) -> pygame.Rect:
         return pygame.Rect(self.position.x, self.position.y, self.size.x, self.size.y + 1)
@@ -104,12 +139,17 @@ class Entity:
         :param force: if the animation should be forced or not
         :return: Nothing
         """
-        if force:
+        if not force:
+            return
+        if self.active_animation:
+            # the entity keeps its Animation and only switches the shared clip
+            self.active_animation.set_clip(self.ctx.content.get_animation_clip(entity_name, action_id))
+        else:
             self.active_animation = self.ctx.content.get_animation(entity_name, action_id)
 
     def set_image(self, surf: pygame.Surface = False):
         """
-        Sets the current images base dimensions
+        Sets a copy of surf as the current image and the images base dimensions
         :param surf: pygame surface
         :return: Nothing
         """
@@ -117,12 +157,42 @@ class Entity:
             self.current_image = surf.copy()
             self.image_base_dimensions = list(surf.get_size())
 
+    def __set_frame(self, frame: pygame.Surface) -> None:
+        # animation frames are shared and never modified, they are used without the copy of set_image
+        if frame and frame is not self.current_image:
+            self.current_image = frame
+            self.image_base_dimensions = list(frame.get_size())
+
     def init_entity(self):
         pass
 
-    def reset_entity(self):
+    def reset_entity(self, **kwargs):
+        """
+        Restores the state of the entity, also called with the keyword arguments of the spawn when an EntityPool
+        reuses the entity
+        """
         pass
 
+    def recycle(self, position: Vector2) -> None:
+        """
+        Brings a removed entity back at position for an EntityPool, reset_entity restores the rest
+        :param position: the new position
+        :return: Nothing
+        """
+        self.position.update(position)
+        self.previous_position.update(position)
+        self.velocity.update(0, 0)
+        self.external_velocity.update(0, 0)
+        self.fractals.update(0, 0)
+        self.final_velocity.update(0, 0)
+        self.gravity_timer = 0
+        self.alive = True
+        self.paused = False
+        self.activity = Activity.ACTIVE
+        self.on_screen = True
+        if self.active_animation:
+            self.active_animation.rewind()
+
     def calculate_fractions(self):
         self.final_velocity = self.velocity + self.fractals
 
@@ -214,34 +284,100 @@ class Entity:
     def render(self, surf: pygame.Surface, offset=(0, 0)) -> None:
         """
         The rendering function of an project.
-        :param surf: the surface to which the project should be blitted to
+        :param surf: the surface to which the project should be blitted to, or a SpriteBatch
+        :param offset: a tuple containing the offset in pixels
+        :return: Nothing
+        """
+        if isinstance(surf, SpriteBatch):
+            self.submit(surf, offset)
+            return
+        blit = self.blit_args(offset)
+        if blit:
+            surf.blit(*blit)
+
+    def enqueue(self, queue: DrawQueue, offset=(0, 0), alpha: float = 1.0) -> None:
+        """
+        Submits the blit of render to the queue at the render_priority layer instead of drawing it right away, a
+        sorting queue orders it by the y of the position
+        :param queue: the DrawQueue of the frame
+        :param offset: a tuple containing the offset in pixels
+        :param alpha: interpolation factor between previous_position and position
+        :return: Nothing
+        """
+        blit = self.blit_args(offset, alpha)
+        if blit:
+            queue.blit(self.render_priority, blit[0], blit[1], self.position[1])
+
+    def blit_args(self, offset=(0, 0), alpha: float = 1.0) -> tuple[Surface, tuple[int, int]] | None:
+        """
+        The blit render does, shared with enqueue
+        :param offset: a tuple containing the offset in pixels
+        :param alpha: interpolation factor between previous_position and position
+        :return: the image and its destination on the target, None if there is no image
+        """
+        img = self.img
+        if not img:
+            return None
+        offset = self.calculate_render_offset(self.interpolated_offset(offset, alpha))
+        if not self.can_rotate:
+            w, h = img.get_size()
+            return img, (int(self.position[0] - offset[0] - w // 2), int(self.position[1] - offset[1] - h))
+        rotated_img = self.__rotated_image(img)
+        rect = self.rect
+        return rotated_img, (int(rect.centerx - int(rotated_img.get_width() / 2) - offset[0]),
+                             int(rect.centery - int(rotated_img.get_height() / 2) - offset[1]))
+
+    def interpolated_offset(self, offset, alpha: float):
+        """
+        :param offset: a tuple containing the offset in pixels
+        :param alpha: interpolation factor between previous_position and position
+        :return: the offset that draws the entity at its interpolated position instead of at position
+        """
+        if alpha >= 1:
+            return offset
+        rest = 1 - alpha
+        position = self.position
+        previous = self.previous_position
+        return offset[0] + (position[0] - previous[0]) * rest, offset[1] + (position[1] - previous[1]) * rest
+
+    def store_previous(self) -> None:
+        """
+        Keeps the position as previous_position, the Manager calls it at the start of a tick for the entities it
+        updated in the last one
+        """
+        self.previous_position.update(self.position)
+
+    def __rotated_image(self, img: Surface) -> Surface:
+        animation = self.active_animation
+        if isinstance(animation, Animation) and animation.rotation_steps and self.scale == [1, 1]:
+            # the animation baked its strips at quantized angles, the frame is only looked up
+            frame = animation.get_frame(self.flip[0], self.flip[1], self.rotation)
+            return self.transform_cache.get(frame, alpha=self.opacity)
+        return pygame.transform.rotate(img, self.rotation)
+
+    def submit(self, batch: SpriteBatch, offset=(0, 0)) -> None:
+        """
+        The GPU counterpart of render. The untransformed frame is submitted, scale, flip, opacity and rotation are
+        applied by the batch, so no transformed copies of the image are created.
+        :param batch: the SpriteBatch
         :param offset: a tuple containing the offset in pixels
         :return: Nothing
         """
         offset = self.calculate_render_offset(offset)
-        if self.img:
-            if not self.can_rotate:
-                if self.scale == [1, 1]:
-                    surf.blit(
-                        self.img,
-                        (int(self.position[0] - offset[0] - self.img.get_width() // 2),
-                         int(self.position[1] - offset[1] - self.img.get_height())),
-                    )
-                else:
-                    surf.blit(
-                        self.img,
-                        (int(self.position[0] - offset[0] - self.img.get_width() // 2),
-                         int(self.position[1] - offset[1] - self.img.get_height())),
-                    )
-            else:
-                rotated_img = pygame.transform.rotate(self.img, self.rotation)
-                surf.blit(
-                    rotated_img,
-                    (
-                        self.rect.centerx - int(rotated_img.get_width() / 2) - offset[0],
-                        self.rect.centery - int(rotated_img.get_height() / 2) - offset[1],
-                    ),
-                )
+        # the animation frame directly, set_image would copy it and the copy would need its own texture
+        img = self.active_animation.get_current_animation_frame() if self.active_animation else self.current_image
+        if not img:
+            return
+        w, h = img.get_size()
+        if self.scale != [1, 1]:
+            w, h = max(1, int(self.scale[0] * w)), max(1, int(self.scale[1] * h))
+        if not self.can_rotate:
+            dest = (int(self.position[0] - offset[0] - w // 2), int(self.position[1] - offset[1] - h), w, h)
+            rotation = 0
+        else:
+            dest = (self.rect.centerx - w / 2 - offset[0], self.rect.centery - h / 2 - offset[1], w, h)
+            rotation = self.rotation
+        batch.draw(img, dest, flip=self.flip, alpha=self.opacity, rotation=rotation)
 
     def update(self, dt) -> Union[bool, None]:
         """
@@ -249,8 +385,13 @@ class Entity:
         :param dt: delta time
         :return: True
         """
-        if self.active_animation:
-            self.active_animation.play(dt)
+        animation = self.active_animation
+        if animation:
+            if not animation.batched:
+                animation.play(dt)
+            elif self.on_screen or not animation.skip_culled:
+                # played by AnimationManager.advance after the update, like play above for every updated entity
+                animation.schedule(dt)
         return self.paused
 
     def on_leave_chunk(self):
@@ -261,8 +402,8 @@ class Entity:
         :param offset:
         :return:
         """
-        offset = list(offset)
-        if self.active_animation:
-            offset[0] += self.active_animation.get_offset()[0]
-            offset[1] += self.active_animation.get_offset()[1]
-        return offset
+        animation = self.active_animation
+        if not animation:
+            return offset
+        x, y = animation.get_offset()
+        return offset[0] + x, offset[1] + y
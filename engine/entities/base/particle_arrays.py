@@ -0,0 +1,180 @@
+import math
+
+import numpy as np
+
+from engine.entities.base.particle_settings import ParticleBaseSettings
+
+# clamp of the simulation step, same as the object backend
+MIN_DT = 1 / 240
+
+
+class ParticleArrays:
+    """
+    Struct of arrays storage for particles. Every particle attribute is a column in a preallocated NumPy array,
+    the first `count` rows are alive. Movement, gravity and the color/size/alpha interpolation run vectorized
+    over all particles and dead particles are compacted in one pass instead of list.remove per particle.
+    """
+
+    def __init__(self, capacity: int = 256, rng: np.random.Generator = None):
+        self.count = 0
+        self.rng = rng or np.random.default_rng()
+        self.__allocate(capacity)
+
+    def __allocate(self, capacity: int) -> None:
+        old = None if not hasattr(self, "position") else self.__columns()
+        self.position = np.zeros((capacity, 2))
+        # the positions before the last update, see render_positions
+        self.previous_position = np.zeros((capacity, 2))
+        self.start_position = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        self.frequency = np.zeros(capacity)
+        self.phase = np.zeros(capacity)
+        self.time_elapsed = np.zeros(capacity)
+        self.lifetime = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.alpha = np.zeros(capacity)
+        # r, g, b, a as float so the interpolation does not need casts, values are whole numbers
+        self.color = np.zeros((capacity, 4))
+        if old:
+            for new_column, old_column in zip(self.__columns(), old):
+                new_column[:self.count] = old_column[:self.count]
+
+    def __columns(self) -> tuple:
+        return (self.position, self.previous_position, self.start_position, self.velocity, self.frequency,
+                self.phase, self.time_elapsed, self.lifetime, self.size, self.alpha, self.color)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.lifetime)
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, amount: int, origin, area, settings: ParticleBaseSettings) -> None:
+        """
+        Spawns particles the same way the object backend does, only with vectorized random numbers
+        :param amount: number of particles
+        :param origin: top left of the spawn area in world pixels
+        :param area: width and height of the spawn area
+        :param settings: the emitters settings
+        :return: Nothing
+        """
+        if amount <= 0:
+            return
+        if self.count + amount > self.capacity:
+            self.__allocate(max(self.capacity * 2, self.count + amount))
+        rng = self.rng
+        s = slice(self.count, self.count + amount)
+
+        # spawn position inside the emitter rect, inclusive integer offsets like random.randint
+        self.position[s, 0] = origin[0] + rng.integers(0, int(area[0]) + 1, amount)
+        self.position[s, 1] = origin[1] + rng.integers(0, int(area[1]) + 1, amount)
+        self.start_position[s] = self.position[s]
+        self.previous_position[s] = self.position[s]
+
+        if settings.random_x_direction and settings.random_y_direction:
+            angle = rng.uniform(0, 2 * math.pi, amount)
+            magnitude = rng.uniform(settings.min_velocity, settings.max_velocity, amount)
+            velocity = np.stack((magnitude * np.cos(angle), magnitude * np.sin(angle)), axis=1)
+        else:
+            velocity = np.tile((settings.velocity.x, settings.velocity.y), (amount, 1))
+            if settings.random_x_direction:
+                velocity[:, 0] *= rng.choice((-1, 1), amount)
+            elif settings.random_y_direction:
+                velocity[:, 1] *= rng.choice((-1, 1), amount)
+        deviation = rng.uniform(-settings.velocity_deviation, settings.velocity_deviation, amount)
+        self.velocity[s] = velocity + deviation[:, None]
+
+        self.lifetime[s] = settings.lifetime + rng.uniform(-0.2, 0.2, amount)
+        self.frequency[s] = rng.uniform(*settings.movement.sine.frequency_range, amount)
+        self.phase[s] = rng.uniform(*settings.movement.sine.phase_range, amount)
+        self.time_elapsed[s] = 0
+        self.size[s] = settings.start_size
+        self.alpha[s] = settings.start_alpha
+        c = settings.color_start
+        self.color[s] = (c.r, c.g, c.b, c.a)
+        self.count += amount
+
+    def store_previous(self) -> None:
+        """
+        Keeps the positions of the alive particles as previous_position, called before they move
+        """
+        self.previous_position[:self.count] = self.position[:self.count]
+
+    def render_positions(self, alpha: float) -> np.ndarray:
+        """
+        :param alpha: interpolation factor between the previous and the current update
+        :return: the positions of the alive particles between previous_position and position
+        """
+        position = self.position[:self.count]
+        if alpha >= 1:
+            return position
+        previous = self.previous_position[:self.count]
+        return previous + (position - previous) * alpha
+
+    def compact(self, keep: np.ndarray) -> None:
+        """
+        Keeps only the rows where keep is True, preserving their order
+        :param keep: boolean mask over the alive rows
+        :return: Nothing
+        """
+        n = int(keep.sum())
+        if n == self.count:
+            return
+        for column in self.__columns():
+            column[:n] = column[:self.count][keep]
+        self.count = n
+
+    def update(self, dt: float, settings: ParticleBaseSettings, emitter_time: float) -> None:
+        """
+        Vectorized version of the object backends particle update
+        :param dt: delta time
+        :param settings: the emitters settings
+        :param emitter_time: time since the emitter was created, used by the sine mode without independent timing
+        :return: Nothing
+        """
+        _dt = max(dt, MIN_DT)
+        n = self.count
+        self.time_elapsed[:n] += _dt
+        self.compact(self.time_elapsed[:n] < self.lifetime[:n])
+        n = self.count
+        if n == 0:
+            return
+
+        position = self.position[:n]
+        velocity = self.velocity[:n]
+        time_elapsed = self.time_elapsed[:n]
+        lifetime = self.lifetime[:n]
+        movement = settings.movement
+
+        if movement.mode == "sine" and movement.sine.enabled:
+            cfg = movement.sine
+            t = time_elapsed if cfg.independent_timing else emitter_time
+            offset = np.sin(t * self.frequency[:n] + self.phase[:n]) * cfg.amplitude
+            if cfg.axes in ("x", "both"):
+                position[:, 0] += offset
+            if cfg.axes in ("y", "both"):
+                position[:, 1] += offset
+        elif movement.mode == "cubic":
+            ease_factor = (1.0 - np.minimum(time_elapsed / lifetime, 1.0)) ** 1.5
+            position += velocity * (_dt * ease_factor)[:, None]
+            if settings.gravity != 0:
+                velocity[:, 1] += settings.gravity * _dt
+        else:
+            position += velocity * _dt
+            if settings.gravity != 0:
+                velocity[:, 1] += settings.gravity * _dt
+
+        # quadratic ease-out towards the end values
+        t = (time_elapsed / lifetime) ** 2
+        c = settings.color_end
+        color = self.color[:n]
+        color[:] = np.trunc(color + (np.array((c.r, c.g, c.b, c.a), dtype=float) - color) * t[:, None])
+        self.size[:n] = self.__lerp(self.size[:n], settings.end_size, t)
+        self.alpha[:n] = self.__lerp(self.alpha[:n], settings.end_alpha, t)
+
+    @staticmethod
+    def __lerp(values: np.ndarray, target: float, t: np.ndarray) -> np.ndarray:
+        # engine_core_funcs.lerp including its snapping to the target
+        result = values * (1.0 - t) + target * t
+        return np.where(np.abs(result - target) < np.abs(t), target, result)
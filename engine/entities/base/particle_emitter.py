@@ -1,13 +1,19 @@
 import math
 from dataclasses import dataclass, fields
 from engine.core.engine_core_funcs import lerp, clamp
+from engine.core.profiler import PROFILER
 
+import numpy as np
 import pygame
 from pygame import Vector2, Color
 from engine.entities.base.entity import Entity
 import random
 
+from engine.entities.base.particle_arrays import ParticleArrays
 from engine.entities.base.particle_settings import ParticleBaseSettings
+from engine.entities.base.particle_sprites import (CIRCLE_TEMPLATES, RECT_TEMPLATES, SPRITE_CACHE,
+                                                   ParticleSpriteCache, SpriteCacheStats, quantize)
+from engine.render.moderngl.spritebatch import BLEND_ADD, SpriteBatch, line_rects
 
 
 def from_kwargs(kwargs):
@@ -34,6 +40,8 @@ def interpolate_color(color1, color2, t):
 @dataclass
 class Particle:
     position: Vector2
+    # the position before the last update, render interpolates from it
+    previous_position: Vector2
     start_position: Vector2
     velocity: Vector2
     frequency: float
@@ -49,16 +57,14 @@ class Particle:
 
 
 class ParticleEmitter(Entity):
-    _SURFACES_RECT = [pygame.Surface((i, i), pygame.SRCALPHA) for i in range(1, 11)]
-    _SURFACES_CIRCLE = [pygame.Surface((i * 2, i * 2), pygame.SRCALPHA) for i in range(1, 11)]
-
-    # Fill rectangle surfaces with white
-    for surf in _SURFACES_RECT:
-        surf.fill((255, 255, 255, 255))
-
-    # Pre-draw circles onto surfaces
-    for i, surf in enumerate(_SURFACES_CIRCLE, start=1):
-        pygame.draw.circle(surf, (255, 255, 255, 255), (i, i), i)
+    _SURFACES_RECT = RECT_TEMPLATES
+    _SURFACES_CIRCLE = CIRCLE_TEMPLATES
+    # tinted particle surfaces shared by all emitters, see ParticleSpriteCache
+    sprite_cache: ParticleSpriteCache = SPRITE_CACHE
+    # the particles leave the emitter rect, the Manager culls by render_bounds
+    culled_by_rect = False
+    # widest particle sprite, circles are twice the largest radius of 10
+    _PARTICLE_EXTENT = 20
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -74,6 +80,25 @@ class ParticleEmitter(Entity):
         self.glow_blit_list = []
         self.particle_count = 0
         self.is_active = True
+        # storage of the ARRAY backend, created on first spawn so apply_config can still switch the backend
+        self.particle_arrays: ParticleArrays | None = None
+        # the sprite_cache lookups of this emitter, the hit rate shows how well its quantization shares sprites
+        self.sprite_stats = SpriteCacheStats()
+        # ARRAY backend per frame render data: (rows, sizes, rgba, alpha) and the glows (rows, sizes, rgb) of the
+        # visible particles, turned into blits or batch instances at their interpolated positions when rendering
+        self.__sprites = None
+        self.__glow = None
+        # the shared sprites of __sprites, looked up by the first render after the update
+        self.__sprite_surfaces = None
+        # (render alpha, offset) the blit_list was built for, renders of the same frame reuse it
+        self.__blit_key = None
+        # True once the particle positions are stored for the next update, see store_previous
+        self.__stored = False
+        # False until the sprites of the current update are prepared, skipped in update while off screen
+        self.__prepared = False
+        # with render_culling only the particles inside the camera view get sprites
+        settings = getattr(self.ctx, "game_settings", None)
+        self.cull_particles = settings is None or settings.render_culling
 
         # set the base object in case no kwargs with settings are passed in
         self.p_base = ParticleBaseSettings()
@@ -98,19 +123,29 @@ class ParticleEmitter(Entity):
         if isinstance(self.p_base.color_end, str):
             self.p_base.color_end = Color(self.p_base.color_end)
 
+    @property
+    def uses_arrays(self) -> bool:
+        return self.p_base.backend == "ARRAY"
+
+    def __get_particle_arrays(self) -> ParticleArrays:
+        if self.particle_arrays is None:
+            # seeded from random so a seeded run spawns the same particles
+            self.particle_arrays = ParticleArrays(rng=np.random.default_rng(random.getrandbits(32)))
+        return self.particle_arrays
+
     def spawn_particle_group(self, amount, position=None):
         spawn_position = self.position
         if position is not None:
             spawn_position = position
+        if self.uses_arrays:
+            self.__get_particle_arrays().spawn(amount, spawn_position, self.size, self.p_base)
+            self.particle_count += max(amount, 0)
+            return
         for i in range(amount):
             self.__spawn_particle(spawn_position)
 
     def __spawn_particle_rate(self, spawn_rate, position=None):
-        spawn_position = self.position
-        if position is not None:
-            spawn_position = position
-        for i in range(spawn_rate):
-            self.__spawn_particle(spawn_position)
+        self.spawn_particle_group(spawn_rate, position)
 
     def set_state(self, state: bool):
         self.is_active = state
@@ -149,18 +184,15 @@ class ParticleEmitter(Entity):
         # Initial surface (only for RECT/CIRCLE for now)
         psurf = None
         match self.p_base.particle_type:
-            case "RECT":
-                psurf = self._get_rect_surface(self.p_base.start_size)
-                psurf.fill(self.p_base.color_start)
-            case "CIRCLE":
-                psurf = self._get_circle_surface(self.p_base.start_size)
-                psurf.fill(self.p_base.color_start)
+            case "RECT" | "CIRCLE":
+                psurf = self.__get_sprite(self.p_base.start_size, self.p_base.color_start)
             case "LINE" | "POINT" | "POLYGON" | "ANIMATION":
                 pass  # handled in render/update later
 
         # Create particle
         particle = Particle(
             position=pos,
+            previous_position=pos.copy(),
             start_position=pos.copy(),
             velocity=vel,
             frequency=frequency,
@@ -179,22 +211,97 @@ class ParticleEmitter(Entity):
         self.particle_count += 1
 
     def update(self, dt):
-        # first timers are updated
-        self.time_elapsed += dt
-        self.spawn_timer += dt
-        self.blit_list.clear()
-        self.glow_blit_list.clear()
-        # checks wether particles are automatically added or by an eventsystem driven function or others
-        if self.is_active:
-            match self.p_base.spawn_type:
-                case "AUTO":
-                    self.__spawn_auto()
-                case "EVENT":
-                    self.__spawn_event()
-
-        # particles that are instanced need to be updated based on the config that is given
-        self.__update_particles(dt)
-        return super().update(dt)
+        with PROFILER.stage("particles.update"):
+            # first timers are updated
+            self.time_elapsed += dt
+            self.spawn_timer += dt
+            self.blit_list.clear()
+            self.glow_blit_list.clear()
+            self.__blit_key = None
+            if not self.__stored:
+                self.__store_particles()
+            self.__stored = False
+            # checks wether particles are automatically added or by an eventsystem driven function or others
+            if self.is_active:
+                match self.p_base.spawn_type:
+                    case "AUTO":
+                        self.__spawn_auto()
+                    case "EVENT":
+                        self.__spawn_event()
+
+            # particles that are instanced need to be updated based on the config that is given
+            if self.uses_arrays:
+                self.__update_particle_arrays(dt)
+            else:
+                self.__update_particles(dt)
+            self.__prepared = False
+            if self.on_screen:
+                self.__prepare_render()
+            else:
+                PROFILER.count("particles.culled", self.__count())
+            return super().update(dt)
+
+    def store_previous(self) -> None:
+        super().store_previous()
+        self.__store_particles()
+        self.__stored = True
+
+    def __store_particles(self) -> None:
+        if self.particle_arrays is not None:
+            self.particle_arrays.store_previous()
+        for particle in self.particles:
+            particle.previous_position.update(particle.position)
+
+    @staticmethod
+    def __render_position(particle: Particle, alpha: float) -> Vector2:
+        if alpha >= 1:
+            return particle.position
+        return particle.previous_position.lerp(particle.position, alpha)
+
+    def __count(self) -> int:
+        return self.particle_arrays.count if self.particle_arrays is not None else len(self.particles)
+
+    def render_bounds(self) -> pygame.Rect:
+        """
+        :return: the emitter rect grown to cover all particles
+        """
+        rect = self.rect
+        if self.particle_arrays is not None and self.particle_arrays.count:
+            position = self.particle_arrays.position[:self.particle_arrays.count]
+            left, top = position.min(axis=0)
+            right, bottom = position.max(axis=0)
+        elif self.particles:
+            xs = [p.position.x for p in self.particles]
+            ys = [p.position.y for p in self.particles]
+            left, top, right, bottom = min(xs), min(ys), max(xs), max(ys)
+        else:
+            return rect
+        # sprites are drawn right and below of the particle position, lines up to their size around it
+        pad = max(self._PARTICLE_EXTENT, self.p_base.start_size, self.p_base.end_size)
+        return rect.union(pygame.Rect(left - pad, top - pad, right - left + pad * 2, bottom - top + pad * 2))
+
+    def __particle_view(self) -> pygame.Rect | None:
+        """
+        :return: the world rect a particle sprite position has to be in to be seen, None draws all particles
+        """
+        if not self.cull_particles:
+            return None
+        view = getattr(self.wctx.camera, "viewport_rect", None)
+        if view is None:
+            return None
+        extent = self._PARTICLE_EXTENT
+        return pygame.Rect(view.x - extent, view.y - extent, view.width + extent + 1, view.height + extent + 1)
+
+    def __prepare_render(self) -> None:
+        """
+        Prepares the sprites, glows and blits of the visible particles for render
+        """
+        self.__prepared = True
+        self.__blit_key = None
+        if self.uses_arrays:
+            self.__prepare_particle_arrays()
+        else:
+            self.__prepare_particles()
 
     def update_position(self, position: Vector2):
         """
@@ -288,81 +395,280 @@ class ParticleEmitter(Entity):
             particle.size = lerp(particle.size, self.p_base.end_size, t)
             particle.alpha = lerp(particle.alpha, self.p_base.end_alpha, t)
 
-            # Surface / Glow preparation
-            psurf = None
-            gsurf = None
-
-            current_size = clamp(int(particle.size), 1, 10)
-
-            match self.p_base.particle_type:
-                case "RECT":
-                    psurf = self._get_rect_surface(current_size).copy()
-                    psurf.fill(particle.color)
-                    psurf.set_alpha(particle.alpha)
-
-                    if self.p_base.glow_size > 0:
-                        glow_size = clamp(
-                            int(particle.size + self.p_base.glow_size +
-                                random.choice([-self.p_base.glow_random_variation,
-                                               self.p_base.glow_random_variation])),
-                            1, 10
-                        )
-                        gsurf = self._get_rect_surface(glow_size).copy()
-                        gsurf.fill((
-                            int(particle.color.r * (particle.alpha / 255)),
-                            int(particle.color.g * (particle.alpha / 255)),
-                            int(particle.color.b * (particle.alpha / 255)),
-                        ))
-
-                case "CIRCLE":
-                    psurf = self._get_circle_surface(current_size).copy()
-                    psurf.fill(particle.color)
-                    psurf.set_alpha(particle.alpha)
-
-                    if self.p_base.glow_size > 0:
-                        glow_size = clamp(
-                            int(particle.size + self.p_base.glow_size +
-                                random.choice([-self.p_base.glow_random_variation,
-                                               self.p_base.glow_random_variation])),
-                            1, 10
-                        )
-                        gsurf = self._get_circle_surface(glow_size).copy()
-                        gsurf.fill((
-                            int(particle.color.r * (particle.alpha / 255)),
-                            int(particle.color.g * (particle.alpha / 255)),
-                            int(particle.color.b * (particle.alpha / 255)),
-                        ))
-
-                case "LINE" | "POINT" | "POLYGON" | "ANIMATION":
-                    # For now we skip surface creation for these types
-                    # (LINE is drawn directly in render, others are future work)
-                    pass
-
-            particle.surf = psurf
-            particle.gsurf = gsurf
-
-            # Prepare for fast rendering (camera relative)
-            if psurf is not None:
-                self.blit_list.append((psurf, particle.position - self.wctx.camera.render_scroll))
+    def __prepare_particles(self) -> None:
+        """
+        Surface and glow preparation of the OBJECT backend, particles outside the camera view get none
+        """
+        self.blit_list.clear()
+        view = self.__particle_view()
+        if view is not None and self.p_base.particle_type in ("RECT", "CIRCLE"):
+            drawn = 0
+            collide = view.collidepoint
+            for particle in self.particles:
+                if not collide(particle.position):
+                    particle.surf = particle.gsurf = None
+                    continue
+                drawn += 1
+                self.__prepare_particle(particle)
+            PROFILER.count("particles.drawn", drawn)
+            PROFILER.count("particles.culled", len(self.particles) - drawn)
+            return
+        for particle in self.particles:
+            self.__prepare_particle(particle)
+        PROFILER.count("particles.drawn", len(self.particles))
+
+    def __prepare_particle(self, particle: Particle) -> None:
+        psurf = None
+        gsurf = None
 
-    def render(self, surf: pygame.Surface, offset=(0, 0)) -> None:
-        super().render(surf, offset)
-        # rendering lines has unfortunately be done iteratively as they are calculated
-        # at runtime based on their direction
-        if self.p_base.particle_type == "LINE":
-            for p in self.particles:
-                velocity_length = math.sqrt(p.velocity.x ** 2 + p.velocity.y ** 2)
-                direction_x = p.velocity.x / velocity_length
-                direction_y = p.velocity.y / velocity_length
-                end_x = p.position.x + direction_x * p.size
-                end_y = p.position.y + direction_y * p.size
-                end_p = Vector2(end_x, end_y)
-                pygame.draw.aaline(surf, p.color, p.position - offset, end_p - offset, 1)
+        current_size = clamp(int(particle.size), 1, 10)
+
+        match self.p_base.particle_type:
+            case "RECT" | "CIRCLE":
+                psurf = self.__get_sprite(current_size, particle.color, int(clamp(particle.alpha, 0, 255)))
+
+                if self.p_base.glow_size > 0:
+                    glow_size = clamp(
+                        int(particle.size + self.p_base.glow_size +
+                            random.choice([-self.p_base.glow_random_variation,
+                                           self.p_base.glow_random_variation])),
+                        1, 10
+                    )
+                    gsurf = self.__get_sprite(glow_size, (
+                        int(particle.color.r * (particle.alpha / 255)),
+                        int(particle.color.g * (particle.alpha / 255)),
+                        int(particle.color.b * (particle.alpha / 255)),
+                    ))
+
+            case "LINE" | "POINT" | "POLYGON" | "ANIMATION":
+                # For now we skip surface creation for these types
+                # (LINE is drawn directly in render, others are future work)
+                pass
+
+        particle.surf = psurf
+        particle.gsurf = gsurf
+
+    def __get_sprite(self, size: int, color, alpha: int = None) -> pygame.Surface:
+        """
+        Shared tinted surface for the emitters particle type, color and alpha are quantized by the presets steps
+        :param size: 1 to 10
+        :param color: rgb or rgba
+        :param alpha: surface alpha or None
+        :return: pygame.Surface, must not be modified
+        """
+        step = self.p_base.color_quantization
+        if step > 1:
+            color = tuple(quantize(c, step) for c in color)
+        if alpha is not None:
+            alpha = quantize(alpha, self.p_base.alpha_quantization)
+        return self.sprite_cache.get(self.p_base.particle_type, size, color, alpha, self.sprite_stats)
+
+    def __update_particle_arrays(self, dt: float) -> None:
+        """
+        ARRAY backend update. The simulation runs vectorized in ParticleArrays
+        """
+        self.__get_particle_arrays().update(dt, self.p_base, self.time_elapsed)
+
+    def __prepare_particle_arrays(self) -> None:
+        """
+        The sizes, colors and alphas of this frame prepared for rendering, still as arrays, only for the particles
+        inside the camera view
+        """
+        arrays = self.__get_particle_arrays()
+        self.__sprites = None
+        self.__glow = None
+        self.__sprite_surfaces = None
+        n = arrays.count
+        if n == 0 or self.p_base.particle_type not in ("RECT", "CIRCLE"):
+            PROFILER.count("particles.drawn", n)
+            return
+
+        position = arrays.position[:n]
+        size = arrays.size[:n]
+        alpha = arrays.alpha[:n]
+        color = arrays.color[:n]
+        rows = slice(0, n)
+        view = self.__particle_view()
+        if view is not None:
+            x, y = position[:, 0], position[:, 1]
+            visible = (x >= view.left) & (x < view.right) & (y >= view.top) & (y < view.bottom)
+            drawn = int(np.count_nonzero(visible))
+            PROFILER.count("particles.drawn", drawn)
+            PROFILER.count("particles.culled", n - drawn)
+            if drawn == 0:
+                return
+            if drawn < n:
+                rows = np.flatnonzero(visible)
+                size, alpha, color = size[rows], alpha[rows], color[rows]
+                n = drawn
         else:
-            # rendering for animations, circles, rects
+            PROFILER.count("particles.drawn", n)
+
+        alpha = np.clip(alpha, 0, 255).astype(np.int64)
+        color = np.clip(color, 0, 255).astype(np.int64)
+        # quantized up front so particles that share a sprite also share a key
+        if self.p_base.color_quantization > 1:
+            color -= color % self.p_base.color_quantization
+        if self.p_base.alpha_quantization > 1:
+            alpha -= alpha % self.p_base.alpha_quantization
+        sizes = np.clip(size.astype(np.int64), 1, 10)
+        self.__sprites = (rows, sizes, color, alpha)
+
+        if self.p_base.glow_size > 0:
+            variation = self.p_base.glow_random_variation
+            glow_sizes = np.clip((size + self.p_base.glow_size
+                                  + arrays.rng.choice((-variation, variation), n)).astype(np.int64), 1, 10)
+            glow_color = (color[:, :3] * (alpha / 255)[:, None]).astype(np.int64)
+            if self.p_base.color_quantization > 1:
+                glow_color -= glow_color % self.p_base.color_quantization
+            self.__glow = (rows, glow_sizes, glow_color)
+
+    def __shared_sprites(self, sizes: np.ndarray, color: np.ndarray, alpha: np.ndarray = None) -> list:
+        """
+        :return: the shared sprite of every particle, the sprite cache is only asked once per distinct look
+        """
+        # size, color and alpha packed into one integer, np.unique on 1d keys is much cheaper than on rows
+        keys = sizes
+        for channel in color.T:
+            keys = keys << 8 | channel
+        if alpha is not None:
+            keys = keys << 8 | alpha
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        particle_type = self.p_base.particle_type
+        surfaces = [self.sprite_cache.get(particle_type, int(sizes[i]), color[i].tolist(),
+                                          None if alpha is None else int(alpha[i]), self.sprite_stats)
+                    for i in first]
+        return [surfaces[i] for i in inverse]
+
+    def __render_particle_arrays(self, surf: pygame.Surface, offset) -> None:
+        arrays = self.particle_arrays
+        if arrays is None or arrays.count == 0:
+            return
+        n = arrays.count
+        positions = arrays.render_positions(self.render_alpha)
+        if self.p_base.particle_type == "LINE":
+            velocity = arrays.velocity[:n]
+            length = np.hypot(velocity[:, 0], velocity[:, 1])[:, None]
+            end = positions + velocity / length * arrays.size[:n, None]
+            colors = np.clip(arrays.color[:n], 0, 255).astype(np.int64).tolist()
+            starts = (positions - offset).tolist()
+            ends = (end - offset).tolist()
+            for color, start, end_p in zip(colors, starts, ends):
+                pygame.draw.aaline(surf, color, start, end_p, 1)
+        elif self.__sprites is not None:
+            key = (self.render_alpha, tuple(offset))
+            if self.__blit_key != key:
+                rows, sizes, color, alpha = self.__sprites
+                if self.__sprite_surfaces is None:
+                    self.__sprite_surfaces = self.__shared_sprites(sizes, color, alpha)
+                self.blit_list.clear()
+                self.blit_list.extend(zip(self.__sprite_surfaces, (positions[rows] - offset).tolist()))
+                self.__blit_key = key
             surf.fblits(self.blit_list)
 
-        # rendering glow has to be done after everything has been rendered already
-        for p in self.particles:
-            if p.gsurf:
-                surf.blit(p.gsurf, p.position - offset, special_flags=pygame.BLEND_RGBA_ADD)
+        if self.__glow is not None:
+            rows, sizes, color = self.__glow
+            surf.fblits(zip(self.__shared_sprites(sizes, color), (positions[rows] - offset).tolist()),
+                        pygame.BLEND_RGBA_ADD)
+
+    def __object_blits(self, offset) -> list:
+        """
+        :return: the sprite blits of the OBJECT backend at the interpolated particle positions
+        """
+        alpha = self.render_alpha
+        key = (alpha, tuple(offset))
+        if self.__blit_key == key:
+            return self.blit_list
+        render_position = self.__render_position
+        self.blit_list.clear()
+        self.blit_list.extend((p.surf, render_position(p, alpha) - offset) for p in self.particles if p.surf)
+        self.__blit_key = key
+        return self.blit_list
+
+    def __submit_lines(self, batch: SpriteBatch, position, velocity, size, color) -> None:
+        rects, rotation = line_rects(position, velocity, size)
+        batch.draw_rects(rects, color, rotation)
+
+    def __submit(self, batch: SpriteBatch, offset) -> None:
+        """
+        Submits the particles to a SpriteBatch. The ARRAY backend hands its arrays over as solid rects, the OBJECT
+        backend goes through the batches blit compatibility.
+        """
+        alpha = self.render_alpha
+        if not self.uses_arrays:
+            if self.p_base.particle_type == "LINE":
+                if self.particles:
+                    self.__submit_lines(batch, np.array([tuple(self.__render_position(p, alpha))
+                                                         for p in self.particles]) - offset,
+                                        np.array([tuple(p.velocity) for p in self.particles]),
+                                        np.array([p.size for p in self.particles]),
+                                        np.array([tuple(p.color) for p in self.particles]))
+            else:
+                batch.fblits(self.__object_blits(offset))
+            for p in self.particles:
+                if p.gsurf:
+                    batch.blit(p.gsurf, self.__render_position(p, alpha) - offset,
+                               special_flags=pygame.BLEND_RGBA_ADD)
+            return
+
+        arrays = self.particle_arrays
+        if arrays is None or arrays.count == 0:
+            return
+        n = arrays.count
+        positions = arrays.render_positions(alpha)
+        if self.p_base.particle_type == "LINE":
+            self.__submit_lines(batch, positions - offset, arrays.velocity[:n], arrays.size[:n], arrays.color[:n])
+        elif self.__sprites is not None:
+            rows, sizes, color, sprite_alpha = self.__sprites
+            # circle sprites are twice the radius wide
+            extent = sizes * 2 if self.p_base.particle_type == "CIRCLE" else sizes
+            rgba = color.astype(float)
+            rgba[:, 3] *= sprite_alpha / 255
+            batch.draw_rects(np.column_stack((positions[rows] - offset, extent, extent)), rgba)
+
+        if self.__glow is not None:
+            rows, sizes, color = self.__glow
+            extent = sizes * 2 if self.p_base.particle_type == "CIRCLE" else sizes
+            rgba = np.column_stack((color, np.full(len(color), 255)))
+            batch.draw_rects(np.column_stack((positions[rows] - offset, extent, extent)), rgba, blend=BLEND_ADD)
+
+    def render(self, surf: pygame.Surface, offset=(0, 0)) -> None:
+        """
+        Draws the particles between their positions of the last two updates by render_alpha
+        :param surf: the target surface or a SpriteBatch
+        :param offset: camera offset in pixels
+        :return: Nothing
+        """
+        with PROFILER.stage("particles.render"):
+            super().render(surf, self.interpolated_offset(offset, self.render_alpha))
+            if not self.__prepared:
+                # came into view after its update
+                self.__prepare_render()
+            if isinstance(surf, SpriteBatch):
+                self.__submit(surf, np.asarray(offset, dtype=float))
+                return
+            if self.uses_arrays:
+                self.__render_particle_arrays(surf, np.asarray(offset, dtype=float))
+                return
+            alpha = self.render_alpha
+            render_position = self.__render_position
+            # rendering lines has unfortunately be done iteratively as they are calculated
+            # at runtime based on their direction
+            if self.p_base.particle_type == "LINE":
+                for p in self.particles:
+                    position = render_position(p, alpha)
+                    velocity_length = math.sqrt(p.velocity.x ** 2 + p.velocity.y ** 2)
+                    direction_x = p.velocity.x / velocity_length
+                    direction_y = p.velocity.y / velocity_length
+                    end_x = position.x + direction_x * p.size
+                    end_y = position.y + direction_y * p.size
+                    end_p = Vector2(end_x, end_y)
+                    pygame.draw.aaline(surf, p.color, position - offset, end_p - offset, 1)
+            else:
+                # rendering for animations, circles, rects
+                surf.fblits(self.__object_blits(offset))
+
+            # rendering glow has to be done after everything has been rendered already
+            for p in self.particles:
+                if p.gsurf:
+                    surf.blit(p.gsurf, render_position(p, alpha) - offset, special_flags=pygame.BLEND_RGBA_ADD)
@@ -61,10 +61,16 @@ class ParticleBaseSettings:
     lifetime: float = 1.0
     particle_type: Literal["RECT", "CIRCLE", "LINE", "POINT", "POLYGON", "ANIMATION"] = "RECT"
     spawn_type: Literal["AUTO", "EVENT"] = "AUTO"
+    # OBJECT keeps a Particle per particle, ARRAY simulates all particles vectorized in NumPy arrays
+    backend: Literal["OBJECT", "ARRAY"] = "OBJECT"
 
     # Effects
     glow_size: int = 0
     glow_random_variation: int = 0  # renamed for clarity
+    # steps the particle colors and alphas are snapped to before looking up a shared sprite, higher values mean
+    # fewer distinct sprites at the cost of color banding. See ParticleEmitter.sprite_stats for the hit rate
+    color_quantization: int = 1
+    alpha_quantization: int = 1
 
     # Future extensions (placeholders)
     texture: Optional[pygame.Surface] = None
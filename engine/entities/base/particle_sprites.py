@@ -0,0 +1,117 @@
+from collections import OrderedDict
+
+import pygame
+
+# white base shapes for the sizes 1 to 10, tinted copies of them are cached
+RECT_TEMPLATES = [pygame.Surface((i, i), pygame.SRCALPHA) for i in range(1, 11)]
+CIRCLE_TEMPLATES = [pygame.Surface((i * 2, i * 2), pygame.SRCALPHA) for i in range(1, 11)]
+
+for _surf in RECT_TEMPLATES:
+    _surf.fill((255, 255, 255, 255))
+
+for _i, _surf in enumerate(CIRCLE_TEMPLATES, start=1):
+    pygame.draw.circle(_surf, (255, 255, 255, 255), (_i, _i), _i)
+
+
+def quantize(value: int, step: int) -> int:
+    """
+    :param value: a color channel or alpha value
+    :param step: quantization step, 1 keeps the value as is
+    :return: the value snapped down to a multiple of step
+    """
+    return value if step <= 1 else value - value % step
+
+
+class SpriteCacheStats:
+    """
+    Hit, miss and eviction counts of ParticleSpriteCache lookups, the cache keeps totals and every emitter its own
+    so the quantization of its preset can be tuned
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def reset(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+class ParticleSpriteCache:
+    """
+    Shared, pre-tinted particle surfaces keyed by shape, size, color and alpha. Emitters blit the same surface for
+    every particle that looks the same instead of copying and filling a template per particle and frame, so the
+    returned surfaces must never be modified. Least recently used sprites are dropped once max_sprites is exceeded.
+    """
+
+    def __init__(self, max_sprites: int = 1024):
+        self.max_sprites = max_sprites
+        self.sprites: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, shape: str, size: int, color, alpha: int | None = None,
+            stats: SpriteCacheStats = None) -> pygame.Surface:
+        """
+        :param shape: "RECT" or "CIRCLE"
+        :param size: 1 to 10, side length of rects and radius of circles
+        :param color: rgb or rgba, the caller quantizes it
+        :param alpha: surface alpha, None leaves the surface alpha unset
+        :param stats: counts the lookup for the caller as well, e.g. the SpriteCacheStats of an emitter
+        :return: the shared surface
+        """
+        key = (shape, size, tuple(color), alpha)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            if stats is not None:
+                stats.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        if stats is not None:
+            stats.misses += 1
+        templates = CIRCLE_TEMPLATES if shape == "CIRCLE" else RECT_TEMPLATES
+        if not 1 <= size <= 10:
+            raise ValueError("Size must be between 1 and 10")
+        sprite = templates[size - 1].copy()
+        sprite.fill(color)
+        if alpha is not None:
+            sprite.set_alpha(alpha)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_sprites:
+            self.sprites.popitem(last=False)
+            self.evictions += 1
+            if stats is not None:
+                stats.evictions += 1
+        return sprite
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def clear(self) -> None:
+        self.sprites.clear()
+        self.reset_stats()
+
+
+# one cache shared by all emitters, presets with the same colors share their sprites
+SPRITE_CACHE = ParticleSpriteCache()
@@ -0,0 +1,88 @@
+import weakref
+from collections import OrderedDict
+
+import pygame
+
+
+class SpriteTransformCache:
+    """
+    Scaled, flipped and faded variants of entity images keyed by the source surface, target size, flip and alpha.
+    Every distinct variant is built once and then shared, so the returned surfaces must never be modified. Entries
+    hold a weak reference to their source, a new surface that reuses the id of a dead one is not served a stale
+    variant. Least recently used variants are dropped once max_surfaces is exceeded.
+    """
+
+    def __init__(self, max_surfaces: int = 2048):
+        self.max_surfaces = max_surfaces
+        self.surfaces: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, source: pygame.Surface, size: tuple[int, int] | None = None, flip_x: bool = False,
+            flip_y: bool = False, alpha: int = 255) -> pygame.Surface:
+        """
+        :param source: the untransformed image
+        :param size: target size in pixels, None keeps the size of source
+        :param flip_x: mirror horizontally
+        :param flip_y: mirror vertically
+        :param alpha: surface alpha, 255 leaves the surface alpha unset
+        :return: source itself if nothing changes, otherwise the shared variant
+        """
+        if size is not None and size == source.get_size():
+            size = None
+        if size is None and not flip_x and not flip_y and alpha == 255:
+            return source
+
+        key = (id(source), size, flip_x, flip_y, alpha)
+        entry = self.surfaces.get(key)
+        if entry is not None and entry[0]() is source:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        img = source
+        if size is not None:
+            img = pygame.transform.scale(img, size)
+        if flip_x or flip_y:
+            img = pygame.transform.flip(img, flip_x, flip_y)
+        if alpha != 255:
+            if img is source:
+                img = source.copy()
+            img.set_alpha(alpha)
+        self.surfaces[key] = (weakref.ref(source), img)
+        self.surfaces.move_to_end(key)
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return img
+
+    def invalidate(self, source: pygame.Surface) -> None:
+        """
+        Drops all variants of source, needed after drawing onto a source surface
+        """
+        source_id = id(source)
+        for key in [k for k in self.surfaces if k[0] == source_id]:
+            del self.surfaces[key]
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def clear(self) -> None:
+        self.surfaces.clear()
+        self.reset_stats()
+
+
+# one cache shared by all entities, entities playing the same animation share their variants
+TRANSFORM_CACHE = SpriteTransformCache()
@@ -1,34 +1,96 @@
 import json
 import logging
+from operator import attrgetter
 
 import pygame
 
+from engine.core.profiler import PROFILER
 from engine.entities.base.entity import Entity
+from engine.entities.indexedlist import IndexedList
 from engine.entities.instantiable_registry import INSTANTIABLE_ENTITIES
+from engine.entities.pool import EntityHandle, EntityPool
+from engine.entities.scheduler import Activity, UpdateScheduler
+from engine.entities.spatialgrid import SpatialGrid
+from engine.render.drawqueue import DrawQueue
+from engine.render.moderngl.spritebatch import SpriteBatch
+
+
+def _entity_rect(entity: Entity) -> pygame.Rect:
+    return entity.rect
+
+
+# how Manager.render submits the entities of a class to the draw_queue: the blit of Entity.enqueue, their own
+# enqueue or their own render as a callable
+_BLIT, _ENQUEUE, _RENDER = range(3)
+_draw_order = attrgetter("draw_order")
 
 
 class EntityRoomData:
     def __init__(self):
         self.room_key: tuple[int, int, int, int] = (0, 0, 0, 0)
-        self.room_entities = []
+
+    @property
+    def room_rect(self) -> pygame.Rect:
+        return pygame.Rect(self.room_key)
 
 
 class Manager:
-    def __init__(self, ctx, wctx):
+    def __init__(self, ctx, wctx, cell_size: int = None):
         self.ctx = ctx
         self.wctx = wctx
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self.__focus_entity = None
         self.__resource_paths = self.ctx.resource_paths.rooms
 
-        # is the actual list of all objects, ordered by inserition time
-        self.__all_entities = []
+        settings = self.ctx.game_settings
+        # is the actual list of all objects, in insertion order until the first removal
+        self.__all_entities = IndexedList()
         # global entities persist between spatial changes and are always updated
-        self.__global_entities = []
-        # holds a dict of all entities by type
-        self.list_of_objects = {}
-        # a hashmap which will map entities to their region
+        self.__global_entities = IndexedList()
+        # holds a dict of all entities by type, removing an entity swaps the last one of its type into its place
+        self.list_of_objects: dict[str, IndexedList] = {}
+        # maps the room keys to their region, which entities are in a room is answered by spatial_index
         self.spatial_hashmap = {}
+        # uniform grid over all non global entities, kept up to date after every entity update
+        self.spatial_index = SpatialGrid(cell_size or settings.entity_cell_size)
+        # picks the entities update runs around the focus entity and the camera, None updates all of them
+        self.scheduler: UpdateScheduler | None = None
+        if settings.entity_scheduler:
+            self.scheduler = UpdateScheduler(
+                settings.entity_active_radius,
+                settings.entity_far_radius,
+                settings.entity_far_interval,
+                settings.entity_wake_ticks,
+            )
+        # entity slots behind the EntityHandles, a freed slot is reused with its generation counted up
+        self.__slots: list = []
+        self.__generations: list[int] = []
+        self.__free_slots: list[int] = []
+        # dead entities removed at the end of the update, in the order they died
+        self.__removed: dict = {}
+        # entity class -> pool the removed entities of the class are recycled from
+        self.__pools: dict[type, EntityPool] = {}
+        # spawned entities taken from a pool, added with the runtime added entities but without init_entity
+        self.__recycled_entities = []
+        # the draws of render and spatial_render, sorted by layer and flushed once per call
+        self.draw_queue = DrawQueue(settings.entity_y_sort)
+        # entity class -> how __enqueue submits its entities, _BLIT, _ENQUEUE or _RENDER
+        self.__draw_kinds: dict[type, int] = {}
+        # render only draws the entities the spatial_index finds in the view grown by the margin
+        self.__culling = settings.render_culling
+        self.__cull_margin = settings.render_cull_margin
+        # entities that draw outside of their rect, e.g. particle emitters, tested by their render_bounds instead
+        self.__unbounded = IndexedList()
+        # the entities updated by the last tick, the next one starts by storing their previous_position
+        self.__moved = []
+        # the entities drawn by the last render, their on_screen is True
+        self.__on_screen: set = set()
+        # the entities added so far, the next spawn_order
+        self.__spawned = 0
+        # entity class name -> position of its list in list_of_objects, culled renders draw in the same order
+        self.__type_order: dict[str, int] = {}
+        # the non global entities in draw order for the unculled render, None after entities were added or removed
+        self.__draw_order: list | None = None
 
         self.list_of_instantiable_objects = INSTANTIABLE_ENTITIES
         # entities that are added at runtime, this list will be added to the entity lists after update() finished
@@ -55,8 +117,22 @@ class Manager:
             return None
 
     def instantiate_entities(self, entities: dict):
+        # global entities persist, they keep their slots and their handles stay valid
+        for entity in self.__all_entities:
+            if not entity.is_global:
+                self.__release_slot(entity)
+        self.__removed = {entity: None for entity in self.__removed if entity.is_global}
         self.list_of_objects = {}
-        self.__all_entities = []
+        self.__type_order.clear()
+        self.__draw_order = None
+        self.__all_entities = IndexedList(self.__global_entities)
+        kept = len(self.__all_entities)
+        self.spatial_index.clear()
+        self.__unbounded.clear()
+        self.__on_screen.clear()
+        self.__moved = []
+        if self.scheduler is not None:
+            self.scheduler.clear()
         entities_to_init = entities
         for room_key, room_entities in entities_to_init.items():
             edr = EntityRoomData()
@@ -67,7 +143,7 @@ class Manager:
                     for e in ed:
                         self.__create_object(entity, e)
 
-        for entity in self.__all_entities:
+        for entity in self.__all_entities[kept:]:
             entity.init_entity()
 
     def reset_entities(self):
@@ -75,14 +151,45 @@ class Manager:
             entity.reset_entity()
 
     def _find_room_key_for_point(self, x, y):
-        for room_key in self.spatial_hashmap.keys():
-            rx, ry, rw, rh = room_key
-            if rx <= x < rx + rw and ry <= y < ry + rh:
-                return room_key
-        return None
+        # uses the tilemaps room grid instead of scanning every room key
+        room = self.wctx.tilemap.get_room_at_point(x, y)
+        if room is None or room.room_key not in self.spatial_hashmap:
+            return None
+        return room.room_key
+
+    def __take_slot(self, entity) -> None:
+        if self.__free_slots:
+            index = self.__free_slots.pop()
+            self.__slots[index] = entity
+        else:
+            index = len(self.__slots)
+            self.__slots.append(entity)
+            self.__generations.append(0)
+        entity.handle = EntityHandle(index, self.__generations[index])
+        entity.update_slot = index
+
+    def __release_slot(self, entity) -> None:
+        handle = entity.handle
+        if handle is None or self.__slots[handle.index] is not entity:
+            return
+        self.__slots[handle.index] = None
+        self.__generations[handle.index] += 1
+        self.__free_slots.append(handle.index)
+        entity.handle = None
+
+    def get_entity(self, handle: EntityHandle):
+        """
+        :return: the entity of the handle, None if it was removed since
+        """
+        if handle is None or self.__generations[handle.index] != handle.generation:
+            return None
+        return self.__slots[handle.index]
 
     def __add_entity(self, entity):
+        entity.spawn_order = self.__spawned
+        self.__spawned += 1
         if entity.is_global:
+            self.__take_slot(entity)
             self.__global_entities.append(entity)
             self.__all_entities.append(entity)
             return
@@ -94,13 +201,20 @@ class Manager:
 
         if room_key is None:
             raise ValueError(f"Entity at ({cx},{cy}) is not inside any room!")
+        self.__take_slot(entity)
 
         if entity.__class__.__name__ in self.list_of_objects.keys():
             self.list_of_objects[entity.__class__.__name__].append(entity)
-            self.spatial_hashmap[room_key].room_entities.append(entity)
         else:
-            self.list_of_objects[entity.__class__.__name__] = [entity]
-            self.spatial_hashmap[room_key].room_entities.append(entity)
+            self.list_of_objects[entity.__class__.__name__] = IndexedList([entity])
+            self.__type_order[entity.__class__.__name__] = len(self.__type_order)
+        entity.draw_order = self.__type_order[entity.__class__.__name__] << 40 | entity.spawn_order
+        self.__draw_order = None
+        self.spatial_index.insert(entity, entity.rect)
+        if not entity.culled_by_rect:
+            self.__unbounded.append(entity)
+        # with culling an entity is on screen from the first render that draws it
+        entity.on_screen = not self.__culling
 
         self.__all_entities.append(entity)
 
@@ -123,13 +237,88 @@ class Manager:
         return self.__focus_entity
 
     def update(self, dt):
-        for entity_type, entity_list in self.list_of_objects.items():
-            for entity in entity_list:
+        """
+        Updates all entities, or with a scheduler only the ones around the focus entity and the camera. Global
+        entities are always updated, dead entities are removed afterwards
+        :param dt: delta time
+        """
+        with PROFILER.stage("entities.update"):
+            # entities that are not updated this tick keep previous_position == position and are drawn still
+            for entity in self.__moved:
+                entity.store_previous()
+            dead = []
+            if self.scheduler is None:
+                for entity_list in self.list_of_objects.values():
+                    for entity in entity_list:
+                        entity.update(dt)
+                        if entity.alive:
+                            self.spatial_index.move(entity, entity.rect)
+                        else:
+                            dead.append(entity)
+                self.__moved = self.__all_entities
+            else:
+                with PROFILER.stage("entities.schedule"):
+                    scheduled = self.scheduler.schedule(self.__activation_areas(), self.spatial_index.query_rect, dt)
+                for entity, entity_dt in scheduled:
+                    entity.update(entity_dt)
+                    if entity.alive:
+                        self.spatial_index.move(entity, entity.rect)
+                    else:
+                        dead.append(entity)
+                self.__moved = [entity for entity, _ in scheduled]
+                self.__moved.extend(self.__global_entities)
+            for entity in self.__global_entities:
                 entity.update(dt)
-            self.list_of_objects[entity_type] = [e for e in entity_list if e.alive]
-
-        self.__add_runtime_added_entities()
-        self.__execute_entity_callbacks()
+                if not entity.alive:
+                    dead.append(entity)
+            self.__removed.update(dict.fromkeys(dead))
+
+            self.__add_runtime_added_entities()
+            self.__execute_entity_callbacks()
+            self.__remove_dead_entities()
+
+    def __activation_areas(self) -> list[pygame.Rect]:
+        # the scheduler measures its radii from the focus entity and the camera view
+        areas = []
+        if self.__focus_entity is not None:
+            areas.append(self.__focus_entity.rect)
+        viewport = getattr(getattr(self.wctx, "camera", None), "viewport_rect", None)
+        if viewport is not None:
+            areas.append(viewport)
+        return areas
+
+    def wake(self, entity, ticks: int = None) -> None:
+        """
+        Wakes a sleeping or frozen entity, e.g. when it is hit or a trigger fires. With a scheduler it is updated
+        every tick for the next ticks even outside the activation radius
+        :param ticks: entity_wake_ticks by default
+        """
+        if self.scheduler is not None and not entity.is_global:
+            self.scheduler.wake(entity, ticks)
+        else:
+            entity.activity = Activity.ACTIVE
+
+    def wake_in_radius(self, center, radius: float, ticks: int = None) -> list:
+        """
+        Wakes every entity within radius, e.g. around a noise or an explosion
+        :return: the woken entities
+        """
+        entities = self.get_entities_in_radius(center, radius)
+        for entity in entities:
+            self.wake(entity, ticks)
+        return entities
+
+    def sleep(self, entity) -> None:
+        """
+        The entity is skipped until the focus comes close or it is woken
+        """
+        entity.activity = Activity.SLEEPING
+
+    def freeze(self, entity) -> None:
+        """
+        The entity is skipped until it is woken
+        """
+        entity.activity = Activity.FROZEN
 
     def __execute_entity_callbacks(self):
         for callback in self.callbacks_post_update:
@@ -141,45 +330,106 @@ class Manager:
             entity.init_entity()
             self.__add_entity(entity)
         self.runtime_added_entities.clear()
+        for entity in self.__recycled_entities:
+            self.__add_entity(entity)
+        self.__recycled_entities.clear()
 
-    def spatial_update(self, dt):
-        chunk_location = self._find_room_key_for_point(self.__focus_entity.position.x, self.__focus_entity.position.y)
-        entity_list = self.get_spatial_entities(self.__focus_entity.position)
+    def __remove_dead_entities(self):
+        for entity in self.__removed:
+            self.__remove_entity(entity)
+        self.__removed.clear()
 
-        # Update with sideffect hack
-        # noinspection PyStatementEffect
-        entities_to_remove = [e for e in entity_list if not (e.update(dt), e.alive)[1]]
+    def spatial_update(self, dt):
+        with PROFILER.stage("entities.update"):
+            entity_list = self.get_spatial_entities(self.__focus_entity.position)
 
-        # noinspection PyStatementEffect
-        [e for e in self.__global_entities if (e.update(dt), e.alive)[1]]
+            # Update with sideffect hack
+            # noinspection PyStatementEffect
+            entities_to_remove = [e for e in entity_list if not (e.update(dt), e.alive)[1]]
 
-        for e in entities_to_remove:
-            try:
-                self.spatial_hashmap[chunk_location].room_entities.remove(e)
-                self.__all_entities.remove(e)
-            except ValueError:
-                self.logger.error(ValueError)
+            # noinspection PyStatementEffect
+            entities_to_remove.extend(e for e in self.__global_entities if not (e.update(dt), e.alive)[1])
 
-        new_chunk = self._find_room_key_for_point(self.__focus_entity.position.x, self.__focus_entity.position.y)
-        if new_chunk != chunk_location:
-            # TODO: event needs to be fired in on_leave_chunk()
-            self.spatial_hashmap[chunk_location].room_entities.remove(self.__focus_entity)
-            self.spatial_hashmap[new_chunk].room_entities.append(self.__focus_entity)
-            chunk_location = new_chunk
+            # entities that moved migrate between cells, this includes the focus entity changing rooms
+            for e in entity_list:
+                if e.alive:
+                    self.spatial_index.move(e, e.rect)
 
-        if self.__focus_entity not in self.spatial_hashmap[chunk_location].room_entities:
-            self.spatial_hashmap[chunk_location].room_entities.append(self.__focus_entity)
+            self.__removed.update(dict.fromkeys(entities_to_remove))
 
-        self.__add_runtime_added_entities()
-        self.__execute_entity_callbacks()
+            self.__add_runtime_added_entities()
+            self.__execute_entity_callbacks()
+            self.__remove_dead_entities()
 
     def __remove_entity(self, entity):
-        pass
+        # swap removes, the lists do not keep their order
+        self.spatial_index.remove(entity)
+        self.__unbounded.discard(entity)
+        self.__on_screen.discard(entity)
+        if entity.is_global:
+            self.__global_entities.discard(entity)
+        else:
+            entity_list = self.list_of_objects.get(entity.__class__.__name__)
+            if entity_list is not None:
+                entity_list.discard(entity)
+            self.__draw_order = None
+        if not self.__all_entities.discard(entity):
+            self.logger.error("Removed entity %r was not managed", entity)
+            return
+        if self.scheduler is not None:
+            self.scheduler.forget(entity)
+        self.__release_slot(entity)
+        pool = self.__pools.get(entity.__class__)
+        if pool is not None:
+            pool.release(entity)
+
+    def remove_entity(self, entity) -> None:
+        """
+        Kills the entity, it is removed at the end of the current or the next update. Handles of the entity
+        resolve to None from then on
+        """
+        entity.alive = False
+        self.__removed[entity] = None
 
     def add_entity(self, entity):
         self.runtime_added_entities.append(entity)
         return entity
 
+    def pool(self, entity_class: type, capacity: int = 256) -> EntityPool:
+        """
+        Recycles removed entities of the class for spawn instead of dropping them
+        :param capacity: most removed entities kept for reuse
+        :return: the pool of the class
+        """
+        pool = self.__pools.get(entity_class)
+        if pool is None:
+            def factory(position, **kwargs):
+                return entity_class(self.ctx, self.wctx, position, **kwargs)
+
+            pool = EntityPool(factory, capacity)
+            self.__pools[entity_class] = pool
+        return pool
+
+    def spawn(self, entity_class: type, position, **kwargs):
+        """
+        Creates an entity at runtime, taken from the pool of its class if there is one. Like add_entity the entity
+        is added after the current update
+        :param position: world position
+        :param kwargs: the keyword arguments of the constructor, or of reset_entity for a reused entity
+        :return: the entity
+        """
+        pool = self.__pools.get(entity_class)
+        if pool is None:
+            return self.add_entity(entity_class(self.ctx, self.wctx, position, **kwargs))
+        entity, reused = pool.acquire(position, **kwargs)
+        if not reused:
+            return self.add_entity(entity)
+        self.__recycled_entities.append(entity)
+        return entity
+
+    def get_pools(self) -> dict[type, EntityPool]:
+        return self.__pools
+
     def add_callback(self, callback):
         self.callbacks_post_update.append(callback)
 
@@ -195,36 +445,145 @@ class Manager:
         except KeyError:
             return []
 
+    @staticmethod
+    def __draw_kind(cls: type) -> int:
+        if cls.enqueue is not Entity.enqueue:
+            return _ENQUEUE
+        if cls.render is not Entity.render:
+            return _RENDER
+        return _BLIT
+
+    def __enqueue(self, entities, surf, camera_offset) -> None:
+        queue = self.draw_queue
+        draw_kinds = self.__draw_kinds
+        # the entities are drawn between their last two tick positions, see FixedTimestep
+        alpha = self.ctx.scene_manager.alpha
+        # the batch applies flip, scale and rotation itself, every entity submits to it through render
+        batched = isinstance(surf, SpriteBatch)
+        for entity in entities:
+            cls = entity.__class__
+            kind = draw_kinds.get(cls)
+            if kind is None:
+                kind = draw_kinds[cls] = self.__draw_kind(cls)
+            if kind == _RENDER:
+                entity.render_alpha = alpha
+                queue.draw(entity.render_priority, entity.render, camera_offset, entity.position[1])
+            elif batched:
+                queue.draw(entity.render_priority, entity.render, entity.interpolated_offset(camera_offset, alpha),
+                           entity.position[1])
+            elif kind == _BLIT:
+                # Entity.enqueue without the call
+                blit = entity.blit_args(camera_offset, alpha)
+                if blit:
+                    queue.blit(entity.render_priority, blit[0], blit[1], entity.position[1])
+            else:
+                entity.enqueue(queue, camera_offset, alpha)
+
+    def __visible(self, view: pygame.Rect, area: pygame.Rect = None) -> list:
+        """
+        :param view: the visible world rect
+        :param area: limits the entities to this world rect, e.g. a room
+        :return: the entities inside the view grown by the cull margin, in the order render draws all entities
+        """
+        margin = self.__cull_margin
+        view = view.inflate(margin * 2, margin * 2)
+        # the cells of the view are close enough, only the room limit is tested exactly
+        if area is None:
+            visible = self.spatial_index.query_rect(view)
+        else:
+            visible = self.spatial_index.query_rect(view.clip(area), _entity_rect)
+        unbounded = self.__unbounded
+        if unbounded:
+            visible = [entity for entity in visible if entity.culled_by_rect]
+            visible.extend(entity for entity in unbounded if entity.render_bounds().colliderect(view)
+                           and (area is None or area.colliderect(entity.rect)))
+        # the cells return the entities in no particular order
+        self.__sort_for_drawing(visible)
+
+        on_screen = set(visible)
+        for entity in self.__on_screen - on_screen:
+            entity.on_screen = False
+        for entity in on_screen - self.__on_screen:
+            entity.on_screen = True
+        self.__on_screen = on_screen
+        return visible
+
+    def __sort_for_drawing(self, entities: list) -> list:
+        """
+        Sorts the entities in the order every render draws them, grouped by type and then by spawn order. Unlike
+        the swap removing lists and the reused slots this order stays the same while the entities live
+        :return: entities
+        """
+        entities.sort(key=_draw_order)
+        return entities
+
+    def __all_for_drawing(self) -> list:
+        if self.__draw_order is None:
+            self.__draw_order = self.__sort_for_drawing(
+                [entity for entity_list in self.list_of_objects.values() for entity in entity_list])
+        return self.__draw_order
+
     def render(self, surf, camera_offset=(0,0)):
-        front = []
-        for entity_type in self.list_of_objects:
-            for entity in self.list_of_objects[entity_type]:
-                if entity.render_priority:
-                    front.append(entity)
-                    continue
-                entity.render(surf, camera_offset)
-            for entity in self.__global_entities:
-                if entity.render_priority:
-                    front.append(entity)
-                    continue
-                entity.render(surf, camera_offset)
-        for entity in front:
-            entity.render(surf, camera_offset)
+        """
+        Draws the entities ordered by their render_priority layer through the draw_queue. With render_culling only
+        the ones inside the target at camera_offset, i.e. the Camera.viewport_rect, and the global entities
+        """
+        with PROFILER.stage("entities.render"):
+            if self.__culling:
+                visible = self.__visible(pygame.Rect(camera_offset, surf.get_size()))
+                PROFILER.count("entities.drawn", len(visible))
+                PROFILER.count("entities.culled", len(self.__all_entities) - len(self.__global_entities) - len(visible))
+                self.__enqueue(visible, surf, camera_offset)
+            else:
+                self.__enqueue(self.__all_for_drawing(), surf, camera_offset)
+            self.__enqueue(self.__global_entities, surf, camera_offset)
+            self.draw_queue.flush(surf)
 
     def spatial_render(self, surf, camera_offset=(0, 0)):
-        front = []
-        entities_to_render = self.spatial_hashmap[
-            self._find_room_key_for_point(self.__focus_entity.rect.centerx, self.__focus_entity.rect.centery)
-        ].room_entities.copy()
-        entities_to_render.extend(self.__global_entities)
-        for entity in entities_to_render:
-            if entity.render_priority:
-                front.append(entity)
-                continue
-            entity.render(surf, camera_offset)
-        for entity in front:
-            entity.render(surf, camera_offset)
+        with PROFILER.stage("entities.render"):
+            center = (self.__focus_entity.rect.centerx, self.__focus_entity.rect.centery)
+            if self.__culling:
+                room = self._find_room_key_for_point(*center)
+                entities = [] if room is None else \
+                    self.__visible(pygame.Rect(camera_offset, surf.get_size()), self.spatial_hashmap[room].room_rect)
+                if PROFILER.enabled:
+                    PROFILER.count("entities.drawn", len(entities))
+                    PROFILER.count("entities.culled", len(self.get_spatial_entities(center)) - len(entities))
+            else:
+                entities = self.__sort_for_drawing(self.get_spatial_entities(center))
+            self.__enqueue(entities, surf, camera_offset)
+            self.__enqueue(self.__global_entities, surf, camera_offset)
+            self.draw_queue.flush(surf)
 
     def get_spatial_entities(self, position) -> list:
+        """
+        :param position: a world position
+        :return: a new list with the non global entities overlapping the room at position
+        """
         room_location = self._find_room_key_for_point(position[0], position[1])
-        return self.spatial_hashmap[room_location].room_entities
+        if room_location is None:
+            return []
+        return self.spatial_index.query_rect(self.spatial_hashmap[room_location].room_rect, _entity_rect)
+
+    def get_entities_in_rect(self, rect) -> list:
+        """
+        :param rect: an area in world pixels
+        :return: all non global entities whose rect overlaps the area
+        """
+        return self.spatial_index.query_rect(rect, _entity_rect)
+
+    def get_entities_in_radius(self, center, radius: float) -> list:
+        """
+        :param center: world position
+        :param radius: radius in pixels
+        :return: all non global entities whose rect overlaps the circle
+        """
+        return self.spatial_index.query_radius(center, radius, _entity_rect)
+
+    def get_entities_on_ray(self, start, end) -> list:
+        """
+        :param start: segment start in world pixels
+        :param end: segment end in world pixels
+        :return: all non global entities hit by the segment, roughly ordered from start to end
+        """
+        return self.spatial_index.query_ray(start, end, _entity_rect)
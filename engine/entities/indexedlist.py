@@ -0,0 +1,81 @@
+from collections.abc import Sequence
+
+
+class IndexedList(Sequence):
+    """
+    A list that knows the index of every item, so remove is O(1): the last item is swapped into the hole. The
+    order of the items is therefore only kept until the first removal. Items have to be hashable and unique.
+    It only offers the mutations below, which keep the index up to date, to everyone else it is a read only
+    sequence.
+    """
+
+    def __init__(self, items=()):
+        self.__items: list = []
+        self.__index: dict = {}
+        self.extend(items)
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    def __getitem__(self, index):
+        return self.__items[index]
+
+    def __iter__(self):
+        return iter(self.__items)
+
+    def __contains__(self, item) -> bool:
+        return item in self.__index
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.__items!r})"
+
+    def append(self, item) -> None:
+        if item in self.__index:
+            return
+        self.__index[item] = len(self.__items)
+        self.__items.append(item)
+
+    def extend(self, items) -> None:
+        for item in items:
+            self.append(item)
+
+    def remove(self, item) -> None:
+        """
+        :raises ValueError: if the item is not in the list, like list.remove
+        """
+        try:
+            index = self.__index.pop(item)
+        except KeyError:
+            raise ValueError(f"{item!r} is not in the list") from None
+        last = self.__items.pop()
+        if last is not item:
+            self.__items[index] = last
+            self.__index[last] = index
+
+    def discard(self, item) -> bool:
+        """
+        :return: True if the item was in the list
+        """
+        if item not in self.__index:
+            return False
+        self.remove(item)
+        return True
+
+    def pop(self, index: int = -1):
+        item = self.__items[index]
+        self.remove(item)
+        return item
+
+    def sort(self, *args, **kwargs) -> None:
+        self.__items.sort(*args, **kwargs)
+        self.__index = {item: i for i, item in enumerate(self.__items)}
+
+    def index(self, item, *args) -> int:
+        try:
+            return self.__index[item]
+        except KeyError:
+            raise ValueError(f"{item!r} is not in the list") from None
+
+    def clear(self) -> None:
+        self.__items.clear()
+        self.__index.clear()
@@ -0,0 +1,54 @@
+from typing import Callable, NamedTuple
+
+
+class EntityHandle(NamedTuple):
+    """
+    Refers to an entity of the Manager by slot. The slot is reused once the entity is removed, the generation of
+    the slot is counted up then, so a handle kept past the removal resolves to None instead of a new entity.
+    """
+    index: int
+    generation: int
+
+
+class EntityPool:
+    """
+    Removed entities of one class kept for reuse, so frequently spawned types like projectiles, pickups and
+    emitters are not constructed again every time. A reused entity is recycled to its position and the subclass
+    restores the rest of its state in reset_entity, which gets the keyword arguments of the spawn.
+    """
+
+    def __init__(self, factory: Callable, capacity: int = 256):
+        """
+        :param factory: creates a new entity from the position and the keyword arguments of the spawn
+        :param capacity: most removed entities kept, the rest is dropped
+        """
+        self.factory = factory
+        self.capacity = capacity
+        self.free: list = []
+        self.created = 0
+        self.reused = 0
+
+    def __len__(self):
+        return len(self.free)
+
+    def acquire(self, position, **kwargs) -> tuple[object, bool]:
+        """
+        :return: the entity and whether it was reused
+        """
+        if self.free:
+            entity = self.free.pop()
+            entity.recycle(position)
+            entity.reset_entity(**kwargs)
+            self.reused += 1
+            return entity, True
+        self.created += 1
+        return self.factory(position, **kwargs), False
+
+    def release(self, entity) -> bool:
+        """
+        :return: True if the entity is kept for reuse
+        """
+        if len(self.free) >= self.capacity:
+            return False
+        self.free.append(entity)
+        return True
@@ -0,0 +1,114 @@
+from enum import StrEnum, auto
+from typing import Callable, Iterable
+
+import pygame
+
+
+class Activity(StrEnum):
+    # updated depending on the distance to the focus entity and the camera
+    ACTIVE = auto()
+    # skipped until the entity comes into the active radius or is woken
+    SLEEPING = auto()
+    # skipped until the entity is woken, no matter how close it is
+    FROZEN = auto()
+
+
+class UpdateScheduler:
+    """
+    Decides every tick which entities the Manager updates, so the cost follows the entities around the player
+    instead of the size of the world. Entities within active_radius pixels of the focus entity or the camera view
+    are updated every tick, the ones within far_radius every far_interval ticks with the dt of all ticks they
+    skipped, staggered so the same share runs every tick. Everything further away is not touched at all.
+    Woken entities are updated every tick for wake_ticks ticks wherever they are, e.g. an enemy hit from afar.
+    """
+
+    def __init__(self, active_radius: int = 320, far_radius: int = 960, far_interval: int = 4,
+                 wake_ticks: int = 60):
+        self.active_radius = active_radius
+        self.far_radius = max(far_radius, active_radius)
+        self.far_interval = max(1, far_interval)
+        self.wake_ticks = wake_ticks
+        self.tick = 0
+        # entity -> ticks it is still updated at full rate
+        self.__woken: dict = {}
+        # amounts of the last schedule, see counts
+        self.active = 0
+        self.far = 0
+        self.woken = 0
+        self.sleeping = 0
+
+    @property
+    def counts(self) -> dict[str, int]:
+        """
+        :return: the entities updated at full rate, at the reduced rate and because they were woken in the last
+        tick, plus the sleeping and frozen ones that were in range but skipped
+        """
+        return {"active": self.active, "far": self.far, "woken": self.woken, "sleeping": self.sleeping}
+
+    def wake(self, entity, ticks: int = None) -> None:
+        """
+        Sets the entity active and updates it every tick for the next ticks, wherever it is
+        :param ticks: wake_ticks by default
+        """
+        entity.activity = Activity.ACTIVE
+        self.__woken[entity] = max(self.__woken.get(entity, 0), self.wake_ticks if ticks is None else ticks)
+
+    def forget(self, entity) -> None:
+        self.__woken.pop(entity, None)
+
+    def clear(self) -> None:
+        self.__woken.clear()
+
+    def schedule(self, centers: Iterable[pygame.Rect], query: Callable[[pygame.Rect], list],
+                 dt: float) -> list[tuple[object, float]]:
+        """
+        :param centers: the focus rect and the camera view, the radii extend from their borders
+        :param query: returns the entities overlapping an area, e.g. SpatialGrid.query_rect without exact test
+        :param dt: delta time of the tick
+        :return: (entity, dt) of every entity to update this tick
+        """
+        self.tick += 1
+        tick = self.tick
+        interval = self.far_interval
+        near_areas = []
+        candidates = {}
+        for center in centers:
+            near_areas.append(center.inflate(self.active_radius * 2, self.active_radius * 2))
+            candidates.update(dict.fromkeys(query(center.inflate(self.far_radius * 2, self.far_radius * 2))))
+
+        scheduled = []
+        active = far = sleeping = 0
+        for entity in candidates:
+            if entity in self.__woken:
+                continue
+            rect = entity.rect
+            near = False
+            for area in near_areas:
+                if area.colliderect(rect):
+                    near = True
+                    break
+            activity = entity.activity
+            if activity is not Activity.ACTIVE:
+                if activity is Activity.FROZEN or not near:
+                    sleeping += 1
+                    continue
+                # sleeping entities wake up on their own when the focus comes close
+                entity.activity = Activity.ACTIVE
+            if near:
+                scheduled.append((entity, dt))
+                active += 1
+            elif (tick + entity.update_slot) % interval == 0:
+                scheduled.append((entity, dt * interval))
+                far += 1
+
+        for entity, ticks in list(self.__woken.items()):
+            # an entity that went back to sleep on its own is left alone
+            keep = entity.alive and entity.activity is Activity.ACTIVE
+            if ticks <= 1 or not keep:
+                del self.__woken[entity]
+            else:
+                self.__woken[entity] = ticks - 1
+            if keep:
+                scheduled.append((entity, dt))
+        self.active, self.far, self.woken, self.sleeping = active, far, len(scheduled) - active - far, sleeping
+        return scheduled
@@ -0,0 +1,167 @@
+import math
+
+from pygame import Rect
+
+
+class SpatialGrid:
+    """
+    A uniform grid spatial index. Every object is stored in all cells its rect overlaps, moving an object only
+    touches the cells it actually enters or leaves. Cells hold insertion ordered dicts instead of sets so queries
+    return objects in a deterministic order.
+    """
+
+    def __init__(self, cell_size: int = 64):
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], dict] = {}
+        # object -> (cx0, cy0, cx1, cy1) cell range it is stored in
+        self.__ranges: dict = {}
+
+    def __len__(self):
+        return len(self.__ranges)
+
+    def __contains__(self, obj):
+        return obj in self.__ranges
+
+    def __cell_range(self, rect) -> tuple[int, int, int, int]:
+        cs = self.cell_size
+        x, y, w, h = rect[0], rect[1], rect[2], rect[3]
+        return (int(x // cs), int(y // cs),
+                int((x + max(w, 1) - 1) // cs), int((y + max(h, 1) - 1) // cs))
+
+    def insert(self, obj, rect) -> None:
+        """
+        :param obj: any hashable object, usually an Entity
+        :param rect: its bounding rect in world pixels
+        :return: Nothing
+        """
+        if obj in self.__ranges:
+            self.move(obj, rect)
+            return
+        cell_range = self.__cell_range(rect)
+        self.__ranges[obj] = cell_range
+        self.__add_to_cells(obj, cell_range)
+
+    def remove(self, obj) -> None:
+        cell_range = self.__ranges.pop(obj, None)
+        if cell_range is not None:
+            self.__remove_from_cells(obj, cell_range)
+
+    def move(self, obj, rect) -> bool:
+        """
+        Updates the cells of an already inserted object
+        :return: True if the object changed cells
+        """
+        old_range = self.__ranges.get(obj)
+        new_range = self.__cell_range(rect)
+        if old_range == new_range:
+            return False
+        if old_range is not None:
+            self.__remove_from_cells(obj, old_range)
+        self.__ranges[obj] = new_range
+        self.__add_to_cells(obj, new_range)
+        return True
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self.__ranges.clear()
+
+    def __add_to_cells(self, obj, cell_range) -> None:
+        cx0, cy0, cx1, cy1 = cell_range
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is None:
+                    self.cells[(cx, cy)] = cell = {}
+                cell[obj] = None
+
+    def __remove_from_cells(self, obj, cell_range) -> None:
+        cx0, cy0, cx1, cy1 = cell_range
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is None:
+                    continue
+                cell.pop(obj, None)
+                if not cell:
+                    del self.cells[(cx, cy)]
+
+    def query_cells(self, cx0: int, cy0: int, cx1: int, cy1: int) -> list:
+        """
+        :return: all objects stored in the cell range, each object once
+        """
+        found = {}
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        return list(found)
+
+    def query_rect(self, rect, get_rect=None) -> list:
+        """
+        :param rect: area in world pixels
+        :param get_rect: optional callable returning the rect of an object, if given the candidates of the
+        cells are filtered by an exact overlap test
+        :return: the objects in the cells overlapped by rect
+        """
+        candidates = self.query_cells(*self.__cell_range(rect))
+        if get_rect is None:
+            return candidates
+        rect = Rect(rect)
+        return [obj for obj in candidates if rect.colliderect(get_rect(obj))]
+
+    def query_radius(self, center, radius: float, get_rect) -> list:
+        """
+        :param center: circle center in world pixels
+        :param radius: circle radius in pixels
+        :param get_rect: callable returning the rect of an object
+        :return: all objects whose rect overlaps the circle
+        """
+        cx, cy = center[0], center[1]
+        candidates = self.query_cells(*self.__cell_range((cx - radius, cy - radius, radius * 2 + 1, radius * 2 + 1)))
+        found = []
+        r2 = radius * radius
+        for obj in candidates:
+            rect = get_rect(obj)
+            # closest point of the rect to the circle center
+            dx = cx - max(rect.left, min(cx, rect.right))
+            dy = cy - max(rect.top, min(cy, rect.bottom))
+            if dx * dx + dy * dy <= r2:
+                found.append(obj)
+        return found
+
+    def query_ray(self, start, end, get_rect) -> list:
+        """
+        Walks the cells along the segment start -> end (grid DDA) and returns the objects whose rect the
+        segment intersects, ordered by the distance of the cell they were first found in
+        :param start: segment start in world pixels
+        :param end: segment end in world pixels
+        :param get_rect: callable returning the rect of an object
+        :return: list of objects
+        """
+        cs = self.cell_size
+        x0, y0, x1, y1 = start[0], start[1], end[0], end[1]
+        cx, cy = int(x0 // cs), int(y0 // cs)
+        end_cx, end_cy = int(x1 // cs), int(y1 // cs)
+        dx, dy = x1 - x0, y1 - y0
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        # ray length (in t) between vertical / horizontal cell borders and to the first border
+        t_delta_x = abs(cs / dx) if dx else math.inf
+        t_delta_y = abs(cs / dy) if dy else math.inf
+        t_max_x = ((cx + (step_x > 0)) * cs - x0) / dx if dx else math.inf
+        t_max_y = ((cy + (step_y > 0)) * cs - y0) / dy if dy else math.inf
+
+        found = {}
+        segment = ((x0, y0), (x1, y1))
+        for _ in range(abs(end_cx - cx) + abs(end_cy - cy) + 1):
+            for obj in self.cells.get((cx, cy), ()):
+                if obj not in found and get_rect(obj).clipline(*segment):
+                    found[obj] = None
+            if t_max_x < t_max_y:
+                t_max_x += t_delta_x
+                cx += step_x
+            else:
+                t_max_y += t_delta_y
+                cy += step_y
+        return list(found)
@@ -72,17 +72,17 @@ class Input:
         self.deadzone = 0.24
 
     def update(self):
-        self.actions_pressed.clear()
-        self.actions_released.clear()
-        self.mouse_buttons_pressed.clear()
-        self.wheel = 0
-
+        """
+        Polls the events of the frame. Pressed and released edges, mouse presses and the wheel are latched until a
+        simulation tick consumed them with end_tick, so a frame without a tick does not lose them and a frame with
+        several ticks only sees them in the first one
+        """
         prev_mouse = self.mouse_pos
-        self.mouse_pos = pygame.mouse.get_pos()
+        self.mouse_pos = self.poll_mouse_pos()
         self.mouse_delta = (self.mouse_pos[0] - prev_mouse[0],
                             self.mouse_pos[1] - prev_mouse[1])
 
-        for event in pygame.event.get():
+        for event in self.poll_events():
             if event.type == QUIT:
                 pygame.quit()
                 sys.exit()
@@ -156,6 +156,24 @@ class Input:
             self.actions_down[Action.MOVE_UP]    = move_y < 0
             self.actions_down[Action.MOVE_DOWN]  = move_y > 0
 
+    def end_tick(self) -> None:
+        """
+        Clears the edges after a simulation tick read them
+        """
+        self.actions_pressed.clear()
+        self.actions_released.clear()
+        self.mouse_buttons_pressed.clear()
+        self.wheel = 0
+
+    def poll_events(self) -> list:
+        """
+        :return: the events of this frame, overwritten by input sources that do not read the pygame event queue
+        """
+        return pygame.event.get()
+
+    def poll_mouse_pos(self) -> Tuple[int, int]:
+        return pygame.mouse.get_pos()
+
     def down(self, action: Action) -> bool:
         return self.actions_down.get(action, False)
 
@@ -0,0 +1,70 @@
+import pygame
+from pygame.locals import KEYDOWN, KEYUP, MOUSEBUTTONDOWN, MOUSEBUTTONUP
+from typing import Dict, List, Optional, Tuple
+
+from engine.input.input import Action, Input
+
+
+class ScriptedInput(Input):
+    """
+    Input that replays a script instead of reading the pygame event queue, for headless runs. The script maps a
+    frame number to the events of that frame, the frame counter advances with every update. The bindings and the
+    action state handling are the ones of Input, scripted key events go through the same code as real ones.
+    """
+
+    def __init__(self, ctx, script: Optional[Dict[int, List[pygame.event.Event]]] = None):
+        """
+        :param ctx: the GameContext
+        :param script: events per frame, can be extended with hold, click and move_mouse
+        """
+        super().__init__(ctx)
+        # a connected gamepad must not leak into a scripted run
+        self.joystick = None
+        self.frame = 0
+        self.script: Dict[int, List[pygame.event.Event]] = script or {}
+        self.mouse_script: Dict[int, Tuple[int, int]] = {}
+        self.__mouse_pos: Tuple[int, int] = (0, 0)
+
+    def add_event(self, frame: int, event: pygame.event.Event) -> "ScriptedInput":
+        self.script.setdefault(frame, []).append(event)
+        return self
+
+    def hold(self, action: Action, start: int, frames: int) -> "ScriptedInput":
+        """
+        Presses the key bound to action at frame start and releases it frames later
+        :param action: the action to hold
+        :param start: frame of the key down
+        :param frames: amount of frames the action is held down
+        :return: self for chaining
+        """
+        key = self.keyboard_bindings[action]
+        self.add_event(start, pygame.event.Event(KEYDOWN, key=key))
+        return self.add_event(start + frames, pygame.event.Event(KEYUP, key=key))
+
+    def click(self, frame: int, button: int = 1) -> "ScriptedInput":
+        self.add_event(frame, pygame.event.Event(MOUSEBUTTONDOWN, button=button))
+        return self.add_event(frame + 1, pygame.event.Event(MOUSEBUTTONUP, button=button))
+
+    def move_mouse(self, frame: int, position: Tuple[int, int]) -> "ScriptedInput":
+        self.mouse_script[frame] = position
+        return self
+
+    def poll_events(self) -> list:
+        events = self.script.get(self.frame, [])
+        self.frame += 1
+        return events
+
+    def poll_mouse_pos(self) -> Tuple[int, int]:
+        # called before poll_events, self.frame is still the frame being polled
+        self.__mouse_pos = self.mouse_script.get(self.frame, self.__mouse_pos)
+        return self.__mouse_pos
+
+    def reset(self) -> None:
+        """
+        Rewinds the script and releases every action
+        """
+        self.frame = 0
+        self.__mouse_pos = (0, 0)
+        for action in Action:
+            self.actions_down[action] = False
+        self.mouse_buttons_down.clear()
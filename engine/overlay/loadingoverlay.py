@@ -0,0 +1,68 @@
+import time
+from typing import Iterator, Optional
+
+import pygame
+
+from engine.overlay.blockflags import BlockFlags
+from engine.overlay.overlay import Overlay
+
+
+class LoadingOverlay(Overlay):
+    """
+    A progress bar with the current loading stage. It either shows the progress it is given with set_progress, e.g.
+    from the on_progress callback of the ContentManager at boot, or drives a generator like
+    ContentManager.load_steps itself for up to budget_ms per update and finishes when it is exhausted.
+    Blocks everything while it is shown.
+    """
+
+    BACKGROUND = (0, 0, 0)
+    BAR = (235, 235, 235)
+    BAR_BACKGROUND = (60, 60, 60)
+    TEXT = (235, 235, 235)
+
+    def __init__(self, ctx=None, wctx=None, steps: Optional[Iterator[tuple[float, str]]] = None,
+                 budget_ms: float = 8, bar_width: int = 120, bar_height: int = 4, font_size: int = 11):
+        """
+        :param steps: yields (progress from 0 to 1, stage), advanced in update
+        :param budget_ms: time spent advancing steps per update
+        """
+        super().__init__(ctx, wctx)
+        self.steps = steps
+        self.budget_ms = budget_ms
+        self.bar_width = bar_width
+        self.bar_height = bar_height
+        self.progress = 0.0
+        self.stage = ""
+        pygame.font.init()
+        self.font = pygame.font.Font(None, font_size)
+
+    def set_progress(self, progress: float, stage: str = "") -> None:
+        self.progress = max(0.0, min(1.0, progress))
+        self.stage = stage
+
+    def update(self, dt: float):
+        if self.steps is None:
+            if self.progress >= 1.0:
+                self.finish()
+            return
+        end = time.perf_counter() + self.budget_ms / 1000
+        while time.perf_counter() < end:
+            try:
+                self.set_progress(*next(self.steps))
+            except StopIteration:
+                self.set_progress(1.0, self.stage)
+                self.finish()
+                return
+
+    def render(self, surf: pygame.Surface):
+        surf.fill(self.BACKGROUND)
+        width = min(self.bar_width, surf.get_width() - 2)
+        x = (surf.get_width() - width) // 2
+        y = surf.get_height() // 2
+        surf.fill(self.BAR_BACKGROUND, (x, y, width, self.bar_height))
+        surf.fill(self.BAR, (x, y, int(width * self.progress), self.bar_height))
+        text = self.font.render(f"{self.stage} {int(self.progress * 100)}%", False, self.TEXT)
+        surf.blit(text, (x, y + self.bar_height + 2))
+
+    def blocks(self) -> BlockFlags:
+        return BlockFlags(world=True, entities=True, camera=True, vfx=True, input=True)
@@ -0,0 +1,95 @@
+import numpy as np
+import pygame
+
+from engine.core.profiler import PROFILER, Profiler
+from engine.overlay.blockflags import BlockFlags
+from engine.overlay.overlay import Overlay
+
+
+class PerfOverlay(Overlay):
+    """
+    Shows the frame time graph of a Profiler, the per stage breakdown (mean and p95 over the profilers history) and
+    the mean of the counters per frame.
+    The panel is redrawn every refresh_frames frames and blitted in between, so the overlay itself stays cheap.
+    It never finishes and blocks nothing.
+    """
+
+    BACKGROUND = (0, 0, 0, 170)
+    TEXT = (235, 235, 235)
+    BAR = (120, 200, 120)
+    BAR_OVER_BUDGET = (220, 80, 70)
+    BUDGET = (240, 220, 90)
+
+    def __init__(self, ctx=None, wctx=None, profiler: Profiler = PROFILER, budget_ms: float = None,
+                 width: int = 120, graph_height: int = 20, font_size: int = 11, refresh_frames: int = 15):
+        """
+        :param profiler: the profiler to show
+        :param budget_ms: the frame budget drawn into the graph, from GameSettings.tick_rate if None
+        :param width: panel width in pixels, one graph column per frame
+        :param graph_height: graph height in pixels, the top of the graph is twice the budget
+        :param refresh_frames: frames between two redraws of the panel
+        """
+        super().__init__(ctx, wctx)
+        self.profiler = profiler
+        if budget_ms is None:
+            tick_rate = ctx.game_settings.tick_rate if ctx and ctx.game_settings else 60
+            budget_ms = 1000 / tick_rate
+        self.budget_ms = budget_ms
+        self.width = width
+        self.graph_height = graph_height
+        self.refresh_frames = refresh_frames
+        self.position = (1, 1)
+        pygame.font.init()
+        self.font = pygame.font.Font(None, font_size)
+        self.__panel: pygame.Surface | None = None
+        self.__drawn_at = -1
+
+    def blocks(self) -> BlockFlags:
+        return BlockFlags(world=False, entities=False, camera=False, vfx=False, input=False)
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the profiler history to path, as JSON if path ends with .json and as CSV otherwise
+        """
+        if str(path).endswith(".json"):
+            self.profiler.dump_json(path)
+        else:
+            self.profiler.dump_csv(path)
+
+    def render(self, surf: pygame.Surface):
+        frames = self.profiler.frames
+        if self.__panel is None or frames - self.__drawn_at >= self.refresh_frames:
+            self.__panel = self.__draw_panel(min(self.width, surf.get_width()))
+            self.__drawn_at = frames
+        surf.blit(self.__panel, self.position)
+
+    def __draw_panel(self, width: int) -> pygame.Surface:
+        summary = self.profiler.summary()
+        lines = [f"frame {summary['frame']['mean']:.2f} ms  p95 {summary['frame']['p95']:.2f}" if summary
+                 else "no frames profiled"]
+        lines.extend(f"{name} {stats['mean']:.2f}  {stats['p95']:.2f}"
+                     for name, stats in summary.items() if name != "frame")
+        lines.extend(f"{name} {stats['mean']:.0f}" for name, stats in self.profiler.counter_summary().items())
+        line_height = self.font.get_linesize()
+        panel = pygame.Surface((width, self.graph_height + 2 + line_height * len(lines)), pygame.SRCALPHA)
+        panel.fill(self.BACKGROUND)
+        self.__draw_graph(panel, width)
+        y = self.graph_height + 2
+        for line in lines:
+            panel.blit(self.font.render(line, False, self.TEXT), (1, y))
+            y += line_height
+        return panel
+
+    def __draw_graph(self, panel: pygame.Surface, width: int) -> None:
+        frame_ms = self.profiler.frame_times()[-width:] * 1000
+        # the top of the graph is twice the budget, the budget line sits in the middle
+        scale = self.graph_height / (self.budget_ms * 2)
+        heights = np.minimum(frame_ms * scale, self.graph_height).astype(int)
+        offset = width - len(heights)
+        for x, (ms, h) in enumerate(zip(frame_ms, heights)):
+            if h <= 0:
+                continue
+            color = self.BAR_OVER_BUDGET if ms > self.budget_ms else self.BAR
+            panel.fill(color, (offset + x, self.graph_height - h, 1, h))
+        budget_y = self.graph_height - int(self.budget_ms * scale)
+        panel.fill(self.BUDGET, (0, budget_y, width, 1))
@@ -7,13 +7,16 @@ import random
 
 class Camera:
     def __init__(self, ctx, wctx):
-        self.screen_shake = 0
+        self.screen_shake = Vector2(0, 0)
         self.ctx = ctx
         self.wctx = wctx
         self.screen_shake_strength = Vector2(0, 0)
         self.screen_shake_duration = 0
         self.scroll = [0, 0]
-        self.render_scroll = [0, 0]
+        # the scroll before the last update, rendering interpolates from it to scroll
+        self.previous_scroll = [0, 0]
+        # the next update jumps to the target instead of moving there
+        self.__snap = True
         self.target = None
         self.restrict_rect_coordinates: list[int] = [0, 0, 0, 0]  # x, y, w, h
         self.screen_shake_speed = 50
@@ -35,6 +38,34 @@ class Camera:
             self.ctx.window_settings.game_resolution_height,
         )
 
+    @property
+    def render_scroll(self) -> list[int]:
+        """
+        :return: the scroll plus the screen shake, between the last two updates by the render alpha of the
+        SceneManager
+        """
+        x, y = self.__interpolated_scroll()
+        return [int(x + self.screen_shake.x), int(y + self.screen_shake.y)]
+
+    @property
+    def render_view(self) -> Rect:
+        """
+        :return: the viewport_rect at the interpolated scroll, what rendering the world should draw
+        """
+        x, y = self.__interpolated_scroll()
+        return Rect(
+            int(x),
+            int(y),
+            self.ctx.window_settings.game_resolution_width,
+            self.ctx.window_settings.game_resolution_height,
+        )
+
+    def __interpolated_scroll(self) -> tuple[float, float]:
+        alpha = self.ctx.scene_manager.alpha
+        previous = self.previous_scroll
+        return (previous[0] + (self.scroll[0] - previous[0]) * alpha,
+                previous[1] + (self.scroll[1] - previous[1]) * alpha)
+
     def set_restrict_rect(self, coordinates: list[int]):
         self.restrict_rect_coordinates = coordinates
 
@@ -43,6 +74,7 @@ class Camera:
 
     def set_target(self, obj_to_follow):
         self.target = obj_to_follow
+        self.__snap = True
 
     def update(self, dt: float):
         if self.screen_shake_duration > 0:
@@ -54,6 +86,7 @@ class Camera:
         else:
             self.screen_shake = Vector2(0, 0)
 
+        self.previous_scroll = self.scroll.copy()
         new_scroll = [
             (self.target.position.x - (self.ctx.window_settings.game_resolution_width / 2) + self.screen_shake.x),
             self.target.position.y - (self.ctx.window_settings.game_resolution_height / 2) + self.screen_shake.y,
@@ -78,10 +111,9 @@ class Camera:
             if self.scroll[1] < self.restrict_rect.top:
                 self.scroll[1] = self.restrict_rect.top
 
-        self.render_scroll = [
-            int(self.scroll[0] + self.screen_shake.x),
-            int(self.scroll[1] + self.screen_shake.y),
-        ]
+        if self.__snap:
+            self.previous_scroll = self.scroll.copy()
+            self.__snap = False
 
     def invoke_screenshake(self, duration: float, strength: int):
         _strength = pygame.Vector2(strength, strength)
@@ -0,0 +1,111 @@
+from operator import itemgetter
+from typing import Callable
+
+import pygame
+
+_KEY = itemgetter(0)
+
+
+class DrawQueue:
+    """
+    Collects the draws of a frame per render layer and draws the layers in ascending order. Without sort the draws
+    of a layer keep the order they were submitted in and the blits between two callables go to the target in one
+    Surface.fblits. With sort the draws of a layer are ordered by their key first, e.g. the y of the feet, draws
+    with the same key keep their submission order. A callable draws itself with (target, position) instead, e.g.
+    an entity with its own render, and splits the batch of its layer.
+    """
+
+    def __init__(self, sort: bool = False):
+        # order the draws within a layer by their key
+        self.sort = sort
+        # layer -> runs, a run is a list of (surface, position) blits or a (callable, position) draw and the last
+        # run of a layer is always a blit list. With sort layer -> (key, source, position, callable) records
+        self.__layers: dict[int, list] = {}
+        # draws and fblits batches of the last flush
+        self.draws = 0
+        self.batches = 0
+
+    def __len__(self):
+        if self.sort:
+            return sum(len(records) for records in self.__layers.values())
+        return sum(len(run) if run.__class__ is list else 1 for runs in self.__layers.values() for run in runs)
+
+    def blit(self, layer: int, surface: pygame.Surface, position, key: float = 0) -> None:
+        """
+        :param layer: render layer, e.g. Entity.render_priority
+        :param surface: the surface to blit
+        :param position: the destination on the target
+        :param key: order within the layer, only used with sort
+        """
+        runs = self.__layers.get(layer)
+        if runs is None:
+            runs = self.__layers[layer] = [] if self.sort else [[]]
+        if self.sort:
+            runs.append((key, surface, position, False))
+        else:
+            runs[-1].append((surface, position))
+
+    def draw(self, layer: int, draw: Callable, position, key: float = 0) -> None:
+        """
+        :param layer: render layer, e.g. Entity.render_priority
+        :param draw: called with (target, position) when the layer is drawn
+        :param position: the destination on the target
+        :param key: order within the layer, only used with sort
+        """
+        runs = self.__layers.get(layer)
+        if runs is None:
+            runs = self.__layers[layer] = [] if self.sort else [[]]
+        if self.sort:
+            runs.append((key, draw, position, True))
+        else:
+            runs.append((draw, position))
+            runs.append([])
+
+    def clear(self) -> None:
+        self.__layers.clear()
+
+    def flush(self, target) -> None:
+        """
+        Draws all layers onto the target and empties the queue
+        :param target: a pygame.Surface or anything with fblits, e.g. a SpriteBatch
+        :return: Nothing
+        """
+        layers = self.__layers
+        draws = batches = 0
+        for layer in sorted(layers):
+            if self.sort:
+                layer_draws, layer_batches = self.__flush_sorted(target, layers[layer])
+                draws += layer_draws
+                batches += layer_batches
+                continue
+            for run in layers[layer]:
+                if run.__class__ is list:
+                    if run:
+                        target.fblits(run)
+                        draws += len(run)
+                        batches += 1
+                else:
+                    run[0](target, run[1])
+                    draws += 1
+        self.draws = draws
+        self.batches = batches
+        layers.clear()
+
+    @staticmethod
+    def __flush_sorted(target, records: list) -> tuple[int, int]:
+        records.sort(key=_KEY)
+        batches = 0
+        blits = []
+        for _, source, position, draw in records:
+            if draw:
+                if blits:
+                    target.fblits(blits)
+                    batches += 1
+                    blits = []
+                source(target, position)
+            else:
+                blits.append((source, position))
+        if blits:
+            target.fblits(blits)
+            batches += 1
+        return len(records), batches
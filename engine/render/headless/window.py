@@ -0,0 +1,68 @@
+import os
+from collections import deque
+
+import pygame
+
+from engine.core.profiler import PROFILER
+
+
+class Window:
+    """
+    Offscreen window for headless runs. Uses the SDL dummy video driver, so nothing is shown and no GPU is needed.
+    The display surface is a plain pygame surface like the one of the ModernGL window, render_frame only clears it.
+    Time does not come from a clock, every frame advances by the fixed frame_time, which makes runs deterministic
+    and lets them step as fast as the cpu allows.
+    """
+
+    def __init__(self, ctx=None, frame_time: float = None) -> None:
+        """
+        :param ctx: the GameContext
+        :param frame_time: seconds every frame advances, 1 / GameSettings.tick_rate if None
+        """
+        self.ctx = ctx
+        self.ms = 0
+        self.debug_dt = False
+        self.tick = 0
+        self.frame_time = frame_time or 1 / self.ctx.game_settings.tick_rate
+        self.dt = self.frame_time
+        self.frame = 0
+
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        pygame.init()
+
+        self.base_resolution = [
+            self.ctx.window_settings.game_resolution_width,
+            self.ctx.window_settings.game_resolution_height,
+        ]
+        self.window_resolution = list(self.base_resolution)
+        self.background_color = self.ctx.window_settings.window_bg_color
+
+        # a video mode is still required for convert and convert_alpha while loading content
+        self.screen = pygame.display.set_mode((1, 1))
+        self.display = pygame.Surface(
+            (self.base_resolution[0], self.base_resolution[1]),
+            flags=pygame.SRCALPHA
+        )
+
+        self.frame_history = deque(maxlen=120)
+        self.cursor_id = "cursor"
+        self.freeze_frame = {}
+
+        # there is no GPU, the world renders into the display surface
+        self.batch = None
+        self.textures = None
+
+    @property
+    def world_target(self) -> pygame.Surface:
+        return self.display
+
+    def render_frame(self) -> None:
+        """
+        Ends the frame and clears the display for the next one, read the display before calling this
+        """
+        self.frame += 1
+        self.frame_history.append(self.frame_time)
+        # the simulated frame time is fixed, the profiler measures the real one
+        PROFILER.end_frame()
+        self.display.fill((0, 0, 0, 0))
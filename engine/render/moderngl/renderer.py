@@ -2,12 +2,13 @@ class Renderer:
     def __init__(self, ctx):
         self.ctx = ctx
 
-    def render(self):
+    def render(self, alpha: float = 1.0):
         """
-        Takes the games display surface, gives it to the world to let it render
-        all the GameObjects, Tiles and Entities, and then adds all speical FX
-        to the Surface (e.g. Bloom, HUD, etc.)
+        Gives the world target of the window, the GPU SpriteBatch if there is one, to the world to let it render
+        all the GameObjects, Tiles and Entities, and then the display surface for the HUD, which is composited on
+        top of the world (e.g. Bloom, HUD, etc.)
+        :param alpha: interpolation factor between the previous and the current simulation tick
         """
-
-        surf = self.ctx.window.display
-        self.ctx.scene_manager.render(surf)
+        window = self.ctx.window
+        world = getattr(window, "world_target", window.display)
+        self.ctx.scene_manager.render(world, alpha, window.display)
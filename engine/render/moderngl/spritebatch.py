@@ -0,0 +1,353 @@
+import weakref
+
+import moderngl
+import numpy as np
+import pygame
+from array import array
+
+SPRITE_VERTEX_SHADER = """
+#version 330
+
+uniform vec2 resolution;
+
+in vec2 in_corner;
+// per instance: destination rect in pixels, uv rect, tint, (flip x, flip y, rotation in degrees)
+in vec4 in_dest;
+in vec4 in_uv;
+in vec4 in_tint;
+in vec3 in_transform;
+
+out vec2 v_tex;
+out vec4 v_tint;
+
+void main() {
+    vec2 corner = vec2(
+        in_transform.x > 0.5 ? 1.0 - in_corner.x : in_corner.x,
+        in_transform.y > 0.5 ? 1.0 - in_corner.y : in_corner.y
+    );
+    v_tex = mix(in_uv.xy, in_uv.zw, corner);
+    v_tint = in_tint;
+
+    // rotate counter clockwise around the rect center like pygame.transform.rotate
+    vec2 half_size = in_dest.zw * 0.5;
+    vec2 local = in_corner * in_dest.zw - half_size;
+    float angle = radians(-in_transform.z);
+    vec2 rotated = vec2(local.x * cos(angle) - local.y * sin(angle), local.x * sin(angle) + local.y * cos(angle));
+    vec2 position = floor(in_dest.xy) + half_size + rotated;
+
+    vec2 ndc = position / resolution * 2.0 - 1.0;
+    gl_Position = vec4(ndc.x, -ndc.y, 0.0, 1.0);
+}
+"""
+
+SPRITE_FRAGMENT_SHADER = """
+#version 330
+
+uniform sampler2D tex;
+
+in vec2 v_tex;
+in vec4 v_tint;
+out vec4 f_color;
+
+void main() {
+    f_color = texture(tex, v_tex) * v_tint;
+}
+"""
+
+# blend modes of a run, BLEND_ADD matches pygame.BLEND_RGBA_ADD
+BLEND_ALPHA = 0
+BLEND_ADD = pygame.BLEND_RGBA_ADD
+
+# dest (4), uv (4), tint (4), flip x, flip y, rotation
+INSTANCE_FLOATS = 15
+INSTANCE_BYTES = INSTANCE_FLOATS * 4
+_ATTRIBUTES = (("in_dest", "4f", 0), ("in_uv", "4f", 16), ("in_tint", "4f", 32), ("in_transform", "3f", 48))
+
+
+class TextureCache:
+    """
+    Uploads pygame surfaces to GPU textures once. Subsurfaces share the texture of the surface they were cut from,
+    so every frame of an animation atlas or spritesheet ends up in the same texture and in the same draw call.
+    Textures are released after their surface was garbage collected.
+    """
+
+    def __init__(self, gl_ctx: moderngl.Context):
+        self.gl_ctx = gl_ctx
+        # id of the root surface -> (weak reference to it, texture)
+        self.__textures: dict[int, tuple[weakref.ref, moderngl.Texture]] = {}
+        self.__dead: list[int] = []
+        # textures that may still be queued in a batch, released in release_dead after the batch was drawn
+        self.__garbage: list[moderngl.Texture] = []
+        # id of any looked up surface -> (weak reference to it, texture, uv rect), skips the parent lookups for
+        # surfaces drawn every frame
+        self.__regions: dict[int, tuple] = {}
+        self.uploads = 0
+        self.white = self.gl_ctx.texture((1, 1), 4, b"\xff\xff\xff\xff")
+
+    def __len__(self):
+        return len(self.__textures)
+
+    def __upload(self, surface: pygame.Surface) -> moderngl.Texture:
+        pixels = pygame.image.tobytes(surface, "RGBA")
+        colorkey = surface.get_colorkey()
+        if colorkey is not None:
+            rgba = np.frombuffer(pixels, dtype=np.uint8).reshape(-1, 4).copy()
+            rgba[(rgba[:, :3] == colorkey[:3]).all(axis=1), 3] = 0
+            pixels = rgba.tobytes()
+        texture = self.gl_ctx.texture(surface.get_size(), 4, pixels)
+        texture.filter = (moderngl.NEAREST, moderngl.NEAREST)
+        texture.repeat_x = False
+        texture.repeat_y = False
+        self.uploads += 1
+        return texture
+
+    def __forget(self, key: int) -> None:
+        # called by the garbage collector, the texture is released on the main thread in release_dead
+        self.__dead.append(key)
+
+    def get(self, surface: pygame.Surface) -> tuple[moderngl.Texture, tuple[float, float, float, float]]:
+        """
+        :param surface: any surface or subsurface
+        :return: the texture of its root surface and the normalized uv rect (u0, v0, u1, v1) of surface in it
+        """
+        key = id(surface)
+        region = self.__regions.get(key)
+        if region is not None and region[0]() is surface:
+            return region[1], region[2]
+        texture, uv = self.__lookup(surface)
+        # the callback runs while the surface is deallocated, before its id can be reused
+        self.__regions[key] = (weakref.ref(surface, lambda _, k=key: self.__regions.pop(k, None)), texture, uv)
+        return texture, uv
+
+    def __lookup(self, surface: pygame.Surface) -> tuple[moderngl.Texture, tuple[float, float, float, float]]:
+        root = surface.get_abs_parent()
+        key = id(root)
+        entry = self.__textures.get(key)
+        if entry is None or entry[0]() is not root:
+            if entry is not None:
+                # the id got reused before release_dead ran
+                self.__garbage.append(entry[1])
+                self.__regions.clear()
+            entry = (weakref.ref(root, lambda _, k=key: self.__forget(k)), self.__upload(root))
+            self.__textures[key] = entry
+        texture = entry[1]
+        if root is surface:
+            return texture, (0.0, 0.0, 1.0, 1.0)
+        x, y = surface.get_abs_offset()
+        w, h = surface.get_size()
+        tw, th = texture.size
+        return texture, (x / tw, y / th, (x + w) / tw, (y + h) / th)
+
+    def preload(self, surfaces) -> None:
+        for surface in surfaces:
+            if surface is not None:
+                self.get(surface)
+
+    def invalidate(self, surface: pygame.Surface) -> None:
+        """
+        Uploads the surface again on its next use, needed after drawing onto an already uploaded surface
+        """
+        entry = self.__textures.pop(id(surface.get_abs_parent()), None)
+        if entry is not None:
+            self.__garbage.append(entry[1])
+            self.__regions.clear()
+
+    def release_dead(self) -> None:
+        """
+        Releases the textures of collected or invalidated surfaces, call it when no batch references them anymore
+        """
+        while self.__dead:
+            key = self.__dead.pop()
+            entry = self.__textures.get(key)
+            if entry is not None and entry[0]() is None:
+                del self.__textures[key]
+                self.__garbage.append(entry[1])
+        if self.__garbage:
+            self.__regions.clear()
+        for texture in self.__garbage:
+            texture.release()
+        self.__garbage.clear()
+
+
+class SpriteBatch:
+    """
+    Collects sprites of a frame into an instance buffer and draws them with one instanced quad per run of sprites
+    sharing texture and blend mode, in submission order. Renders at the base resolution into its own framebuffer
+    which the Window composites below the CPU display surface.
+
+    blit, fblits and the size getters mirror pygame.Surface, so code that renders to a surface (e.g. the Tilemap)
+    can render to a batch unchanged. pygame.draw calls do not work on a batch.
+    """
+
+    def __init__(self, gl_ctx: moderngl.Context, resolution, textures: TextureCache = None):
+        self.gl_ctx = gl_ctx
+        self.resolution = (int(resolution[0]), int(resolution[1]))
+        self.textures = textures or TextureCache(gl_ctx)
+        self.program = self.gl_ctx.program(vertex_shader=SPRITE_VERTEX_SHADER,
+                                           fragment_shader=SPRITE_FRAGMENT_SHADER)
+        self.program["resolution"].value = self.resolution
+        self.__quad = self.gl_ctx.buffer(array("f", [0.0, 0.0, 1.0, 0.0, 0.0, 1.0, 1.0, 1.0]))
+        self.__instances = self.gl_ctx.buffer(reserve=1024 * INSTANCE_BYTES, dynamic=True)
+        self.vao = self.gl_ctx.vertex_array(self.program, [(self.__quad, "2f", "in_corner")])
+        self.__attributes = [(self.program[name].location, fmt, offset) for name, fmt, offset in _ATTRIBUTES]
+        self.target = self.gl_ctx.texture(self.resolution, 4)
+        self.target.filter = (moderngl.NEAREST, moderngl.NEAREST)
+        self.fbo = self.gl_ctx.framebuffer(color_attachments=[self.target])
+        # (texture, blend, blocks), blocks are lists of instance tuples or (n, INSTANCE_FLOATS) arrays
+        self.__runs: list[tuple[moderngl.Texture, int, list]] = []
+        self.draw_calls = 0
+        self.instances = 0
+
+    def get_size(self) -> tuple[int, int]:
+        return self.resolution
+
+    def get_width(self) -> int:
+        return self.resolution[0]
+
+    def get_height(self) -> int:
+        return self.resolution[1]
+
+    def get_rect(self) -> pygame.Rect:
+        return pygame.Rect((0, 0), self.resolution)
+
+    def begin(self) -> None:
+        self.__runs.clear()
+
+    def __blocks(self, texture: moderngl.Texture, blend: int) -> list:
+        if self.__runs:
+            run = self.__runs[-1]
+            if run[0] is texture and run[1] == blend:
+                return run[2]
+        run = (texture, blend, [])
+        self.__runs.append(run)
+        return run[2]
+
+    def draw(self, surface: pygame.Surface, dest, area=None, flip=(False, False), tint=None,
+             alpha: int = 255, rotation: float = 0.0, blend: int = BLEND_ALPHA) -> None:
+        """
+        Queues one sprite
+        :param surface: the image, a subsurface of an uploaded sheet costs no extra texture
+        :param dest: top left (x, y) or a rect (x, y, w, h) to scale the image into, in pixels
+        :param area: optional part of surface, like pygame.Surface.blit
+        :param flip: flip on x and y
+        :param tint: optional rgb multiplied with the image
+        :param alpha: 0 to 255
+        :param rotation: counter clockwise in degrees around the center of dest
+        :param blend: BLEND_ALPHA or BLEND_ADD
+        :return: Nothing
+        """
+        texture, (u0, v0, u1, v1) = self.textures.get(surface)
+        if area is not None:
+            sw, sh = surface.get_size()
+            ax, ay, aw, ah = area
+            du, dv = u1 - u0, v1 - v0
+            u0, v0, u1, v1 = (u0 + du * ax / sw, v0 + dv * ay / sh, u0 + du * (ax + aw) / sw, v0 + dv * (ay + ah) / sh)
+            size = (aw, ah)
+        else:
+            size = surface.get_size()
+        if len(dest) == 4:
+            x, y, w, h = dest
+        else:
+            x, y = dest
+            w, h = size
+        blocks = self.__blocks(texture, blend)
+        if not blocks or not isinstance(blocks[-1], list):
+            blocks.append([])
+        if tint is None:
+            blocks[-1].append((x, y, w, h, u0, v0, u1, v1, 1.0, 1.0, 1.0, alpha / 255, flip[0], flip[1], rotation))
+        else:
+            blocks[-1].append((x, y, w, h, u0, v0, u1, v1, tint[0] / 255, tint[1] / 255, tint[2] / 255,
+                               alpha / 255, flip[0], flip[1], rotation))
+
+    def draw_rects(self, rects: np.ndarray, colors: np.ndarray, rotation: np.ndarray = None,
+                   blend: int = BLEND_ALPHA) -> None:
+        """
+        Queues solid colored rects without any per rect python work, e.g. for particles
+        :param rects: (n, 4) x, y, w, h in pixels
+        :param colors: (n, 4) rgba, 0 to 255
+        :param rotation: optional (n,) counter clockwise degrees around the rect centers
+        :param blend: BLEND_ALPHA or BLEND_ADD
+        :return: Nothing
+        """
+        n = len(rects)
+        if n == 0:
+            return
+        instances = np.zeros((n, INSTANCE_FLOATS), dtype="f4")
+        instances[:, 0:4] = rects
+        instances[:, 6:8] = 1.0
+        instances[:, 8:12] = colors
+        instances[:, 8:12] *= 1 / 255
+        if rotation is not None:
+            instances[:, 14] = rotation
+        self.__blocks(self.textures.white, blend).append(instances)
+
+    def blit(self, source: pygame.Surface, dest, area=None, special_flags: int = 0) -> None:
+        alpha = source.get_alpha()
+        self.draw(source, dest, area, alpha=255 if alpha is None else alpha,
+                  blend=BLEND_ADD if special_flags == BLEND_ADD else BLEND_ALPHA)
+
+    def fblits(self, blit_sequence, special_flags: int = 0) -> None:
+        for source, dest in blit_sequence:
+            self.blit(source, dest, special_flags=special_flags)
+
+    def blits(self, blit_sequence, doreturn=True):
+        for blit in blit_sequence:
+            self.blit(*blit)
+
+    def flush(self) -> None:
+        """
+        Draws every queued sprite into the batch framebuffer and empties the queue
+        :return: Nothing
+        """
+        self.fbo.use()
+        self.fbo.clear(0.0, 0.0, 0.0, 0.0)
+        self.gl_ctx.enable(moderngl.BLEND)
+        self.draw_calls = 0
+        self.instances = 0
+        if not self.__runs:
+            self.textures.release_dead()
+            return
+
+        counts = []
+        data = []
+        for _, _, blocks in self.__runs:
+            arrays = [np.asarray(b, dtype="f4").reshape(-1, INSTANCE_FLOATS) for b in blocks]
+            counts.append(sum(len(a) for a in arrays))
+            data.extend(arrays)
+        data = np.concatenate(data)
+        if data.nbytes > self.__instances.size:
+            self.__instances.orphan(max(data.nbytes, self.__instances.size * 2))
+        self.__instances.write(data)
+
+        start = 0
+        for (texture, blend, _), count in zip(self.__runs, counts):
+            if blend == BLEND_ADD:
+                self.gl_ctx.blend_func = moderngl.ONE, moderngl.ONE
+            else:
+                # color ends up premultiplied in the framebuffer, the window composites it with ONE as source factor
+                self.gl_ctx.blend_func = (moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA,
+                                          moderngl.ONE, moderngl.ONE_MINUS_SRC_ALPHA)
+            for location, fmt, offset in self.__attributes:
+                self.vao.bind(location, "f", self.__instances, fmt, offset=start * INSTANCE_BYTES + offset,
+                              stride=INSTANCE_BYTES, divisor=1)
+            texture.use(0)
+            self.vao.render(moderngl.TRIANGLE_STRIP, instances=count)
+            start += count
+            self.draw_calls += 1
+        self.instances = start
+        self.__runs.clear()
+        self.textures.release_dead()
+
+
+def line_rects(start: np.ndarray, direction: np.ndarray, length: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    One pixel thick lines as rotated rects for SpriteBatch.draw_rects
+    :param start: (n, 2) line starts
+    :param direction: (n, 2) line directions, need not be normalized
+    :param length: (n,) line lengths
+    :return: rects (n, 4) and rotations (n,)
+    """
+    angle = np.arctan2(direction[:, 1], direction[:, 0])
+    center = start + np.stack((np.cos(angle), np.sin(angle)), axis=1) * (length / 2)[:, None]
+    rects = np.column_stack((center[:, 0] - length / 2, center[:, 1] - 0.5, length, np.ones(len(length))))
+    return rects, np.degrees(-angle)
@@ -0,0 +1,91 @@
+import sys
+import time
+
+import moderngl
+import pygame
+
+
+def surface_swizzle(surface: pygame.Surface) -> str | None:
+    """
+    :param surface: a 32 bit surface
+    :return: the texture swizzle that turns its raw bytes into RGBA, None if the raw bytes can not be used as is
+    """
+    if surface.get_bytesize() != 4 or sys.byteorder != "little":
+        return None
+    swizzle = ""
+    for mask in surface.get_masks():
+        if mask == 0:
+            swizzle += "1"
+            continue
+        # the byte a channel is stored in, byte 0 of a pixel is loaded into the textures R component and so on
+        byte = (mask & -mask).bit_length() // 8
+        swizzle += "RGBA"[byte]
+    return swizzle
+
+
+class SurfaceUploader:
+    """
+    Streams a pygame surface into a texture every frame. The surfaces pixel buffer is written as is through its
+    buffer interface into the next pixel buffer object of a ring, while the texture is updated from the PBO written
+    the frame before. So the driver can transfer that one while the cpu fills the next and neither waits for the
+    other, at the cost of showing the surface one frame late. Without deferred the texture is updated from the PBO
+    just written, in sync with anything else drawn this frame. There is no intermediate bytes object, the channel
+    order is fixed with a texture swizzle and the rows are not flipped on the cpu, see top_down. Surfaces with
+    padded rows or an unusual format fall back to a synchronous tobytes.
+    """
+
+    def __init__(self, gl_ctx: moderngl.Context, surface: pygame.Surface, texture: moderngl.Texture,
+                 ring_size: int = 3, deferred: bool = True):
+        self.gl_ctx = gl_ctx
+        self.deferred = deferred
+        self.surface = surface
+        self.texture = texture
+        w, h = surface.get_size()
+        swizzle = surface_swizzle(surface)
+        self.zero_copy = swizzle is not None and surface.get_pitch() == w * 4
+        # the zero copy path stores the first row of the surface at v = 0, draw it with flipped v coordinates
+        self.top_down = self.zero_copy
+        self.ring = []
+        self.__index = 0
+        # the PBO written by the last upload, the next upload updates the texture from it
+        self.__pending: moderngl.Buffer | None = None
+        if self.zero_copy:
+            texture.swizzle = swizzle
+            # at least the buffer being written and the one being transferred
+            self.ring = [gl_ctx.buffer(reserve=w * h * 4, dynamic=True) for _ in range(max(ring_size, 2))]
+        # seconds the last upload took on the cpu
+        self.last_upload = 0.0
+
+    def upload(self) -> float:
+        """
+        Writes the surface into the ring and updates the texture with the surface of the previous upload, the
+        first upload or one that is not deferred updates it right away
+        :return: seconds spent on the upload
+        """
+        start = time.perf_counter()
+        if self.zero_copy:
+            pbo = self.ring[self.__index]
+            self.__index = (self.__index + 1) % len(self.ring)
+            view = self.surface.get_view("1")
+            pbo.write(view)
+            # the view locks the surface, release it right away
+            del view
+            self.texture.write(self.__pending or pbo if self.deferred else pbo)
+            self.__pending = pbo
+        else:
+            self.texture.write(pygame.image.tobytes(self.surface, "RGBA", True))
+        self.last_upload = time.perf_counter() - start
+        return self.last_upload
+
+    def flush(self) -> None:
+        """
+        Updates the texture with the surface of the last upload, e.g. before reading the texture back
+        """
+        if self.__pending is not None:
+            self.texture.write(self.__pending)
+
+    def release(self) -> None:
+        for pbo in self.ring:
+            pbo.release()
+        self.ring.clear()
+        self.__pending = None
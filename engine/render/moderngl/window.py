@@ -1,8 +1,14 @@
 import time
+from collections import deque
+
 import pygame
 import moderngl
 from array import array
 
+from engine.core.profiler import PROFILER
+from engine.render.moderngl.spritebatch import SpriteBatch
+from engine.render.moderngl.upload import SurfaceUploader
+
 VERTEX_SHADER = """
 #version 330
 
@@ -41,6 +47,8 @@ class Window:
     def __init__(self, ctx=None) -> None:
         self.ms = 0
         self.dt = 0.1
+        # unclamped seconds of the last frame, what a fixed timestep accumulates
+        self.frame_time = 0.0
         self.clock = pygame.time.Clock()
         self.debug_dt = False
         self.tick = 120
@@ -118,35 +126,90 @@ class Window:
             flags=pygame.SRCALPHA
         )
 
-        self.frame_history = [0.01]
+        # streams the display into self.texture without a cpu copy or flip, a frame late unless it is drawn over the
+        # sprite batch which is drawn in the same frame
+        self.uploader = SurfaceUploader(self.gl_ctx, self.display, self.texture,
+                                        deferred=not self.ctx.window_settings.sprite_batch)
+        self.display_vao = self.vao
+        if self.uploader.top_down:
+            display_quad = self.gl_ctx.buffer(
+                array('f', [
+                    # x,  y,   u,  v
+                    -1.0, -1.0, 0.0, 1.0,
+                    1.0, -1.0, 1.0, 1.0,
+                    -1.0, 1.0, 0.0, 0.0,
+                    1.0, 1.0, 1.0, 0.0,
+                ])
+            )
+            self.display_vao = self.gl_ctx.simple_vertex_array(self.program, display_quad, "in_vert", "in_tex")
+
+        # seconds of the last frames
+        self.frame_history = deque(maxlen=240)
+        # milliseconds of the display upload of the last frames
+        self.upload_history = deque(maxlen=120)
         self.frame_start = time.time()
 
         self.cursor_id = "cursor"
         self.freeze_frame = {}
 
+        self.batch: SpriteBatch | None = None
+        if self.ctx.window_settings.sprite_batch:
+            self.batch = SpriteBatch(self.gl_ctx, self.base_resolution)
+
+    @property
+    def textures(self):
+        return self.batch.textures if self.batch else None
+
+    @property
+    def upload_ms(self) -> float:
+        """
+        :return: average milliseconds the display upload took over the last frames
+        """
+        return sum(self.upload_history) / len(self.upload_history) if self.upload_history else 0.0
+
+    @property
+    def world_target(self):
+        """
+        :return: the SpriteBatch if there is one, otherwise the CPU display surface
+        """
+        return self.batch or self.display
 
     def render_frame(self) -> None:
         """
-        Upload pygame surface to GPU texture and render fullscreen quad.
+        Draws the sprite batch, then uploads the pygame surface to GPU texture and renders it as fullscreen quad
+        on top of it.
         """
+        if self.batch:
+            with PROFILER.stage("gpu.flush"):
+                self.batch.flush()
+            self.gl_ctx.screen.use()
 
         # Upload surface to GPU
-        pixel_data = pygame.image.tobytes(self.display, "RGBA", True)
-        self.texture.write(pixel_data)
+        with PROFILER.stage("gpu.upload"):
+            self.upload_history.append(self.uploader.upload() * 1000)
 
         # Clear backbuffer
         self.gl_ctx.clear(*self.background_color)
 
+        if self.batch:
+            # the batch framebuffer holds premultiplied colors
+            self.gl_ctx.blend_func = moderngl.ONE, moderngl.ONE_MINUS_SRC_ALPHA
+            self.batch.target.use(0)
+            self.vao.render(moderngl.TRIANGLE_STRIP)
+            self.gl_ctx.blend_func = moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA
+
         # Render quad
         self.texture.use(0)
-        self.vao.render(moderngl.TRIANGLE_STRIP)
+        self.display_vao.render(moderngl.TRIANGLE_STRIP)
 
         # Swap buffers
         pygame.display.flip()
 
         # Timing
-        self.dt = self.clock.tick(self.tick) / 1000.0
-        self.dt = max(min(self.dt, 0.1), 0.001)
+        self.frame_time = self.clock.tick(self.tick) / 1000.0
+        self.dt = max(min(self.frame_time, 0.1), 0.001)
+        self.frame_history.append(self.frame_time)
+        PROFILER.end_frame(self.frame_time)
 
         pygame.display.set_caption(
             f"Example Apps - {int(self.clock.get_fps())}fps"
@@ -154,3 +217,5 @@ class Window:
 
         # Clear CPU surface for next frame
         self.display.fill((0, 0, 0, 0))
+        if self.batch:
+            self.batch.begin()
@@ -1,3 +1,6 @@
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
 import pygame
 from engine.core.tile import Tile
 
@@ -12,8 +15,13 @@ class RenderChunk:
             self.tile_size * self.chunk_size,
             self.tile_size * self.chunk_size,
         )
-        self.CHUNK_SURFACE = pygame.Surface((height, width)).convert()
-        self.CHUNK_SURFACE.set_colorkey((0, 0, 0))
+        self.CHUNK_SURFACE = pygame.Surface((height, width), pygame.SRCALPHA).convert_alpha()
+        self.CHUNK_SURFACE.fill((0, 0, 0, 0))
+
+    @property
+    def pixel_rect(self) -> pygame.Rect:
+        size = self.tile_size * self.chunk_size
+        return pygame.Rect(self.chunk_location.x * size, self.chunk_location.y * size, size, size)
 
     def add_tile(self, tile) -> None:
         self.tile_surfaces.append(tile)
@@ -25,8 +33,91 @@ class RenderChunk:
                 chunk_y = tile.position.y - (self.chunk_location.y * self.chunk_size)
                 self.CHUNK_SURFACE.blit(tile.image, (chunk_x * self.tile_size, chunk_y * self.tile_size))
 
+    def bake_rooms(self, rooms: Iterable) -> None:
+        """
+        Blits the part of every room composite image that overlaps this chunk onto the chunk surface
+        :param rooms: RoomData objects, rooms without a loaded composite image are skipped
+        :return: Nothing
+        """
+        chunk_rect = self.pixel_rect
+        for room in rooms:
+            if room.composite_img is not None:
+                self.CHUNK_SURFACE.blit(room.composite_img, (room.position[0] - chunk_rect.x,
+                                                             room.position[1] - chunk_rect.y))
+
     def has_tiles(self) -> bool:
         if len(self.tile_surfaces) > 0:
             return True
         else:
             return False
+
+
+class RenderChunkCache:
+    """
+    Caches baked RenderChunks of the room composite images. Chunks are baked lazily when they first become
+    visible and evicted least recently used, so memory scales with the view and not with the world size.
+    """
+
+    def __init__(self, tile_size: int, chunk_size: int, max_chunks: int, room_query: Callable):
+        """
+        :param tile_size: the pixel size of a tile
+        :param chunk_size: chunk edge length in tiles
+        :param max_chunks: maximum amount of baked chunks kept
+        :param room_query: callable returning all rooms overlapping a pygame.Rect
+        """
+        self.tile_size = tile_size
+        self.chunk_size = chunk_size
+        self.chunk_pixels = tile_size * chunk_size
+        self.max_chunks = max_chunks
+        self.room_query = room_query
+        # chunk location -> baked chunk, None for chunks without any room
+        self.chunks: OrderedDict[tuple[int, int], Optional[RenderChunk]] = OrderedDict()
+
+    def get_chunk(self, cx: int, cy: int) -> Optional[RenderChunk]:
+        key = (cx, cy)
+        if key in self.chunks:
+            self.chunks.move_to_end(key)
+            return self.chunks[key]
+        chunk = None
+        rooms = self.room_query(pygame.Rect(cx * self.chunk_pixels, cy * self.chunk_pixels,
+                                            self.chunk_pixels, self.chunk_pixels))
+        if rooms:
+            chunk = RenderChunk(pygame.Vector2(cx, cy), self.chunk_size, self.tile_size)
+            chunk.bake_rooms(rooms)
+        self.chunks[key] = chunk
+        while len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def invalidate(self, rect=None) -> None:
+        """
+        Drops baked chunks so they get baked again on their next use
+        :param rect: only drop the chunks overlapping this pixel rect, all chunks if None
+        :return: Nothing
+        """
+        if rect is None:
+            self.chunks.clear()
+            return
+        rect = pygame.Rect(rect)
+        for key in [k for k in self.chunks if rect.colliderect(self.__chunk_rect(k))]:
+            del self.chunks[key]
+
+    def __chunk_rect(self, key) -> pygame.Rect:
+        return pygame.Rect(key[0] * self.chunk_pixels, key[1] * self.chunk_pixels, self.chunk_pixels,
+                           self.chunk_pixels)
+
+    def render(self, surf: pygame.Surface, view: pygame.Rect) -> None:
+        """
+        Composites all chunks overlapping view onto surf, view.topleft is drawn at (0, 0)
+        :param surf: the target surface
+        :param view: the visible world rect, e.g. Camera.render_view
+        :return: Nothing
+        """
+        cp = self.chunk_pixels
+        blits = []
+        for cy in range(view.top // cp, (view.bottom - 1) // cp + 1):
+            for cx in range(view.left // cp, (view.right - 1) // cp + 1):
+                chunk = self.get_chunk(cx, cy)
+                if chunk is not None:
+                    blits.append((chunk.CHUNK_SURFACE, (cx * cp - view.x, cy * cp - view.y)))
+        surf.fblits(blits)
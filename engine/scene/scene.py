@@ -35,4 +35,16 @@ class Scene:
         pass
 
     def render(self, surf: pygame.Surface):
+        """
+        Draws the world
+        :param surf: Window.world_target, the GPU SpriteBatch of the window if there is one, otherwise the display
+        """
+        pass
+
+    def render_hud(self, surf: pygame.Surface):
+        """
+        Draws on top of the world, e.g. the HUD, overlays and anything using pygame.draw, which a SpriteBatch does
+        not support
+        :param surf: the display surface
+        """
         pass
@@ -1,5 +1,6 @@
 import pygame
 
+from engine.core.profiler import PROFILER
 from engine.scene.scene import Scene
 
 
@@ -9,6 +10,8 @@ class SceneManager:
         self.active_scene: Scene | None = None
         self.master_clock: float = 0.0
         self.dt: float = 0.0
+        # interpolation factor between the previous and the current tick, set for the duration of render
+        self.alpha: float = 1.0
         self.ctx = ctx
 
     def switch_scene(self, name: str):
@@ -16,34 +19,78 @@ class SceneManager:
         if not scene:
             raise ValueError(f"Scene '{name}' nicht gefunden")
 
-        if self.active_scene:
-            self.active_scene.exit_scene()
+        old = self.active_scene
+        if old:
+            old.exit_scene()
 
         self.active_scene = scene
+        self.__set_asset_scope(scene.name)
         self.active_scene.init_scene()
         self.active_scene.load_scene()
         self.active_scene.enter_scene()
+        # released only now that the new scene holds its assets, the ones both scenes use stay loaded
+        if old and old.name != scene.name:
+            self.__release_assets(old.name)
 
     def register_scene(self, scene: Scene):
         if scene.name in self.scenes.keys():
             raise ValueError(f"Scene '{scene.name}' already exists")
         self.scenes[scene.name] = scene
+        self.__set_asset_scope(scene.name)
         scene.init_scene()
         scene.load_scene()
         scene.enter_scene()
+        self.__set_asset_scope(self.active_scene.name if self.active_scene else None)
 
     def set_active_scene(self, scene):
         if not scene.name in self.scenes.keys():
             raise ValueError(f"Scene '{scene.name}' nicht gefunden")
         self.active_scene = self.scenes.get(scene.name)
+        self.__set_asset_scope(self.active_scene.name)
+
+    def __set_asset_scope(self, name: str | None) -> None:
+        """
+        Assets requested from the content from now on are referenced by the scene
+        """
+        content = getattr(self.ctx, "content", None)
+        if content is not None:
+            content.assets.scope = name
 
-    def update(self):
-        _dt = self.ctx.window.dt
+    def __release_assets(self, name: str) -> None:
+        content = getattr(self.ctx, "content", None)
+        if content is not None:
+            content.release_scope(name)
+
+    def update(self, dt: float = None):
+        """
+        :param dt: the simulation step, the windows frame time if None
+        """
+        _dt = self.ctx.window.dt if dt is None else dt
         self.dt = _dt
         self.master_clock += _dt
         if self.active_scene:
-            self.active_scene.update()
+            with PROFILER.stage("scene.update"):
+                self.active_scene.update()
+        self.__advance_animations()
+
+    def __advance_animations(self) -> None:
+        # after the update, the entities that were updated scheduled their animations
+        content = self.ctx.content
+        if content is None:
+            return
+        animations = content.get_animation_manager()
+        if animations.batched:
+            with PROFILER.stage("animations.advance"):
+                animations.advance()
 
-    def render(self, surf: pygame.Surface):
+    def render(self, surf: pygame.Surface, alpha: float = 1.0, hud: pygame.Surface = None):
+        """
+        :param surf: the world target, a surface or a SpriteBatch
+        :param alpha: interpolation factor between the previous and the current tick
+        :param hud: the surface render_hud draws to, surf if None
+        """
+        self.alpha = alpha
         if self.active_scene:
-            self.active_scene.render(surf)
+            with PROFILER.stage("scene.render"):
+                self.active_scene.render(surf)
+                self.active_scene.render_hud(surf if hud is None else hud)
@@ -37,16 +37,23 @@ class SoundManager:
     def _load_all(self):
         supported = (".wav", ".ogg", ".mp3")
 
-        for root, _, files in os.walk(self.base_path):
-            for file in files:
+        files = {}
+        for root, _, names in os.walk(self.base_path):
+            for file in names:
                 if file.lower().endswith(supported):
                     full = os.path.join(root, file)
-                    key = os.path.relpath(full, self.base_path).replace("\\", "/")
-
-                    sound = pygame.mixer.Sound(full)
-                    sound.set_volume(self.volume)
-                    self.sounds[key] = sound
-                    self.logger.info(f"Loaded sound: {key}")
+                    files[os.path.relpath(full, self.base_path).replace("\\", "/")] = full
+
+        # the content managers loader decodes the files in parallel, without one they are decoded here
+        content = getattr(self.ctx, "content", None)
+        loader = content.loader if content else None
+        if loader:
+            loader.request_sounds(files.values())
+        for key, full in files.items():
+            sound = loader.get_sound(full) if loader else pygame.mixer.Sound(full)
+            sound.set_volume(self.volume)
+            self.sounds[key] = sound
+            self.logger.info(f"Loaded sound: {key}")
 
         self.logger.info(f"Loaded {len(self.sounds)} sounds")
 
@@ -4,6 +4,7 @@ from dataclasses import dataclass
 import pygame
 
 from engine.core.engine_core_funcs import approach
+from engine.core.profiler import PROFILER
 
 
 class VFXAnimation:
@@ -21,6 +22,13 @@ class VFXAnimation:
     def update(self, dt):
         self.current_frame += dt
 
+    def bounds(self) -> pygame.Rect:
+        """
+        :return: the world rect render draws into
+        """
+        img = self.active_img
+        return pygame.Rect(self.position.x - img.width // 2, self.position.y + img.height // 2, img.width, img.height)
+
     def render(self, surf: pygame.Surface, offset):
         surf.blit(self.active_img,
                   (self.position.x - self.active_img.width // 2 - offset[0],
@@ -42,6 +50,12 @@ class VFXEffect:
     def update(self, dt):
         pass
 
+    def bounds(self) -> pygame.Rect:
+        """
+        :return: the world rect render draws into
+        """
+        return pygame.Rect(self.position[0], self.position[1], 1, 1)
+
     def render(self, surf: pygame.Surface, offset):
         pass
 
@@ -58,6 +72,10 @@ class VFXCircleEffect(VFXEffect):
         if self.current_radius == self.end_radius:
             self.alive = False
 
+    def bounds(self) -> pygame.Rect:
+        radius = math.ceil(self.current_radius)
+        return pygame.Rect(self.position[0] - radius, self.position[1] - radius, radius * 2 + 1, radius * 2 + 1)
+
     def render(self, surf: pygame.Surface, offset):
         super().render(surf, offset)
         pygame.draw.circle(surf, self.current_color, self.position - offset, self.current_radius, self.width)
@@ -88,6 +106,11 @@ class VFXLineEffect(VFXEffect):
         self.position_positive = self.position - pygame.Vector2(dx, dy)
         self.position_negative = self.position + pygame.Vector2(dx, dy)
 
+    def bounds(self) -> pygame.Rect:
+        left, right = sorted((self.position_positive.x, self.position_negative.x))
+        top, bottom = sorted((self.position_positive.y, self.position_negative.y))
+        return pygame.Rect(left - 1, top - 1, right - left + 3, bottom - top + 3)
+
     def render(self, surf: pygame.Surface, offset):
         super().render(surf, offset)
         pygame.draw.aaline(surf, self.current_color, self.position - offset, self.position_positive - offset)
@@ -95,7 +118,11 @@ class VFXLineEffect(VFXEffect):
 
 
 class VFXBase:
-    def __init__(self):
+    def __init__(self, culling: bool = True):
+        """
+        :param culling: render skips the effects whose bounds are outside the target
+        """
+        self.culling = culling
         self.circle_surfaces = self._generate_circle_surfaces()
         self.active_texture_animations: list[VFXAnimation] = []
         self.active_effect_animations: list[VFXEffect] = []
@@ -106,20 +133,21 @@ class VFXBase:
         self.__active_effect_queue.append(effect)
 
     def update(self, dt):
-        # Entities and other stuff spawns effects, add them now then update
-        for added_anim in self.__active_effect_queue:
-            self.active_effect_animations.append(added_anim)
-        self.__active_effect_queue.clear()
-        for added_anim in self.__active_texture_queue:
-            self.active_texture_animations.append(added_anim)
-        self.__active_texture_queue.clear()
-
-        for active_anim in self.active_texture_animations[:]:
-            active_anim.update(dt)
-        for i, active_anim in enumerate(self.active_effect_animations[:]):
-            active_anim.update(dt)
-            if not active_anim.alive:
-                self.active_effect_animations.remove(active_anim)
+        with PROFILER.stage("vfx.update"):
+            # Entities and other stuff spawns effects, add them now then update
+            for added_anim in self.__active_effect_queue:
+                self.active_effect_animations.append(added_anim)
+            self.__active_effect_queue.clear()
+            for added_anim in self.__active_texture_queue:
+                self.active_texture_animations.append(added_anim)
+            self.__active_texture_queue.clear()
+
+            for active_anim in self.active_texture_animations[:]:
+                active_anim.update(dt)
+            for i, active_anim in enumerate(self.active_effect_animations[:]):
+                active_anim.update(dt)
+                if not active_anim.alive:
+                    self.active_effect_animations.remove(active_anim)
 
     def _generate_circle_surfaces(self):
         surfaces = []
@@ -155,7 +183,23 @@ class VFXBase:
             raise IndexError("Frame out of range for decreasing circle")
 
     def render(self, surf, offset):
-        for active_anim in self.active_texture_animations:
-            active_anim.render(surf, offset)
-        for active_anim in self.active_effect_animations:
-            active_anim.render(surf, offset)
+        with PROFILER.stage("vfx.render"):
+            if not self.culling:
+                for active_anim in self.active_texture_animations:
+                    active_anim.render(surf, offset)
+                for active_anim in self.active_effect_animations:
+                    active_anim.render(surf, offset)
+                return
+            view = pygame.Rect(offset, surf.get_size())
+            drawn = 0
+            for active_anim in self.active_texture_animations:
+                if view.colliderect(active_anim.bounds()):
+                    active_anim.render(surf, offset)
+                    drawn += 1
+            for active_anim in self.active_effect_animations:
+                if view.colliderect(active_anim.bounds()):
+                    active_anim.render(surf, offset)
+                    drawn += 1
+            PROFILER.count("vfx.drawn", drawn)
+            PROFILER.count("vfx.culled",
+                           len(self.active_texture_animations) + len(self.active_effect_animations) - drawn)
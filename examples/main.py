@@ -1,4 +1,5 @@
 import logging
+import pygame
 from typing import Optional
 from engine.content.contentmanager_new import ContentManager
 from engine.core.gamecontext import GameContext
@@ -9,6 +10,9 @@ from engine.render.moderngl.window import Window
 from engine.scene.scenemanager import SceneManager
 from examples.scenes.examplescene import ExampleScene
 from engine.core.savegame import SaveGame
+from engine.core.profiler import PROFILER
+from engine.core.timestep import FixedTimestep
+from engine.overlay.loadingoverlay import LoadingOverlay
 from engine.sound.soundmanager import SoundManager
 from engine.config.projectconfig import WindowSettings, GameSettings, ResourcePaths
 
@@ -37,6 +41,7 @@ class Game:
         self.resource_paths: ResourcePaths = resource_paths or ResourcePaths()
 
         self.ctx: GameContext = GameContext()
+        PROFILER.enabled = self.game_settings.profiling
 
         # Settings first
         self.ctx.set_game_settings(self.game_settings)
@@ -47,7 +52,8 @@ class Game:
         self.ctx.set_window(Window(self.ctx))
         self.ctx.set_input(Input(self.ctx))
         self.ctx.set_global_eventmanager(EventBus())
-        self.ctx.set_content(ContentManager(self.ctx))
+        self.loading = LoadingOverlay(self.ctx)
+        self.ctx.set_content(ContentManager(self.ctx, on_progress=self.__present_loading))
         self.ctx.set_renderer(Renderer(self.ctx))
         self.ctx.set_savegame(SaveGame(self.ctx))
         self.ctx.set_sound(SoundManager(self.ctx))
@@ -60,12 +66,31 @@ class Game:
         self.ctx.scene_manager.register_scene(self.example_scene)
         self.ctx.scene_manager.set_active_scene(self.example_scene)
 
+        self.timestep = FixedTimestep(self.game_settings.tick_rate, self.game_settings.max_ticks_per_frame)
+        if self.game_settings.uncapped_simulation:
+            self.ctx.window.tick = 0
+
         self.running: bool = True
 
+    def __present_loading(self, progress: float, stage: str) -> None:
+        # the scenes do not exist yet, the loading screen is drawn straight onto the display
+        pygame.event.pump()
+        self.loading.set_progress(progress, stage)
+        self.loading.render(self.ctx.window.display)
+        self.ctx.window.render_frame()
+
     def update(self) -> None:
-        self.ctx.input.update()
-        self.ctx.scene_manager.update()
-        self.ctx.renderer.render()
+        with PROFILER.stage("input"):
+            self.ctx.input.update()
+        if self.game_settings.uncapped_simulation:
+            ticks, alpha = 1, 1.0
+        else:
+            ticks = self.timestep.advance(self.ctx.window.frame_time)
+            alpha = self.timestep.alpha
+        for _ in range(ticks):
+            self.ctx.scene_manager.update(self.timestep.dt)
+            self.ctx.input.end_tick()
+        self.ctx.renderer.render(alpha)
         self.ctx.window.render_frame()
 
     def run(self) -> None:
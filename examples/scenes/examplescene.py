@@ -1,5 +1,6 @@
 import pygame
 
+from engine.overlay.perfoverlay import PerfOverlay
 from engine.scene.scene import Scene
 
 
@@ -7,12 +8,16 @@ class ExampleScene(Scene):
     def __init__(self, ctx):
         super().__init__(ctx)
         self.rect_position: pygame.Vector2 = pygame.Vector2(0, 0)
+        # position of the previous tick, rendering interpolates towards rect_position
+        self.previous_position: pygame.Vector2 = pygame.Vector2(0, 0)
         self.rect_velocity: pygame.Vector2 = pygame.Vector2(60, 60)
         self.rect_size: int = 20
+        self.perf_overlay: PerfOverlay | None = PerfOverlay(ctx) if ctx.game_settings.profiling else None
 
     def update(self):
         super().update()
-        dt = self.ctx.window.dt
+        dt = self.ctx.scene_manager.dt
+        self.previous_position = self.rect_position.copy()
         self.rect_position += self.rect_velocity * dt
 
         max_x = self.ctx.game_settings.room_width - self.rect_size
@@ -28,8 +33,14 @@ class ExampleScene(Scene):
 
     def render(self, surf: pygame.Surface):
         super().render(surf)
+        position = self.previous_position.lerp(self.rect_position, self.ctx.scene_manager.alpha)
         pygame.draw.rect(
             surf,
             (0, 0, 0),
-            pygame.Rect(self.rect_position.x, self.rect_position.y, self.rect_size, self.rect_size)
-        )
\ No newline at end of file
+            pygame.Rect(position.x, position.y, self.rect_size, self.rect_size)
+        )
+
+    def render_hud(self, surf: pygame.Surface):
+        super().render_hud(surf)
+        if self.perf_overlay:
+            self.perf_overlay.render(surf)